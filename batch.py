@@ -0,0 +1,278 @@
+"""Simulation vectorisée (NumPy) de nombreux cubes indépendants en parallèle."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from level import Level
+from settings import (
+    AIR_ROTATION_SPEED,
+    CAMERA_OFFSET_X,
+    COYOTE_FRAMES,
+    GRAVITY,
+    HEIGHT,
+    JUMP_BUFFER_FRAMES,
+    JUMP_FORCE,
+    MAX_FALL_SPEED,
+    PLAYER_SIZE,
+    RUN_SPEED,
+)
+
+# Codes d'état des cubes du lot
+BATCH_PLAYING = 0
+BATCH_DEAD = 1
+BATCH_WIN = 2
+
+
+class BatchSimulation:
+    """Fait avancer ``count`` cubes en parallèle avec les mêmes règles que ``Simulation``.
+
+    Les états sont stockés en structure de tableaux ; chaque cube correspond à une
+    partie lancée par ``Simulation.start_run``. Un cube mort ou arrivé reste figé
+    jusqu'au prochain ``reset``.
+    """
+
+    def __init__(self, level: Level, count: int) -> None:
+        self.level = level
+        self.count = int(count)
+        n = self.count
+        self.pos_x = np.zeros(n, dtype=np.float64)
+        self.pos_y = np.zeros(n, dtype=np.float64)
+        self.rect_x = np.zeros(n, dtype=np.int64)
+        self.rect_y = np.zeros(n, dtype=np.int64)
+        self.prev_top = np.zeros(n, dtype=np.int64)
+        self.prev_bottom = np.zeros(n, dtype=np.int64)
+        self.vel_y = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.ones(n, dtype=bool)
+        self.coyote_frames = np.full(n, COYOTE_FRAMES, dtype=np.int64)
+        self.rotation = np.zeros(n, dtype=np.float64)
+        self.jump_buffer = np.zeros(n, dtype=np.int64)
+        self.jump_held = np.zeros(n, dtype=bool)
+        self.cam_x = np.zeros(n, dtype=np.float64)
+        self.state = np.zeros(n, dtype=np.int8)
+        self.frames = 0
+        self._compile_level()
+        self.reset()
+
+    def _compile_level(self) -> None:
+        # Tableaux triés par bord gauche : chaque cube ne regarde qu'une tranche
+        # autour de lui (même principe que Level.section_index).
+        sections = list(self.level.ground_iter())
+        sec_left = np.array([s.rect.left for s in sections], dtype=np.int64)
+        order = np.argsort(sec_left, kind="stable")
+        self._sec_order = order
+        # Position triée de chaque section, à partir de son rang dans le niveau
+        self._sec_rank = np.argsort(order)
+        self._sec_left = sec_left[order]
+        self._sec_right = np.array([s.rect.right for s in sections], dtype=np.int64)[order]
+        self._sec_top = np.array([s.rect.top for s in sections], dtype=np.int64)[order]
+        self._sec_bottom = np.array([s.rect.bottom for s in sections], dtype=np.int64)[order]
+        self._sec_max_width = int((self._sec_right - self._sec_left).max()) if sections else 0
+
+        shapes = [spike.shape for spike in self.level.spikes]
+        spk_left = np.array([shape.left for shape in shapes], dtype=np.int64)
+        order = np.argsort(spk_left, kind="stable")
+
+        def column(name: str) -> np.ndarray:
+            return np.array([getattr(shape, name) for shape in shapes], dtype=np.int64)[order]
+
+        # Géométrie précompilée de Spike.shape (boîte et coefficients barycentriques)
+        self._spk_left = spk_left[order]
+        self._spk_top = column("top")
+        self._spk_right = column("right")
+        self._spk_bottom = column("bottom")
+        self._spk_max_width = int((self._spk_right - self._spk_left).max()) if shapes else 0
+        self._spk_cx = column("cx")
+        self._spk_cy = column("cy")
+        self._spk_k1 = column("k1")
+        self._spk_k2 = column("k2")
+        self._spk_k3 = column("k3")
+        self._spk_k4 = column("k4")
+        self._spk_denom = column("denom")
+
+    def reset(self, start_with_jump: bool | np.ndarray = False, mask: Optional[np.ndarray] = None) -> None:
+        """Relance une partie pour tous les cubes (ou ceux de ``mask``)."""
+        sel = slice(None) if mask is None else np.asarray(mask, dtype=bool)
+        spawn_x, spawn_y = self.level.player_spawn
+        self.rect_x[sel] = int(spawn_x)
+        self.rect_y[sel] = int(spawn_y)
+        self.pos_x[sel] = float(int(spawn_x))
+        self.pos_y[sel] = float(int(spawn_y))
+        self.prev_top[sel] = int(spawn_y)
+        self.prev_bottom[sel] = int(spawn_y) + PLAYER_SIZE
+        self.vel_y[sel] = 0.0
+        self.on_ground[sel] = True
+        self.coyote_frames[sel] = COYOTE_FRAMES
+        self.rotation[sel] = 0.0
+        held = np.broadcast_to(np.asarray(start_with_jump, dtype=bool), (self.count,))
+        held = held if mask is None else held[sel]
+        self.jump_buffer[sel] = np.where(held, JUMP_BUFFER_FRAMES, 0)
+        self.jump_held[sel] = held
+        self.cam_x[sel] = 0.0
+        self.state[sel] = BATCH_PLAYING
+
+    def step(self, jump_pressed: np.ndarray | bool = False, jump_held: np.ndarray | bool = False) -> np.ndarray:
+        """Avance tous les cubes d'une frame et renvoie le tableau des états."""
+        n = self.count
+        playing = self.state == BATCH_PLAYING
+        pressed = np.broadcast_to(np.asarray(jump_pressed, dtype=bool), (n,))
+        held = np.broadcast_to(np.asarray(jump_held, dtype=bool), (n,))
+
+        # Entrées (Simulation.press_jump / release_jump) pour les parties en cours
+        self.jump_buffer[playing & pressed] = JUMP_BUFFER_FRAMES
+        self.jump_held[playing] = held[playing]
+
+        idx = np.flatnonzero(playing)
+        if idx.size:
+            self._step_playing(idx)
+
+        # Les cubes morts ou arrivés continuent de tourner, comme dans le jeu
+        finished = ~playing
+        airborne = finished & ~self.on_ground
+        self.rotation[finished & self.on_ground] = 0.0
+        self.rotation[airborne] = (self.rotation[airborne] + AIR_ROTATION_SPEED) % 360
+        self.frames += 1
+        return self.state
+
+    def _step_playing(self, idx: np.ndarray) -> None:
+        size = PLAYER_SIZE
+        pos_x = self.pos_x[idx] + RUN_SPEED
+        rect_x = np.rint(pos_x).astype(np.int64)
+
+        rect_y = self.rect_y[idx]
+        prev_top = rect_y
+        prev_bottom = rect_y + size
+        vel_y = np.minimum(self.vel_y[idx] + GRAVITY, MAX_FALL_SPEED)
+        pos_y = self.pos_y[idx] + vel_y
+        rect_y = np.rint(pos_y).astype(np.int64)
+
+        # Sol : première section (dans l'ordre du niveau) qui fait atterrir ou cogner
+        on_ground = self.on_ground[idx]
+        coyote = self.coyote_frames[idx]
+        landed = np.zeros(idx.size, dtype=bool)
+        rows, cols = _candidates(self._sec_left, self._sec_max_width, rect_x, rect_x + size)
+        if rows.size:
+            px = rect_x[rows]
+            py = rect_y[rows]
+            sec_top = self._sec_top[cols]
+            sec_bottom = self._sec_bottom[cols]
+            overlap = (
+                (px < self._sec_right[cols])
+                & (px + size > self._sec_left[cols])
+                & (py < sec_bottom)
+                & (py + size > sec_top)
+            )
+            falling = vel_y[rows] >= 0
+            hit = overlap & np.where(falling, prev_bottom[rows] <= sec_top, prev_top[rows] >= sec_bottom)
+            if hit.any():
+                # Première section touchée dans l'ordre du niveau, comme Player.handle_ground
+                count = self._sec_order.size
+                first = np.full(idx.size, count, dtype=np.int64)
+                np.minimum.at(first, rows[hit], self._sec_order[cols[hit]])
+                any_hit = first < count
+                sec = self._sec_rank[np.minimum(first, count - 1)]
+                landed = any_hit & (vel_y >= 0)
+                bumped = any_hit & ~landed
+                rect_y = np.where(landed, self._sec_top[sec] - size, rect_y)
+                rect_y = np.where(bumped, self._sec_bottom[sec], rect_y)
+                pos_y = np.where(any_hit, rect_y.astype(np.float64), pos_y)
+                vel_y = np.where(any_hit, 0.0, vel_y)
+                on_ground = on_ground | landed
+                coyote = np.where(landed, COYOTE_FRAMES, coyote)
+        airborne = ~landed
+        on_ground = np.where(airborne & (coyote <= 0), False, on_ground)
+        coyote = np.where(airborne & (coyote > 0), coyote - 1, coyote)
+
+        # Saut (tampon ou touche maintenue) et rotation
+        buffer = self.jump_buffer[idx]
+        can_jump = on_ground | (coyote > 0)
+        jumping = can_jump & ((buffer > 0) | self.jump_held[idx])
+        vel_y = np.where(jumping, JUMP_FORCE, vel_y)
+        on_ground = on_ground & ~jumping
+        coyote = np.where(jumping, 0, coyote)
+        pos_y = np.where(jumping, rect_y.astype(np.float64), pos_y)
+        buffer = np.where(jumping, 0, np.where(buffer > 0, buffer - 1, buffer))
+        rotation = np.where(on_ground, 0.0, (self.rotation[idx] + AIR_ROTATION_SPEED) % 360)
+
+        dead = self._hits_spikes(rect_x, rect_y) | (rect_y > HEIGHT + 200)
+        won = ~dead & (rect_x >= self.level.finish_x)
+        state = np.where(dead, BATCH_DEAD, np.where(won, BATCH_WIN, BATCH_PLAYING)).astype(np.int8)
+        finished = state != BATCH_PLAYING
+        buffer = np.where(finished, 0, buffer)
+
+        target_cam = np.maximum(0.0, (rect_x + size // 2) - CAMERA_OFFSET_X)
+        cam_x = self.cam_x[idx]
+        cam_x = cam_x + (target_cam - cam_x) * 0.12
+
+        self.pos_x[idx] = pos_x
+        self.rect_x[idx] = rect_x
+        self.pos_y[idx] = pos_y
+        self.rect_y[idx] = rect_y
+        self.prev_top[idx] = prev_top
+        self.prev_bottom[idx] = prev_bottom
+        self.vel_y[idx] = vel_y
+        self.on_ground[idx] = on_ground
+        self.coyote_frames[idx] = coyote
+        self.rotation[idx] = rotation
+        self.jump_buffer[idx] = buffer
+        self.jump_held[idx] = self.jump_held[idx] & ~finished
+        self.cam_x[idx] = cam_x
+        self.state[idx] = state
+
+    def _hits_spikes(self, rect_x: np.ndarray, rect_y: np.ndarray) -> np.ndarray:
+        size = PLAYER_SIZE
+        rows, cols = _candidates(self._spk_left, self._spk_max_width, rect_x, rect_x + size)
+        if not rows.size:
+            return np.zeros(rect_x.size, dtype=bool)
+        px0 = rect_x[rows]
+        py0 = rect_y[rows]
+        box = (
+            (px0 < self._spk_right[cols])
+            & (px0 + size > self._spk_left[cols])
+            & (py0 < self._spk_bottom[cols])
+            & (py0 + size > self._spk_top[cols])
+        )
+        if not box.any():
+            return np.zeros(rect_x.size, dtype=bool)
+        rows = rows[box]
+        cols = cols[box]
+        cx = self._spk_cx[cols]
+        cy = self._spk_cy[cols]
+        k1 = self._spk_k1[cols]
+        k2 = self._spk_k2[cols]
+        k3 = self._spk_k3[cols]
+        k4 = self._spk_k4[cols]
+        denom = self._spk_denom[cols]
+        valid = denom != 0
+        safe_denom = np.where(valid, denom, 1)
+        left = rect_x[rows]
+        bottom = rect_y[rows] + size
+        inside = np.zeros(rows.size, dtype=bool)
+        # Mêmes points de test et même calcul barycentrique que Spike.collides
+        for px, py in ((left, bottom), (left + size, bottom), (left + size // 2, rect_y[rows] + size // 2)):
+            dx = px - cx
+            dy = py - cy
+            u = (k1 * dx + k2 * dy) / safe_denom
+            v = (k3 * dx + k4 * dy) / safe_denom
+            w = 1 - u - v
+            inside |= (u >= 0) & (u <= 1) & (v >= 0) & (v <= 1) & (w >= 0) & (w <= 1)
+        hits = np.zeros(rect_x.size, dtype=bool)
+        hits[rows[inside & valid]] = True
+        return hits
+
+
+def _candidates(lefts: np.ndarray, max_width: int, x0: np.ndarray, x1: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Paires (cube, objet) dont les intervalles peuvent se chevaucher, objets triés par bord gauche.
+
+    Chaque cube ne voit que sa propre tranche d'objets : le coût suit le nombre
+    de cubes, même répartis sur tout le niveau.
+    """
+    lo = np.searchsorted(lefts, x0 - max_width, side="left")
+    hi = np.searchsorted(lefts, x1, side="right")
+    counts = hi - lo
+    rows = np.repeat(np.arange(x0.size), counts)
+    starts = np.cumsum(counts) - counts
+    cols = np.arange(rows.size) + np.repeat(lo - starts, counts)
+    return rows, cols
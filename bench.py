@@ -0,0 +1,437 @@
+"""Banc d'essai headless des chemins critiques : physique, collisions et rendu.
+
+``python bench.py --output base.json`` enregistre les mesures (ns par pas de
+simulation, ms par image) sur des niveaux générés de 10 à 100k objets ;
+``--compare base.json`` échoue si une mesure ralentit au-delà de ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from layers import StaticLayers
+from level import Level
+from main import create_fonts, create_vertical_gradient, draw_background, draw_hud
+from objects import GroundSection, Player, Spike
+from simulation import STATE_PLAYING, Simulation
+from settings import (
+    AIR_ROTATION_SPEED,
+    BACKGROUND_GRADIENT_BOTTOM,
+    BACKGROUND_GRADIENT_TOP,
+    CAMERA_OFFSET_X,
+    GROUND_HEIGHT,
+    HEIGHT,
+    PLAYER_SIZE,
+    RUN_SPEED,
+    SPIKE_SIZE,
+    WIDTH,
+)
+
+
+def legacy_spike_collides(spike: Spike, player_rect: pygame.Rect) -> bool:
+    """Ancien test de collision d'un pic (Rect et listes créés à chaque appel)."""
+    spike_box = spike.rect
+    if not spike_box.colliderect(player_rect):
+        return False
+    a = (spike_box.left, spike_box.bottom)
+    b = (spike_box.centerx, spike_box.top)
+    c = (spike_box.right, spike_box.bottom)
+    test_points = [
+        (player_rect.left, player_rect.bottom),
+        (player_rect.right, player_rect.bottom),
+        (player_rect.centerx, player_rect.centery),
+    ]
+    return any(_legacy_point_in_triangle(p, a, b, c) for p in test_points)
+
+
+def _legacy_point_in_triangle(p: Tuple[int, int], a, b, c) -> bool:
+    (px, py) = p
+    (ax, ay) = a
+    (bx, by) = b
+    (cx, cy) = c
+    denom = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
+    if denom == 0:
+        return False
+    u = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / denom
+    v = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / denom
+    w = 1 - u - v
+    return 0 <= u <= 1 and 0 <= v <= 1 and 0 <= w <= 1
+
+
+def _spike_probes(count: int, seed: int = 0) -> List[Tuple[Spike, pygame.Rect]]:
+    """Paires (pic, rectangle joueur) autour des pics, pour moitié en contact."""
+    rng = random.Random(seed)
+    base_y = HEIGHT - GROUND_HEIGHT
+    probes = []
+    for _ in range(count):
+        spike = Spike(rng.randint(0, 4000), base_y, size=SPIKE_SIZE)
+        x = int(spike.x) + rng.randint(-PLAYER_SIZE - 4, SPIKE_SIZE + 4)
+        y = base_y - PLAYER_SIZE + rng.randint(-SPIKE_SIZE - 8, 8)
+        probes.append((spike, pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)))
+    return probes
+
+
+def _best_time(func: Callable[[], object], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        best = min(best, time.perf_counter_ns() - start)
+    return best
+
+
+def bench_spike_collision(count: int = 20000) -> Dict[str, float]:
+    probes = _spike_probes(count)
+    legacy = [legacy_spike_collides(spike, rect) for spike, rect in probes]
+    compiled = [spike.collides(rect) for spike, rect in probes]
+    if legacy != compiled:
+        raise RuntimeError("Spike.collides ne donne pas le même résultat que l'ancien test.")
+
+    legacy_ns = _best_time(lambda: [legacy_spike_collides(spike, rect) for spike, rect in probes])
+    compiled_ns = _best_time(lambda: [spike.collides(rect) for spike, rect in probes])
+    return {
+        "probes": count,
+        "hits": sum(compiled),
+        "legacy_ns_per_test": legacy_ns / count,
+        "compiled_ns_per_test": compiled_ns / count,
+        "speedup": legacy_ns / compiled_ns,
+    }
+
+
+def synthetic_level(objects: int, seed: int = 0) -> Level:
+    """Niveau généré d'environ ``objects`` objets : une plateforme puis un pic, en alternance."""
+    rng = random.Random(seed)
+    base_y = HEIGHT - GROUND_HEIGHT
+    sections: List[GroundSection] = []
+    spikes: List[Spike] = []
+    x = 0
+    while len(sections) + len(spikes) < max(objects, 1):
+        width = rng.randint(280, 640)
+        sections.append(GroundSection(pygame.Rect(x, base_y, width, GROUND_HEIGHT)))
+        if len(sections) > 1 and len(sections) + len(spikes) < objects:
+            spikes.append(Spike(x + rng.randint(60, width - SPIKE_SIZE - 20), base_y, size=SPIKE_SIZE))
+        x += width + rng.randint(80, 140)
+    return Level(sections, spikes)
+
+
+def _per_call(func: Callable[[], object], calls: int, baseline: Optional[Callable[[], object]] = None) -> float:
+    """Durée d'un appel en ns, hors coût de ``baseline`` (la même boucle sans l'appel mesuré)."""
+    elapsed = _best_time(func)
+    if baseline is not None:
+        elapsed = max(0.0, elapsed - _best_time(baseline))
+    return elapsed / calls
+
+
+def _probe_positions(level: Level, count: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """Positions de joueur réparties sur tout le niveau, au ras du sol ou près d'un pic."""
+    base_y = HEIGHT - GROUND_HEIGHT
+    # Copies du niveau entier (relu à chaque accès pour un niveau .gdl)
+    sections = level.sections
+    spikes = level.spikes
+    positions = []
+    for _ in range(count):
+        if spikes and rng.random() < 0.5:
+            x = int(rng.choice(spikes).x) + rng.randint(-PLAYER_SIZE - 4, SPIKE_SIZE + 4)
+        else:
+            section = rng.choice(sections).rect
+            x = rng.randint(section.left - PLAYER_SIZE, section.right)
+        positions.append((x, base_y - PLAYER_SIZE + rng.randint(-SPIKE_SIZE - 8, 8)))
+    return positions
+
+
+def bench_simulation(level: Level, steps: int = 20000, seed: int = 0) -> Dict[str, float]:
+    """Coût par appel (ns) de la physique, des collisions et d'un pas complet de ``Simulation``."""
+    rng = random.Random(seed)
+    positions = _probe_positions(level, steps, rng)
+    player = Player(level.player_spawn)
+    rect = player.rect
+
+    def gravity() -> None:
+        player.reset()
+        for _ in range(steps):
+            player.apply_gravity()
+
+    def place_only() -> None:
+        for x, y in positions:
+            rect.update(x, y, PLAYER_SIZE, PLAYER_SIZE)
+            player.prev_bottom = y + PLAYER_SIZE - 2
+            player.vel_y = 2.0
+
+    def ground() -> None:
+        for x, y in positions:
+            rect.update(x, y, PLAYER_SIZE, PLAYER_SIZE)
+            player.prev_bottom = y + PLAYER_SIZE - 2
+            player.vel_y = 2.0
+            player.handle_ground(level.ground_iter(x, x + PLAYER_SIZE))
+
+    def probe_only() -> None:
+        for x, y in positions:
+            rect.update(x, y, PLAYER_SIZE, PLAYER_SIZE)
+
+    def spikes() -> None:
+        for x, y in positions:
+            rect.update(x, y, PLAYER_SIZE, PLAYER_SIZE)
+            level.hits_spike(rect)
+
+    # Chaque essai repart d'une plateforme tirée au hasard pour parcourir tout le niveau.
+    sim = Simulation(level)
+    starts = [(section.rect.left + 8, section.rect.top - PLAYER_SIZE) for section in rng.sample(level.sections, min(len(level.sections), 256))]
+
+    def step() -> None:
+        restarts = 0
+        for _ in range(steps):
+            if sim.state != STATE_PLAYING:
+                sim.start_run(True)
+                sim.player.reset(starts[restarts % len(starts)])
+                restarts += 1
+            sim.update()
+
+    return {
+        "apply_gravity_ns": _per_call(gravity, steps),
+        "handle_ground_ns": _per_call(ground, steps, place_only),
+        "hits_spike_ns": _per_call(spikes, steps, probe_only),
+        "step_ns": _per_call(step, steps),
+    }
+
+
+def bench_rendering(level: Level, screen: pygame.Surface, frames: int = 240) -> Dict[str, float]:
+    """Durée d'une image (ms) de chaque étape du rendu, caméra en défilement continu à mi-parcours."""
+    gradient = create_vertical_gradient(screen.get_size(), BACKGROUND_GRADIENT_TOP, BACKGROUND_GRADIENT_BOTTOM)
+    fonts = create_fonts()
+    player = Player(level.player_spawn)
+    start = max(0.0, level.finish_x / 2 - CAMERA_OFFSET_X)
+    cams = [start + index * RUN_SPEED for index in range(frames)]
+
+    def direct_background() -> None:
+        for cam_x in cams:
+            draw_background(screen, gradient, cam_x, level)
+
+    def direct_level() -> None:
+        for cam_x in cams:
+            level.draw(screen, cam_x)
+
+    def player_draw() -> None:
+        cam_x = player.rect.centerx - CAMERA_OFFSET_X
+        for index in range(frames):
+            player.rotation = (index * AIR_ROTATION_SPEED) % 360
+            player.draw(screen, cam_x)
+
+    def hud() -> None:
+        for index in range(frames):
+            draw_hud(screen, fonts, index / frames, 3, STATE_PLAYING)
+
+    # Nouveaux calques à chaque essai : la construction des tuiles fait partie du coût mesuré.
+    def tiled_background() -> None:
+        layers = StaticLayers(level, gradient, screen.get_size())
+        for cam_x in cams:
+            layers.draw_background(screen, cam_x)
+
+    def tiled_level() -> None:
+        layers = StaticLayers(level, gradient, screen.get_size())
+        for cam_x in cams:
+            layers.draw_level(screen, cam_x)
+
+    timings = {
+        "draw_background_ms": direct_background,
+        "level_draw_ms": direct_level,
+        "layers_background_ms": tiled_background,
+        "layers_level_ms": tiled_level,
+        "player_draw_ms": player_draw,
+        "draw_hud_ms": hud,
+    }
+    return {name: _best_time(func, repeat=3) / frames / 1e6 for name, func in timings.items()}
+
+
+def bench_particles(screen: pygame.Surface, count: int = 10_000, frames: int = 240) -> Dict[str, float]:
+    """Durée (ms) d'un pas et d'un rendu de ``count`` particules vivantes, toutes à l'écran."""
+    # Import local : seules les particules ont besoin de NumPy.
+    from particles import KIND_DUST, KIND_SPARK, KIND_TRAIL, ParticleSystem
+
+    particles = ParticleSystem(count, seed=0)
+    lifetime = (10 * frames, 20 * frames)
+    for kind in (KIND_TRAIL, KIND_DUST, KIND_SPARK):
+        particles.emit(kind, WIDTH / 2, HEIGHT / 2, count // 3 + 1, (0.0, 0.5), (0, 360), lifetime, spread=HEIGHT / 2)
+    # Sans gravité, pour que toutes restent visibles pendant la mesure.
+    particles.gravity[:] = 0.0
+
+    def update() -> None:
+        for _ in range(frames):
+            particles.update()
+
+    def draw() -> None:
+        for _ in range(frames):
+            particles.draw(screen, 0.0)
+
+    return {
+        "live": len(particles),
+        "particles_update_ms": _best_time(update, repeat=3) / frames / 1e6,
+        "particles_draw_ms": _best_time(draw, repeat=3) / frames / 1e6,
+    }
+
+
+def bench_ghosts(screen: pygame.Surface, count: int = 100, frames: int = 240) -> Dict[str, float]:
+    """Durée (ms) d'un rendu de ``count`` fantômes qui courent tous dans la fenêtre de la caméra."""
+    # Import local : les fantômes ont besoin de NumPy.
+    import numpy as np
+
+    from ghosts import GHOST_DTYPE, GhostRenderer, GhostTrack
+
+    rng = random.Random(0)
+    steps = np.arange(frames)
+    tracks = []
+    for _ in range(count):
+        track = np.zeros(frames, dtype=GHOST_DTYPE)
+        track["x"] = 80 + steps * RUN_SPEED + rng.randint(-WIDTH // 4, WIDTH // 2)
+        track["y"] = HEIGHT - GROUND_HEIGHT - PLAYER_SIZE - rng.randint(0, 200)
+        track["rotation"] = (steps + rng.randrange(40)) % round(360 / AIR_ROTATION_SPEED)
+        tracks.append(GhostTrack(track))
+    renderer = GhostRenderer(tracks)
+    renderer.atlas
+
+    def draw() -> None:
+        for frame in range(frames):
+            renderer.draw(screen, frame, max(0.0, frame * RUN_SPEED + 80 - CAMERA_OFFSET_X), 0.5)
+
+    return {"ghosts": count, "ghosts_draw_ms": _best_time(draw, repeat=3) / frames / 1e6}
+
+
+def bench_env(level: Level, envs: int = 4096, steps: int = 100) -> Dict[str, float]:
+    """Durée (ns) d'un pas d'environnement d'entraînement, parties réparties sur tout le niveau."""
+    # Import local : l'environnement vectorisé a besoin de NumPy.
+    import numpy as np
+
+    from env import VectorEnv
+
+    env = VectorEnv(level, envs)
+    env.reset()
+    rng = np.random.default_rng(0)
+    actions = rng.random((steps, envs)) < 0.05
+    # Parties lancées à des instants différents, comme après quelques relances.
+    env.sim.pos_x[:] = rng.uniform(level.player_spawn[0], level.finish_x, envs)
+    env.sim.rect_x[:] = np.rint(env.sim.pos_x)
+
+    def step() -> None:
+        for row in actions:
+            env.step(row)
+
+    return {"env_step_ns": _best_time(step, repeat=3) / (steps * envs)}
+
+
+BENCH_SIZES = (10, 1_000, 10_000, 100_000)
+METRIC_SUFFIXES = ("_ns", "_ms", "_ns_per_test")
+
+
+def run_suite(sizes: Sequence[int] = BENCH_SIZES, steps: int = 20000, frames: int = 240) -> Dict[str, object]:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    results: Dict[str, object] = {
+        "spike_collision": bench_spike_collision(),
+        "particles": bench_particles(screen, frames=frames),
+        "ghosts": bench_ghosts(screen, frames=frames),
+    }
+    for size in sizes:
+        started = time.perf_counter_ns()
+        level = synthetic_level(size)
+        build_ms = (time.perf_counter_ns() - started) / 1e6
+        results[f"level_{size}"] = {
+            "objects": len(level.sections) + len(level.spikes),
+            "build_ms": build_ms,
+            **bench_simulation(level, steps),
+            **bench_rendering(level, screen, frames),
+            **bench_env(level),
+        }
+    pygame.quit()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "steps": steps,
+            "frames": frames,
+        },
+        "results": results,
+    }
+
+
+def _flatten(results: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    return {f"{group}.{key}": value for group, metrics in results.items() for key, value in metrics.items()}
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> List[str]:
+    """Affiche le rapport nouveau/ancien des durées et renvoie celles qui dépassent ``1 + threshold``."""
+    before = _flatten(baseline["results"])
+    after = _flatten(current["results"])
+    regressions = []
+    for name, old in before.items():
+        new = after.get(name)
+        if new is None or not name.endswith(METRIC_SUFFIXES) or name.endswith("build_ms"):
+            continue
+        ratio = new / old if old else float("inf") if new else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  << régression"
+        print(f"{name:<42} {old:12.4f} -> {new:12.4f}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def _print_results(results: Dict[str, Dict[str, float]]) -> None:
+    for group, metrics in results.items():
+        print(group)
+        for key, value in metrics.items():
+            print(f"  {key:>22}: {value:.4f}" if isinstance(value, float) else f"  {key:>22}: {value}")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Banc d'essai headless de la simulation et du rendu.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCH_SIZES), help="Nombre d'objets des niveaux générés.")
+    parser.add_argument("--steps", type=int, default=20000, help="Pas de simulation mesurés par niveau.")
+    parser.add_argument("--frames", type=int, default=240, help="Images rendues mesurées par niveau.")
+    parser.add_argument("--output", help="Écrit les résultats au format JSON.")
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        metavar="JSON",
+        help="Compare à un JSON de référence (les mesures courantes, ou un second JSON sans relancer le banc).",
+    )
+    parser.add_argument("--threshold", type=float, default=0.10, help="Ralentissement toléré avant échec (0.10 = 10 %%).")
+    args = parser.parse_args(argv)
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare attend un ou deux fichiers")
+    return args
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1], encoding="utf-8") as handle:
+            report = json.load(handle)
+    else:
+        report = run_suite(args.sizes, args.steps, args.frames)
+        _print_results(report["results"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} mesure(s) plus lente(s) de plus de {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,75 @@
+"""Mode de rendu par rectangles modifiés (``pygame.display.update(rects)``)."""
+
+from __future__ import annotations
+
+from typing import Hashable, List, Optional, Sequence
+
+import pygame
+
+FULL_REDRAW_RATIO = 0.5
+
+
+class DirtyRegions:
+    """Décide, image par image, quelles zones redessiner et envoyer à l'écran.
+
+    Tant que la caméra est immobile et que la scène ne change pas (menu,
+    bannières de fin), seules les zones touchées à l'image précédente et à
+    l'image courante sont redessinées. Si la caméra bouge, tout le décor défile :
+    on retombe sur un ``flip`` complet.
+    """
+
+    def __init__(self, screen_rect: pygame.Rect, full_ratio: float = FULL_REDRAW_RATIO) -> None:
+        self.screen_rect = pygame.Rect(screen_rect)
+        self.full_ratio = full_ratio
+        self._prev_rects: List[pygame.Rect] = []
+        self._prev_cam: Optional[float] = None
+        self._prev_scene: Hashable = None
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.idle_frames = 0
+
+    def invalidate(self) -> None:
+        """Force un rendu complet à la prochaine image."""
+        self._prev_cam = None
+
+    def plan(self, cam_x: float, scene: Hashable, rects: Sequence[pygame.Rect]) -> Optional[List[pygame.Rect]]:
+        """Renvoie ``None`` pour une image complète, sinon la liste des zones à redessiner."""
+        full = self._prev_cam is None or cam_x != self._prev_cam or scene != self._prev_scene
+        damaged = _merge([rect.clip(self.screen_rect) for rect in [*self._prev_rects, *rects]])
+        self._prev_cam = cam_x
+        self._prev_scene = scene
+        self._prev_rects = [pygame.Rect(rect) for rect in rects]
+        if not full:
+            area = sum(rect.width * rect.height for rect in damaged)
+            full = area > self.full_ratio * self.screen_rect.width * self.screen_rect.height
+        if full:
+            self.full_frames += 1
+            return None
+        if damaged:
+            self.partial_frames += 1
+        else:
+            self.idle_frames += 1
+        return damaged
+
+    @staticmethod
+    def present(regions: Optional[List[pygame.Rect]]) -> None:
+        if regions is None:
+            pygame.display.flip()
+        elif regions:
+            pygame.display.update(regions)
+
+
+def _merge(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """Fusionne les rectangles qui se chevauchent et retire les vides."""
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        rect = pygame.Rect(rect)
+        overlapping = rect.collidelistall(merged)
+        while overlapping:
+            for index in reversed(overlapping):
+                rect.union_ip(merged.pop(index))
+            overlapping = rect.collidelistall(merged)
+        merged.append(rect)
+    return merged
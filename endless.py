@@ -0,0 +1,210 @@
+"""Mode sans fin : niveau généré tranche par tranche à partir d'une graine.
+
+Chaque tranche de ``CHUNK_WIDTH`` pixels ne dépend que de (graine, indice) :
+une même graine redonne toujours le même parcours. Les tranches sont produites
+sur un fil de travail, en avance sur la caméra, et oubliées une fois derrière.
+Les écarts et les pics respectent des marges calculées à partir de la physique
+de ``settings.py``, ce qui garantit que chaque tranche est franchissable.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import pygame
+
+from level import Level
+from level_file import _ChunkQuery
+from objects import GroundSection, Spike
+from settings import (
+    GRAVITY,
+    GROUND_HEIGHT,
+    HEIGHT,
+    JUMP_FORCE,
+    MAX_FALL_SPEED,
+    PLAYER_SIZE,
+    RUN_SPEED,
+    SPIKE_SIZE,
+    WIDTH,
+)
+
+CHUNK_WIDTH = 4096
+STREAM_AHEAD = 2 * WIDTH
+STREAM_BEHIND = WIDTH
+# Tranches demandées au fil de travail au-delà de la fenêtre visible
+PREFETCH_CHUNKS = 2
+SPIKE_CHANCE = 0.8
+
+
+def _jump_arc() -> Tuple[int, float]:
+    """Durée (en pas) et hauteur maximale d'un saut depuis un sol plat, comme dans ``Player``."""
+    vel_y = JUMP_FORCE
+    height = 0.0
+    peak = 0.0
+    frames = 0
+    while True:
+        vel_y = min(vel_y + GRAVITY, MAX_FALL_SPEED)
+        height -= vel_y
+        frames += 1
+        peak = max(peak, height)
+        if height <= 0:
+            return frames, peak
+
+
+JUMP_FRAMES, JUMP_HEIGHT = _jump_arc()
+JUMP_DISTANCE = JUMP_FRAMES * RUN_SPEED
+# Marges volontairement larges : un écart ne dépasse jamais la moitié d'un saut
+# et un groupe de pics laisse un saut complet de sol de chaque côté.
+MIN_GAP = PLAYER_SIZE
+MAX_GAP = max(MIN_GAP, int(JUMP_DISTANCE / 2))
+MAX_SPIKE_GROUP = max(0, int((JUMP_DISTANCE / 2 - PLAYER_SIZE) // SPIKE_SIZE)) if JUMP_HEIGHT > SPIKE_SIZE else 0
+SPIKE_CLEARANCE = int(JUMP_DISTANCE) + PLAYER_SIZE
+MIN_SECTION = 2 * SPIKE_CLEARANCE + MAX_SPIKE_GROUP * SPIKE_SIZE
+MAX_SECTION = MIN_SECTION + 2 * WIDTH // 3
+
+
+class EndlessChunk:
+    __slots__ = ("index", "sections", "spikes")
+
+    def __init__(self, index: int, sections: List[GroundSection], spikes: List[Spike]) -> None:
+        self.index = index
+        self.sections = sections
+        self.spikes = spikes
+
+
+class ChunkGenerator:
+    """Produit les tranches d'une graine ; ``generate`` est sans état partagé (utilisable depuis un fil)."""
+
+    def __init__(self, seed: int, chunk_width: int = CHUNK_WIDTH) -> None:
+        self.seed = seed
+        self.chunk_width = chunk_width
+
+    def generate(self, index: int) -> EndlessChunk:
+        rng = random.Random(f"{self.seed}:{index}")
+        base_y = HEIGHT - GROUND_HEIGHT
+        x = index * self.chunk_width
+        # Les sections restent dans leur tranche ; l'écart de fin mène à la suivante.
+        end = x + self.chunk_width - rng.randint(MIN_GAP, MAX_GAP)
+        sections = []
+        spikes = []
+        while x < end:
+            width = rng.randint(MIN_SECTION, MAX_SECTION)
+            gap = rng.randint(MIN_GAP, MAX_GAP)
+            if x + width + gap + MIN_SECTION > end:
+                width = end - x
+            sections.append(GroundSection(pygame.Rect(x, base_y, width, GROUND_HEIGHT)))
+            # La première section du parcours reste libre pour le départ.
+            if MAX_SPIKE_GROUP and (index > 0 or len(sections) > 1) and rng.random() < SPIKE_CHANCE:
+                group = rng.randint(1, MAX_SPIKE_GROUP)
+                spike_x = rng.randint(x + SPIKE_CLEARANCE, x + width - SPIKE_CLEARANCE - group * SPIKE_SIZE)
+                spikes.extend(Spike(spike_x + i * SPIKE_SIZE, base_y, size=SPIKE_SIZE) for i in range(group))
+            x += width + gap
+        return EndlessChunk(index, sections, spikes)
+
+
+class EndlessLevel(Level):
+    """Niveau infini : ``finish_x`` vaut ``math.inf`` et seules les tranches proches de la caméra existent.
+
+    ``stream`` commande les tranches à venir au fil de travail et récupère
+    celles qui sont prêtes, sans jamais attendre. Une requête sur une tranche
+    pas encore livrée (cas anormal, compté dans ``stalls``) l'attend ou la
+    génère sur place : la physique ne voit jamais de trou.
+
+    Les tranches du départ sont générées à la construction et gardées à part :
+    ``reset`` les remet en place sans repasser par le fil de travail.
+    """
+
+    def __init__(self, seed: int = 0, chunk_width: int = CHUNK_WIDTH) -> None:
+        self.seed = seed
+        self.generator = ChunkGenerator(seed, chunk_width)
+        self.chunk_width = chunk_width
+        self.player_spawn: Tuple[float, float] = (80.0, float(HEIGHT - GROUND_HEIGHT - PLAYER_SIZE))
+        self.finish_x = math.inf
+        self.length = math.inf
+        self._build_background_columns()
+        self.section_index = _ChunkQuery(self._sections_in)
+        self.spike_index = _ChunkQuery(self._spikes_in)
+        first, last = self._window(0.0)
+        self._spawn_chunks = {index: self.generator.generate(index) for index in range(first, last + 1)}
+        self._chunks: Dict[int, EndlessChunk] = dict(self._spawn_chunks)
+        self._pending: Dict[int, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="endless")
+        self.generated = len(self._spawn_chunks)
+        self.discarded = 0
+        self.stalls = 0
+
+    @property
+    def sections(self) -> List[GroundSection]:
+        return [section for index in sorted(self._chunks) for section in self._chunks[index].sections]
+
+    @property
+    def spikes(self) -> List[Spike]:
+        return [spike for index in sorted(self._chunks) for spike in self._chunks[index].spikes]
+
+    @property
+    def resident(self) -> List[int]:
+        return sorted(self._chunks)
+
+    def reset(self) -> None:
+        self.stream(0.0)
+
+    def _window(self, cam_x: float) -> Tuple[int, int]:
+        first = max(0, math.floor((cam_x - STREAM_BEHIND) / self.chunk_width))
+        last = math.floor((cam_x + WIDTH + STREAM_AHEAD) / self.chunk_width) + PREFETCH_CHUNKS
+        return first, last
+
+    def stream(self, cam_x: float) -> None:
+        first, last = self._window(cam_x)
+        for index in [index for index in self._chunks if not first <= index <= last]:
+            del self._chunks[index]
+            self.discarded += 1
+        for index in [index for index in self._pending if not first <= index <= last]:
+            self._pending.pop(index).cancel()
+        for index, future in list(self._pending.items()):
+            if future.done():
+                self._chunks[index] = future.result()
+                del self._pending[index]
+        for index in range(first, last + 1):
+            if index in self._spawn_chunks:
+                self._chunks[index] = self._spawn_chunks[index]
+            elif index not in self._chunks and index not in self._pending:
+                self._pending[index] = self._executor.submit(self.generator.generate, index)
+                self.generated += 1
+
+    def _chunk(self, index: int) -> EndlessChunk:
+        chunk = self._chunks.get(index)
+        if chunk is not None:
+            return chunk
+        self.stalls += 1
+        future = self._pending.pop(index, None)
+        chunk = future.result() if future is not None and not future.cancelled() else self.generator.generate(index)
+        self._chunks[index] = chunk
+        return chunk
+
+    def _chunk_range(self, x0: float, x1: float) -> range:
+        return range(max(0, math.floor(x0 / self.chunk_width)), max(0, math.floor(x1 / self.chunk_width) + 1))
+
+    def _sections_in(self, x0: float, x1: float) -> List[GroundSection]:
+        found = []
+        for index in self._chunk_range(x0, x1):
+            for section in self._chunk(index).sections:
+                if section.rect.left <= x1 and section.rect.right >= x0:
+                    found.append(section)
+        return found
+
+    def _spikes_in(self, x0: float, x1: float) -> List[Spike]:
+        found = []
+        for index in self._chunk_range(x0, x1):
+            for spike in self._chunk(index).spikes:
+                if spike.x <= x1 and spike.x + spike.size >= x0:
+                    found.append(spike)
+        return found
+
+    def _draw_finish(self, surface: pygame.Surface, cam_x: float) -> None:
+        """Pas de ligne d'arrivée."""
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
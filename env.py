@@ -0,0 +1,324 @@
+"""Environnement vectorisé, à la Gym, pour entraîner des politiques de saut sur la physique du jeu.
+
+``VectorEnv`` fait avancer ``num_envs`` parties d'un même niveau en un seul
+appel à ``step`` sur une ``BatchSimulation`` ; rien n'est dessiné sauf appel
+explicite à ``render``. L'observation de chaque partie est un vecteur de taille
+fixe (``OBSERVATION_NAMES``) lu dans la géométrie du niveau : état du cube, puis
+distance et hauteur des prochains pics et des prochains trous du sol.
+``ShardedVectorEnv`` répartit les parties entre plusieurs processus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import time
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pygame
+
+from batch import BATCH_DEAD, BATCH_PLAYING, BATCH_WIN, BatchSimulation
+from level import Level
+from level_file import LevelSource, level_source, load_source, open_level
+from settings import (
+    AIR_ROTATION_SPEED,
+    ENV_DEATH_REWARD,
+    ENV_GAPS_AHEAD,
+    ENV_SPIKES_AHEAD,
+    ENV_VIEW_DISTANCE,
+    ENV_WIN_REWARD,
+    HEIGHT,
+    MAX_FALL_SPEED,
+    PLAYER_SIZE,
+    WIDTH,
+)
+
+# Hauteurs en tailles de cube, distances et largeurs en ENV_VIEW_DISTANCE
+# (bornées à [-1, 1] ; un obstacle absent est à 1 avec une hauteur nulle).
+OBSERVATION_NAMES: Tuple[str, ...] = (
+    ("height", "vel_y", "can_jump")
+    + tuple(f"spike{i}_{field}" for i in range(ENV_SPIKES_AHEAD) for field in ("dx", "height"))
+    + tuple(f"gap{i}_{field}" for i in range(ENV_GAPS_AHEAD) for field in ("dx", "width", "rise"))
+)
+OBSERVATION_SIZE = len(OBSERVATION_NAMES)
+_SPIKES_AT = 3
+_GAPS_AT = _SPIKES_AT + 2 * ENV_SPIKES_AHEAD
+
+StepResult = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]
+
+
+def level_gaps(level: Level) -> List[Tuple[float, float, float]]:
+    """Trous du sol (gauche, droite, haut du sol qui suit), triés ; le dernier peut aller jusqu'à l'arrivée."""
+    extents = sorted((section.rect.left, section.rect.right, section.rect.top) for section in level.ground_iter())
+    gaps = []
+    # Sans sol, tout le trajet jusqu'à l'arrivée est un trou.
+    reach = extents[0][1] if extents else level.player_spawn[0]
+    for left, right, top in extents[1:]:
+        if left > reach:
+            gaps.append((float(reach), float(left), float(top)))
+        elif gaps and left == gaps[-1][1]:
+            # Plusieurs sections au bord du trou : on retient la plus haute.
+            gaps[-1] = (gaps[-1][0], gaps[-1][1], min(gaps[-1][2], float(top)))
+        reach = max(reach, right)
+    if level.finish_x > reach:
+        gaps.append((float(reach), float(level.finish_x), float(HEIGHT)))
+    return gaps
+
+
+class VectorEnv:
+    """``num_envs`` parties du même niveau avancées ensemble, avec l'API des environnements vectorisés de Gym.
+
+    Une action par partie : non nulle, le saut est maintenu pendant le pas
+    (l'appui est déduit du passage de 0 à 1). La récompense est la progression
+    gagnée pendant le pas (1 sur tout le niveau), plus ``ENV_WIN_REWARD`` ou
+    ``ENV_DEATH_REWARD`` au pas qui termine la partie. Une partie terminée
+    (ou tronquée après ``max_steps`` pas) est relancée aussitôt : l'observation
+    renvoyée est alors celle du départ et la dernière est dans
+    ``info["final_observation"]``.
+    """
+
+    def __init__(self, level: Optional[Level] = None, num_envs: int = 1, max_steps: Optional[int] = None) -> None:
+        self.level = level if level is not None else Level()
+        self.num_envs = int(num_envs)
+        self.max_steps = max_steps
+        self.sim = BatchSimulation(self.level, self.num_envs)
+        self.episode_steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._held = np.zeros(self.num_envs, dtype=bool)
+        self._surface: Optional[pygame.Surface] = None
+        self._compile_obstacles()
+
+    def _compile_obstacles(self) -> None:
+        # Obstacles triés par bord droit : ceux encore devant un cube commencent
+        # au premier bord droit qui le dépasse. Des entrées fictives (loin
+        # devant) complètent toujours les ENV_*_AHEAD suivants.
+        far = float(self.level.finish_x) + 2 * ENV_VIEW_DISTANCE
+        spikes = sorted((spike.x + spike.size, spike.x, spike.base_y - spike.size) for spike in self.level.spikes)
+        spikes += [(far, far, 0.0)] * ENV_SPIKES_AHEAD
+        self._spike_right, self._spike_left, self._spike_top = (np.array(column, dtype=np.float64) for column in zip(*spikes))
+        self._spike_count = len(spikes) - ENV_SPIKES_AHEAD
+        gaps = [(right, left, top) for left, right, top in level_gaps(self.level)]
+        gaps += [(far, far, 0.0)] * ENV_GAPS_AHEAD
+        self._gap_right, self._gap_left, self._gap_top = (np.array(column, dtype=np.float64) for column in zip(*gaps))
+        self._gap_count = len(gaps) - ENV_GAPS_AHEAD
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Relance toutes les parties ; ``seed`` n'existe que pour l'API Gym (la physique est déterministe)."""
+        self.sim.reset()
+        self.episode_steps[:] = 0
+        self._held[:] = False
+        return self.observe(), {}
+
+    def step(self, actions: Union[np.ndarray, bool]) -> StepResult:
+        """Avance toutes les parties d'un pas : ``(observations, récompenses, terminées, tronquées, info)``."""
+        sim = self.sim
+        held = np.broadcast_to(np.asarray(actions) != 0, (self.num_envs,))
+        pressed = held & ~self._held
+        self._held[:] = held
+        playing = sim.state == BATCH_PLAYING
+        before = self.progress()
+        state = sim.step(pressed, held)
+        progress = self.progress()
+
+        reward = progress - before
+        reward[playing & (state == BATCH_WIN)] += ENV_WIN_REWARD
+        reward[playing & (state == BATCH_DEAD)] += ENV_DEATH_REWARD
+        terminated = state != BATCH_PLAYING
+        self.episode_steps += 1
+        if self.max_steps is None:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        else:
+            truncated = ~terminated & (self.episode_steps >= self.max_steps)
+
+        obs = self.observe()
+        info: Dict[str, np.ndarray] = {"progress": progress, "won": state == BATCH_WIN}
+        done = terminated | truncated
+        if done.any():
+            info["final_observation"] = obs.copy()
+            sim.reset(mask=done)
+            self.episode_steps[done] = 0
+            self._held[done] = False
+            obs[done] = self.observe()[done]
+        return obs, reward.astype(np.float32), terminated, truncated, info
+
+    def progress(self) -> np.ndarray:
+        """Progression de chaque partie, comme ``Level.progress``."""
+        spawn_x = self.level.player_spawn[0]
+        return np.clip((self.sim.rect_x - spawn_x) / self.level.length, 0.0, 1.0)
+
+    def observe(self) -> np.ndarray:
+        """Observations des parties en cours, tableau ``(num_envs, OBSERVATION_SIZE)`` en float32."""
+        sim = self.sim
+        x = sim.rect_x.astype(np.float64)
+        front = x + PLAYER_SIZE
+        feet = (sim.rect_y + PLAYER_SIZE).astype(np.float64)
+        obs = np.empty((self.num_envs, OBSERVATION_SIZE), dtype=np.float32)
+        obs[:, 0] = (self.level.player_spawn[1] - sim.rect_y) / PLAYER_SIZE
+        obs[:, 1] = sim.vel_y / MAX_FALL_SPEED
+        obs[:, 2] = sim.on_ground | (sim.coyote_frames > 0)
+
+        ahead = np.searchsorted(self._spike_right, x, side="right")[:, None] + np.arange(ENV_SPIKES_AHEAD)
+        real = ahead < self._spike_count
+        spikes = obs[:, _SPIKES_AT:_GAPS_AT]
+        spikes[:, 0::2] = np.clip((self._spike_left[ahead] - front[:, None]) / ENV_VIEW_DISTANCE, -1.0, 1.0)
+        spikes[:, 1::2] = np.where(real, (feet[:, None] - self._spike_top[ahead]) / PLAYER_SIZE, 0.0)
+
+        ahead = np.searchsorted(self._gap_right, x, side="right")[:, None] + np.arange(ENV_GAPS_AHEAD)
+        real = ahead < self._gap_count
+        left = self._gap_left[ahead]
+        gaps = obs[:, _GAPS_AT:]
+        gaps[:, 0::3] = np.clip((left - front[:, None]) / ENV_VIEW_DISTANCE, -1.0, 1.0)
+        gaps[:, 1::3] = np.clip((self._gap_right[ahead] - left) / ENV_VIEW_DISTANCE, 0.0, 1.0)
+        gaps[:, 2::3] = np.where(real, (feet[:, None] - self._gap_top[ahead]) / PLAYER_SIZE, 0.0)
+        return obs
+
+    def render(self, index: int = 0) -> np.ndarray:
+        """Image RGB ``(HEIGHT, WIDTH, 3)`` de la partie ``index``, dessinée hors écran."""
+        # Import local : le décor n'est construit que si un rendu est demandé.
+        from main import create_vertical_gradient, draw_background
+        from objects import create_cube_surface
+        from settings import BACKGROUND_GRADIENT_BOTTOM, BACKGROUND_GRADIENT_TOP
+        from sprites import RotationAtlas
+
+        if self._surface is None:
+            self._surface = pygame.Surface((WIDTH, HEIGHT))
+            self._gradient = create_vertical_gradient((WIDTH, HEIGHT), BACKGROUND_GRADIENT_TOP, BACKGROUND_GRADIENT_BOTTOM)
+            self._atlas = RotationAtlas(create_cube_surface(), AIR_ROTATION_SPEED)
+        surface = self._surface
+        sim = self.sim
+        cam_x = float(sim.cam_x[index])
+        self.level.stream(cam_x)
+        draw_background(surface, self._gradient, cam_x, self.level)
+        self.level.draw(surface, cam_x)
+        sprite, (dx, dy) = self._atlas.get(float(sim.rotation[index]))
+        half = PLAYER_SIZE // 2
+        surface.blit(sprite, (int(sim.rect_x[index] - cam_x) + half + dx, int(sim.rect_y[index]) + half + dy))
+        return pygame.surfarray.array3d(surface).swapaxes(0, 1)
+
+    def close(self) -> None:
+        """Rien à libérer : le niveau appartient à l'appelant."""
+
+
+def _shard_worker(conn: Connection, source: LevelSource, num_envs: int, max_steps: Optional[int]) -> None:
+    env = VectorEnv(load_source(source), num_envs, max_steps)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "step":
+                conn.send(env.step(data))
+            elif command == "reset":
+                conn.send(env.reset())
+            else:
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class ShardedVectorEnv:
+    """Même API que ``VectorEnv``, parties réparties entre ``workers`` processus.
+
+    Chaque processus tient son propre ``VectorEnv`` ; ``step`` envoie à tous
+    leur part des actions avant d'attendre le premier résultat, les tranches
+    avancent donc en parallèle. ``level`` peut être un chemin (chaque processus
+    rouvre alors le fichier, comme ``solver.solve``). Pas de ``render`` : il
+    faut un ``VectorEnv`` dans le processus courant.
+    """
+
+    def __init__(
+        self,
+        level: Union[Level, str, None] = None,
+        num_envs: int = 1,
+        workers: int = 2,
+        max_steps: Optional[int] = None,
+    ) -> None:
+        source = level if isinstance(level, str) else level_source(level if level is not None else Level())
+        self.num_envs = int(num_envs)
+        counts = [len(part) for part in np.array_split(np.arange(self.num_envs), max(1, min(workers, self.num_envs)))]
+        self._bounds = np.cumsum(counts)[:-1]
+        self._conns: List[Connection] = []
+        self._processes: List[multiprocessing.Process] = []
+        for count in counts:
+            conn, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, args=(child, source, count, max_steps), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+    def __enter__(self) -> ShardedVectorEnv:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        for conn in self._conns:
+            conn.send(("reset", None))
+        results = [conn.recv() for conn in self._conns]
+        return np.concatenate([obs for obs, _ in results]), {}
+
+    def step(self, actions: Union[np.ndarray, bool]) -> StepResult:
+        actions = np.broadcast_to(np.asarray(actions), (self.num_envs,))
+        for conn, part in zip(self._conns, np.split(actions, self._bounds)):
+            conn.send(("step", np.ascontiguousarray(part)))
+        results = [conn.recv() for conn in self._conns]
+        obs, reward, terminated, truncated = (np.concatenate(column) for column in list(zip(*results))[:4])
+        infos = [info for *_, info in results]
+        info = {key: np.concatenate([part[key] for part in infos]) for key in ("progress", "won")}
+        if any("final_observation" in part for part in infos):
+            # Tranches sans partie terminée : leurs lignes ne sont pas lues, l'observation courante suffit.
+            info["final_observation"] = np.concatenate(
+                [part.get("final_observation", result[0]) for part, result in zip(infos, results)]
+            )
+        return obs, reward, terminated, truncated, info
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._conns = []
+        self._processes = []
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Mesure le débit de l'environnement avec une politique aléatoire.")
+    parser.add_argument("level", nargs="?", help="niveau (.json ou .gdl), niveau d'origine par défaut")
+    parser.add_argument("--envs", type=int, default=4096, help="nombre de parties simultanées")
+    parser.add_argument("--steps", type=int, default=500, help="nombre d'appels à step")
+    parser.add_argument("--workers", type=int, default=1, help="processus (1 : tout dans le processus courant)")
+    parser.add_argument("--jump-chance", type=float, default=0.05, help="probabilité de sauter à chaque pas")
+    args = parser.parse_args(argv)
+
+    if args.workers > 1:
+        env: Union[VectorEnv, ShardedVectorEnv] = ShardedVectorEnv(args.level, args.envs, args.workers)
+    else:
+        env = VectorEnv(open_level(args.level) if args.level else None, args.envs)
+    rng = np.random.default_rng(0)
+    actions = rng.random((args.steps, args.envs)) < args.jump_chance
+    wins = deaths = 0
+    try:
+        env.reset()
+        started = time.perf_counter()
+        for row in actions:
+            _, _, terminated, _, info = env.step(row)
+            won = int(np.count_nonzero(info["won"]))
+            wins += won
+            deaths += int(np.count_nonzero(terminated)) - won
+        elapsed = time.perf_counter() - started
+    finally:
+        env.close()
+    total = args.steps * args.envs
+    print(f"{total} pas en {elapsed:.2f} s : {total / elapsed:,.0f} pas/s ({wins} arrivées, {deaths} morts)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
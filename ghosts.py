@@ -0,0 +1,199 @@
+"""Fantômes : essais précédents et relectures affichés en cubes translucides à côté du joueur.
+
+Une trajectoire est un tableau compact d'une ligne par pas (x, y, indice de
+rotation), indexé comme ``Simulation.frame``. Les trajectoires calculées à
+partir des relectures ``.gdr`` sont mises en cache dans un fichier ``.npy``
+voisin, ouvert en projection mémoire seulement quand le fantôme est affiché.
+Tous les fantômes visibles partagent les mêmes rotations précalculées et sont
+dessinés en un seul ``Surface.blits``.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pygame
+
+from endless import EndlessLevel
+from level import Level
+from objects import create_cube_surface
+from replay import JUMP_HELD, JUMP_PRESSED, Replay
+from settings import AIR_ROTATION_SPEED, GHOST_ALPHA, GHOST_HISTORY, PLAYER_SIZE
+from simulation import STATE_PLAYING, Simulation
+from sprites import RotationAtlas
+
+GHOST_DTYPE = np.dtype([("x", "<i4"), ("y", "<i2"), ("rotation", "u1")])
+GHOST_SUFFIX = ".ghost.npy"
+
+
+class GhostTrack:
+    """Trajectoire d'un fantôme, en mémoire ou dans un fichier ``.npy`` ouvert à la première lecture."""
+
+    __slots__ = ("path", "_data")
+
+    def __init__(self, source: Union[str, np.ndarray]) -> None:
+        if isinstance(source, str):
+            self.path: Optional[str] = source
+            self._data: Optional[np.ndarray] = None
+        else:
+            self.path = None
+            self._data = source
+
+    @property
+    def data(self) -> np.ndarray:
+        if self._data is None:
+            self._data = np.load(self.path, mmap_mode="r")
+            if self._data.dtype != GHOST_DTYPE:
+                raise ValueError(f"{self.path} n'est pas une trajectoire de fantôme.")
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def save(self, path: str) -> None:
+        np.save(path, np.asarray(self.data, dtype=GHOST_DTYPE))
+
+
+class GhostRecorder:
+    """Relève la trajectoire d'une ``Simulation`` à chaque pas (appeler ``update`` après ``sim.update``).
+
+    Une partie terminée (mort ou arrivée) rejoint ``completed``.
+    """
+
+    def __init__(self) -> None:
+        self.completed: List[GhostTrack] = []
+        self._rows: List[Tuple[int, int, int]] = []
+        self._tick: Tuple[int, int] = (0, 0)
+
+    def update(self, sim: Simulation) -> None:
+        tick = (sim.attempt, sim.frame)
+        if sim.frame == 0 or tick == self._tick:
+            return
+        previous, self._tick = self._tick, tick
+        if sim.frame == 1:
+            # Nouvelle partie : la ligne 0 est la position de départ.
+            spawn_x, spawn_y = sim.level.player_spawn
+            self._rows = [(int(spawn_x), int(spawn_y), 0)]
+        elif tick != (previous[0], previous[1] + 1):
+            # Partie commencée avant l'enregistrement ou reprise à un point de contrôle.
+            self._rows = []
+            return
+        elif not self._rows:
+            return
+        rect = sim.player.rect
+        self._rows.append((rect.x, rect.y, _rotation_index(sim.player.rotation)))
+        if sim.state != STATE_PLAYING:
+            self.completed.append(GhostTrack(np.array(self._rows, dtype=GHOST_DTYPE)))
+            self._rows = []
+
+    def take(self) -> List[GhostTrack]:
+        completed, self.completed = self.completed, []
+        return completed
+
+
+def _rotation_index(angle: float) -> int:
+    return int(round(angle / AIR_ROTATION_SPEED)) % int(round(360 / AIR_ROTATION_SPEED))
+
+
+def track_from_replay(replay: Replay, level: Optional[Level] = None) -> GhostTrack:
+    """Rejoue ``replay`` (comme ``replay.play``) en relevant la trajectoire du cube."""
+    sim = Simulation(level)
+    recorder = GhostRecorder()
+    sim.start_run(replay.start_with_jump)
+    for code, count in replay.runs:
+        for _ in range(count):
+            if sim.state != STATE_PLAYING:
+                break
+            if code & JUMP_PRESSED:
+                sim.press_jump()
+            if not code & JUMP_HELD:
+                sim.release_jump()
+            sim.update()
+            recorder.update(sim)
+    tracks = recorder.take()
+    if not tracks:
+        raise ValueError("La relecture ne se termine pas sur ce niveau.")
+    return tracks[0]
+
+
+def load_ghosts(paths: Iterable[str], level: Level) -> List[GhostTrack]:
+    """Fantômes de fichiers ``.gdr`` (trajectoire calculée puis mise en cache) ou ``.ghost.npy``.
+
+    Les fichiers ``.npy`` ne sont pas lus ici : seul leur chemin est retenu.
+    """
+    tracks = []
+    for path in paths:
+        if path.endswith(".npy"):
+            tracks.append(GhostTrack(path))
+            continue
+        cache = os.path.splitext(path)[0] + GHOST_SUFFIX
+        if not os.path.exists(cache) or os.path.getmtime(cache) < os.path.getmtime(path):
+            replay = Replay.load(path)
+            if isinstance(level, EndlessLevel):
+                # Comme pour ``replay.py verify`` : chaque relecture a son propre parcours.
+                replay_level = EndlessLevel(replay.seed)
+                try:
+                    track_from_replay(replay, replay_level).save(cache)
+                finally:
+                    replay_level.close()
+            else:
+                track_from_replay(replay, level).save(cache)
+        tracks.append(GhostTrack(cache))
+    return tracks
+
+
+class GhostRenderer:
+    """Affiche des fantômes : ceux chargés (``tracks``) et les derniers essais de la session (``history``)."""
+
+    def __init__(self, tracks: Iterable[GhostTrack] = (), history: int = GHOST_HISTORY, alpha: int = GHOST_ALPHA) -> None:
+        self.tracks: List[GhostTrack] = list(tracks)
+        self.history: Deque[GhostTrack] = deque(maxlen=max(history, 0))
+        self.alpha = alpha
+        self._atlas: Optional[RotationAtlas] = None
+
+    def __len__(self) -> int:
+        return len(self.tracks) + len(self.history)
+
+    def add(self, track: GhostTrack) -> None:
+        if self.history.maxlen:
+            self.history.append(track)
+
+    @property
+    def atlas(self) -> RotationAtlas:
+        """Rotations du cube translucide, communes à tous les fantômes (construites au premier rendu)."""
+        if self._atlas is None:
+            sprite = create_cube_surface()
+            sprite.fill((255, 255, 255, self.alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            self._atlas = RotationAtlas(sprite, AIR_ROTATION_SPEED)
+        return self._atlas
+
+    def draw(self, surface: pygame.Surface, frame: int, cam_x: float, alpha: float = 1.0) -> int:
+        """Dessine les fantômes au pas ``frame`` ; ``alpha`` interpole depuis le pas précédent comme le joueur."""
+        atlas = self.atlas
+        sprites = atlas.frames
+        offsets = atlas.offsets
+        half = PLAYER_SIZE // 2
+        left = cam_x - PLAYER_SIZE
+        right = cam_x + surface.get_width() + PLAYER_SIZE
+        back = 1.0 - alpha
+        batch = []
+        for tracks in (self.tracks, self.history):
+            for track in tracks:
+                data = track.data
+                if frame >= len(data):
+                    continue
+                x, y, rotation = data[frame].item()
+                if back and frame > 0:
+                    prev_x, prev_y, _ = data[frame - 1].item()
+                    x += (prev_x - x) * back
+                    y += (prev_y - y) * back
+                if x < left or x > right:
+                    continue
+                dx, dy = offsets[rotation]
+                batch.append((sprites[rotation], (int(x + half - cam_x) + dx, int(y + half) + dy)))
+        if batch:
+            surface.blits(batch, doreturn=False)
+        return len(batch)
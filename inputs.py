@@ -0,0 +1,80 @@
+"""Entrées horodatées : chaque appui sur ESPACE est appliqué au pas de physique correspondant à son instant."""
+
+from __future__ import annotations
+
+from collections import deque
+from time import perf_counter_ns
+from typing import Deque, List, Tuple
+
+import pygame
+
+from profiler import LatencyStats
+from simulation import Simulation
+
+
+class TimedEvents:
+    """Vide la file d'événements pygame à plusieurs moments de l'image et horodate chaque événement.
+
+    pygame ne transmet pas l'horodatage SDL : un événement reçoit le milieu de
+    l'intervalle entre deux relevés (``perf_counter_ns``), à une demi-période
+    près. Relever aussi en cours d'image (``poll``) resserre cet intervalle.
+    """
+
+    def __init__(self, latency: LatencyStats) -> None:
+        self.latency = latency
+        self._last_poll = perf_counter_ns()
+        self._pending: List[Tuple[int, pygame.event.Event]] = []
+
+    def poll(self) -> None:
+        now = perf_counter_ns()
+        events = pygame.event.get()
+        if events:
+            stamp = (self._last_poll + now) // 2
+            self._pending.extend((stamp, event) for event in events)
+            self.latency.add("stamp_error", (now - self._last_poll) // 2)
+        self._last_poll = now
+
+    def drain(self) -> List[Tuple[int, pygame.event.Event]]:
+        """Événements reçus depuis le dernier ``drain``, avec leur horodatage en ns."""
+        self.poll()
+        events, self._pending = self._pending, []
+        return events
+
+
+class JumpTimeline:
+    """Appuis et relâchements d'ESPACE en attente, appliqués au pas dont l'intervalle couvre leur instant.
+
+    Un appui arrivé après la fin du dernier pas simulé attend l'image suivante :
+    le saut part au même instant de jeu quelle que soit la durée des images.
+    """
+
+    def __init__(self, latency: LatencyStats) -> None:
+        self.latency = latency
+        self._queue: Deque[Tuple[int, bool]] = deque()
+        self._applied: List[int] = []
+
+    def record(self, stamp: int, pressed: bool) -> None:
+        self._queue.append((stamp, pressed))
+
+    def apply(self, sim: Simulation, tick_end: int) -> None:
+        """À appeler juste avant le pas qui se termine à ``tick_end`` (ns, horloge ``perf_counter_ns``)."""
+        queue = self._queue
+        if not queue or queue[0][0] > tick_end:
+            return
+        now = perf_counter_ns()
+        while queue and queue[0][0] <= tick_end:
+            stamp, pressed = queue.popleft()
+            if pressed:
+                sim.press_jump()
+                self.latency.add("input_to_sim", now - stamp)
+                self._applied.append(stamp)
+            else:
+                sim.release_jump()
+
+    def presented(self) -> None:
+        """À appeler après l'affichage de l'image : clôt la mesure des appuis déjà simulés."""
+        if self._applied:
+            now = perf_counter_ns()
+            for stamp in self._applied:
+                self.latency.add("input_to_present", now - stamp)
+            self._applied.clear()
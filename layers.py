@@ -0,0 +1,196 @@
+"""Calques statiques pré-rendus en tuiles : fond, colonnes de parallaxe et géométrie du niveau."""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+import pygame
+
+from level import Level
+from settings import (
+    BACKGROUND_COLUMN_COLOR,
+    BACKGROUND_COLUMN_WIDTH,
+    BACKGROUND_STRIPE_COLOR,
+    BACKGROUND_STRIPE_SPACING,
+    BACKGROUND_STRIPE_WIDTH,
+    GROUND_HEIGHT,
+    HEIGHT,
+    WIDTH,
+)
+
+TILE_WIDTH = 512
+COLUMN_TILE_CAPACITY = 8
+LEVEL_TILE_CAPACITY = 8
+COLUMN_PARALLAX = 0.5
+STRIPE_PARALLAX = 0.25
+
+
+class TileCache:
+    """Tuiles construites à la demande et gardées dans une limite LRU."""
+
+    def __init__(self, build: Callable[[int], pygame.Surface], capacity: int) -> None:
+        self._build = build
+        self.capacity = capacity
+        self._tiles: OrderedDict[int, pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def get(self, index: int) -> pygame.Surface:
+        tile = self._tiles.get(index)
+        if tile is not None:
+            self.hits += 1
+            self._tiles.move_to_end(index)
+            return tile
+        self.misses += 1
+        tile = self._build(index)
+        self._tiles[index] = tile
+        while len(self._tiles) > self.capacity:
+            self._tiles.popitem(last=False)
+            self.evictions += 1
+        return tile
+
+    def discard(self, index: int) -> None:
+        self._tiles.pop(index, None)
+
+    def clear(self) -> None:
+        self._tiles.clear()
+
+
+class StaticLayers:
+    """Remplace ``draw_background`` et ``Level.draw`` par des blits de tuiles pré-rendues.
+
+    Le dégradé et les bandes forment un motif périodique rendu une seule fois ;
+    les colonnes (parallaxe 0.5) et la géométrie du niveau sont découpées en
+    tuiles de ``TILE_WIDTH`` pixels construites quand elles deviennent visibles.
+    À pleine résolution, le fond correspond exactement au rendu direct ; la
+    géométrie aussi pour une caméra entière, à un pixel près sinon (une tuile
+    n'a qu'un arrondi).
+
+    Avec ``scale`` < 1, chaque tuile est réduite une fois à sa construction et
+    les calques se dessinent sur une surface de ``size`` × ``scale`` pixels.
+    """
+
+    def __init__(
+        self,
+        level: Level,
+        gradient: pygame.Surface,
+        size: Tuple[int, int] = (WIDTH, HEIGHT),
+        tile_width: int = TILE_WIDTH,
+        column_capacity: int = COLUMN_TILE_CAPACITY,
+        level_capacity: int = LEVEL_TILE_CAPACITY,
+        scale: float = 1.0,
+    ) -> None:
+        self.level = level
+        self.size = size
+        self.tile_width = tile_width
+        self.scale = scale
+        self._scaled_tile_width = round(tile_width * scale)
+        self._backdrop = self._scaled(self._build_backdrop(gradient))
+        # Les hauteurs de colonnes se répètent toutes les cinq colonnes.
+        tallest = max((height for _, height in level.background_columns[:5]), default=0)
+        self._column_top = HEIGHT - GROUND_HEIGHT - tallest
+        self.columns = TileCache(self._build_column_tile, column_capacity)
+        self.geometry = TileCache(self._build_level_tile, level_capacity)
+
+    def _build_backdrop(self, gradient: pygame.Surface) -> pygame.Surface:
+        width, height = self.size
+        backdrop = pygame.Surface((width + BACKGROUND_STRIPE_SPACING, height)).convert()
+        for x in range(0, backdrop.get_width(), width):
+            backdrop.blit(gradient, (x, 0))
+        for x in range(0, backdrop.get_width(), BACKGROUND_STRIPE_SPACING):
+            pygame.draw.rect(backdrop, BACKGROUND_STRIPE_COLOR, (x, 0, BACKGROUND_STRIPE_WIDTH, height))
+        return backdrop
+
+    def _build_column_tile(self, index: int) -> pygame.Surface:
+        x0 = index * self.tile_width
+        tile = pygame.Surface((self.tile_width, HEIGHT - GROUND_HEIGHT - self._column_top), pygame.SRCALPHA)
+        for column_x, column_height in self.level.background_columns_in(x0, x0 + self.tile_width):
+            rect = pygame.Rect(
+                int(column_x - x0),
+                tile.get_height() - column_height,
+                BACKGROUND_COLUMN_WIDTH,
+                column_height,
+            )
+            pygame.draw.rect(tile, BACKGROUND_COLUMN_COLOR, rect, border_radius=6)
+        return _optimized(self._scaled(tile))
+
+    def _build_level_tile(self, index: int) -> pygame.Surface:
+        tile = pygame.Surface((self.tile_width, self.size[1]), pygame.SRCALPHA)
+        self.level.draw(tile, index * self.tile_width)
+        return _optimized(self._scaled(tile))
+
+    def _scaled(self, surface: pygame.Surface) -> pygame.Surface:
+        if self.scale == 1:
+            return surface
+        width, height = surface.get_size()
+        return pygame.transform.smoothscale(surface, (round(width * self.scale), round(height * self.scale)))
+
+    def _visible_tiles(self, shift: int) -> range:
+        return range(shift // self.tile_width, (shift + self.size[0]) // self.tile_width + 1)
+
+    def draw_background(self, surface: pygame.Surface, cam_x: float) -> None:
+        # ``draw_background`` arrondit avec int(), vers zéro : une bande ou une
+        # colonne qui commence à gauche de l'écran est décalée de floor(), les
+        # autres de ceil(). Les tuiles sont posées avec ceil(), puis l'élément à
+        # cheval sur le bord gauche est corrigé (à pleine résolution seulement).
+        offset = (cam_x * STRIPE_PARALLAX) % BACKGROUND_STRIPE_SPACING
+        self._draw_backdrop(surface, offset)
+        parallax = cam_x * COLUMN_PARALLAX
+        self._blit_columns(surface, math.ceil(parallax))
+        if self.scale != 1 or parallax == math.floor(parallax):
+            return
+        shift = math.floor(parallax)
+        straddling = self.level.background_columns_in(shift - BACKGROUND_COLUMN_WIDTH + 1, shift)
+        if not straddling:
+            return
+        # Seule cette colonne touche la bande de gauche : le fond y est refait
+        # avant de la reposer un pixel plus à droite.
+        width = int(max(column_x for column_x, _ in straddling)) - shift + BACKGROUND_COLUMN_WIDTH
+        previous = surface.get_clip()
+        surface.set_clip(previous.clip(pygame.Rect(0, 0, width, surface.get_height())))
+        self._draw_backdrop(surface, offset)
+        self._blit_columns(surface, shift)
+        surface.set_clip(previous)
+
+    def _draw_backdrop(self, surface: pygame.Surface, offset: float) -> None:
+        surface.blit(self._backdrop, (-round(math.ceil(offset) * self.scale), 0))
+        if self.scale != 1 or offset == math.floor(offset):
+            return
+        # La bande du motif en 0 commence à gauche de l'écran : elle s'arrête
+        # une colonne de pixels plus à droite que dans le motif posé.
+        x = BACKGROUND_STRIPE_WIDTH - 1 - math.floor(offset)
+        if x >= 0:
+            surface.fill(BACKGROUND_STRIPE_COLOR, (x, 0, 1, self._backdrop.get_height()))
+
+    def _blit_columns(self, surface: pygame.Surface, shift: int) -> None:
+        column_top = round(self._column_top * self.scale)
+        for index in self._visible_tiles(shift):
+            surface.blit(self.columns.get(index), (self._tile_x(index, shift), column_top))
+
+    def draw_level(self, surface: pygame.Surface, cam_x: float) -> None:
+        shift = math.floor(cam_x)
+        for index in self._visible_tiles(shift):
+            surface.blit(self.geometry.get(index), (self._tile_x(index, shift), 0))
+
+    def _tile_x(self, index: int, shift: int) -> int:
+        if self.scale == 1:
+            return index * self.tile_width - shift
+        return index * self._scaled_tile_width - round(shift * self.scale)
+
+    def invalidate(self, x0: float, x1: float) -> None:
+        """Oublie les tuiles de géométrie qui recouvrent ``[x0, x1]`` (coordonnées du niveau)."""
+        for index in range(math.floor(x0 / self.tile_width), math.floor(x1 / self.tile_width) + 1):
+            self.geometry.discard(index)
+
+
+def _optimized(tile: pygame.Surface) -> pygame.Surface:
+    """Convertit la tuile au format de l'écran quand une fenêtre existe (blits plus rapides)."""
+    if pygame.display.get_surface() is None:
+        return tile
+    return tile.convert_alpha()
@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+import math
+import sys
+from typing import Iterable, List, Optional, Sequence, Tuple, Union, overload
 
 import pygame
 
 from objects import GroundSection, Spike
 from settings import (
     BACKGROUND_COLUMN_SPACING,
+    BACKGROUND_COLUMN_WIDTH,
     FINISH_COLOR,
     FINISH_FLAG_HEIGHT,
     GROUND_COLOR,
@@ -19,19 +22,67 @@ from settings import (
     SPIKE_SIZE,
     WIDTH,
 )
+from spatial import SpatialIndex
 
 
-class Level:
-    """Contient la géométrie d'un niveau et les obstacles à éviter."""
+class BackgroundColumns(Sequence[Tuple[float, int]]):
+    """Colonnes de décor calculées à la demande, sans liste proportionnelle au niveau."""
+
+    def __init__(self, finish_x: float) -> None:
+        span = finish_x + 2 * WIDTH
+        # Niveau sans fin : une suite de colonnes illimitée en pratique.
+        self._count = sys.maxsize if math.isinf(span) else max(0, math.ceil(span / BACKGROUND_COLUMN_SPACING))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple[float, int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Tuple[float, int]]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._column(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._column(index)
+
+    @staticmethod
+    def _column(index: int) -> Tuple[float, int]:
+        return (-WIDTH + index * BACKGROUND_COLUMN_SPACING, 80 + (index % 5) * 24)
 
-    def __init__(self) -> None:
+
+class Level:
+    """Contient la géométrie d'un niveau et les obstacles à éviter.
+
+    Sans argument, construit le niveau d'origine ; sinon utilise la géométrie
+    fournie (voir ``level_file`` pour les niveaux chargés depuis un fichier).
+    """
+
+    def __init__(
+        self,
+        sections: Optional[Iterable[GroundSection]] = None,
+        spikes: Optional[Iterable[Spike]] = None,
+        player_spawn: Optional[Tuple[float, float]] = None,
+        finish_x: Optional[float] = None,
+    ) -> None:
         self.sections: List[GroundSection] = []
         self.spikes: List[Spike] = []
-        self.background_columns: List[Tuple[float, int]] = []
+        self.background_columns: Sequence[Tuple[float, int]] = ()
         self.player_spawn: Tuple[float, float] = (0.0, 0.0)
         self.finish_x: float = 0.0
         self.length: float = 1.0
-        self._build()
+        if sections is None:
+            self._build()
+        else:
+            self.sections = list(sections)
+            self.spikes = list(spikes) if spikes is not None else []
+            self._finalize(player_spawn, finish_x)
+        self._build_indexes()
 
     def _build(self) -> None:
         base_y = HEIGHT - GROUND_HEIGHT
@@ -47,15 +98,6 @@ class Level:
             self.sections.append(GroundSection(rect, color=GROUND_COLOR))
             x += width + gap
 
-        if not self.sections:
-            raise RuntimeError("Le niveau doit contenir au moins une section de sol.")
-
-        first_section = self.sections[0]
-        self.player_spawn = (
-            first_section.rect.left + 80,
-            first_section.rect.top - PLAYER_SIZE,
-        )
-
         self.spikes = [
             Spike(300, base_y, size=SPIKE_SIZE),
             Spike(720, base_y, size=SPIKE_SIZE),
@@ -63,33 +105,88 @@ class Level:
             Spike(1860, base_y, size=SPIKE_SIZE),
         ]
 
-        max_right = max(section.rect.right for section in self.sections)
-        self.finish_x = max_right + LEVEL_END_OFFSET
+        self._finalize()
+
+    def _finalize(self, player_spawn: Optional[Tuple[float, float]] = None, finish_x: Optional[float] = None) -> None:
+        if not self.sections:
+            raise RuntimeError("Le niveau doit contenir au moins une section de sol.")
+
+        if player_spawn is None:
+            first_section = self.sections[0]
+            player_spawn = (
+                first_section.rect.left + 80,
+                first_section.rect.top - PLAYER_SIZE,
+            )
+        self.player_spawn = player_spawn
+
+        if finish_x is None:
+            max_right = max(section.rect.right for section in self.sections)
+            finish_x = max_right + LEVEL_END_OFFSET
+        self.finish_x = finish_x
         self.length = max(1.0, self.finish_x - self.player_spawn[0])
 
         self._build_background_columns()
 
     def _build_background_columns(self) -> None:
-        self.background_columns.clear()
-        spacing = BACKGROUND_COLUMN_SPACING
-        x = -WIDTH
-        index = 0
-        while x < self.finish_x + WIDTH:
-            height = 80 + (index % 5) * 24
-            self.background_columns.append((x, height))
-            x += spacing
-            index += 1
+        self.background_columns = BackgroundColumns(self.finish_x)
+
+    def _build_indexes(self) -> None:
+        self.section_index = SpatialIndex(self.sections, _section_extent)
+        self.spike_index = SpatialIndex(self.spikes, _spike_extent)
+
+    def patch(
+        self,
+        sections: List[GroundSection],
+        spikes: List[Spike],
+        removed: Iterable[Union[GroundSection, Spike]] = (),
+        added: Iterable[Union[GroundSection, Spike]] = (),
+        player_spawn: Optional[Tuple[float, float]] = None,
+        finish_x: Optional[float] = None,
+    ) -> None:
+        """Remplace la géométrie par ``sections`` et ``spikes`` sans reconstruire le niveau.
+
+        ``removed`` et ``added`` sont les objets qui en sortent ou y entrent, les
+        autres sont gardés tels quels : seules les cases d'index de ces objets
+        changent. Les ajouts passent après les autres dans l'ordre des index,
+        qui départage les sections superposées.
+        """
+        if not sections:
+            raise RuntimeError("Le niveau doit contenir au moins une section de sol.")
+        for item in removed:
+            (self.section_index if isinstance(item, GroundSection) else self.spike_index).remove(item)
+        for item in added:
+            (self.section_index if isinstance(item, GroundSection) else self.spike_index).insert(item)
+        self.sections = sections
+        self.spikes = spikes
+        self._finalize(player_spawn, finish_x)
 
     def reset(self) -> None:
         """Le niveau est statique, mais l'API reste cohérente."""
 
-    def ground_iter(self) -> Iterable[GroundSection]:
-        return self.sections
+    def stream(self, cam_x: float) -> None:
+        """Prépare la géométrie autour de la caméra (rien à faire pour un niveau en mémoire)."""
+
+    def ground_iter(self, x0: Optional[float] = None, x1: Optional[float] = None) -> Iterable[GroundSection]:
+        """Sections de sol, limitées à celles qui chevauchent ``[x0, x1]`` si précisé."""
+        if x0 is None or x1 is None:
+            return self.sections
+        return self.section_index.query(x0, x1)
+
+    def spikes_in(self, x0: float, x1: float) -> List[Spike]:
+        return self.spike_index.query(x0, x1)
+
+    def background_columns_in(self, x0: float, x1: float) -> List[Tuple[float, int]]:
+        """Colonnes de décor (coordonnées de parallaxe) visibles entre ``x0`` et ``x1``."""
+        spacing = BACKGROUND_COLUMN_SPACING
+        first = max(0, math.ceil((x0 - BACKGROUND_COLUMN_WIDTH + WIDTH) / spacing))
+        last = math.floor((x1 + WIDTH) / spacing)
+        return self.background_columns[first:last + 1]
 
     def draw(self, surface: pygame.Surface, cam_x: float) -> None:
-        for section in self.sections:
+        view_right = cam_x + surface.get_width()
+        for section in self.ground_iter(cam_x, view_right):
             section.draw(surface, cam_x)
-        for spike in self.spikes:
+        for spike in self.spikes_in(cam_x, view_right):
             spike.draw(surface, cam_x)
         self._draw_finish(surface, cam_x)
 
@@ -108,8 +205,16 @@ class Level:
         pygame.draw.polygon(surface, FINISH_COLOR, flag_points)
 
     def hits_spike(self, player_rect: pygame.Rect) -> bool:
-        return any(spike.collides(player_rect) for spike in self.spikes)
+        return any(spike.collides(player_rect) for spike in self.spikes_in(player_rect.left, player_rect.right))
 
     def progress(self, x: float) -> float:
         ratio = (x - self.player_spawn[0]) / self.length
         return max(0.0, min(1.0, ratio))
+
+
+def _section_extent(section: GroundSection) -> Tuple[float, float]:
+    return section.rect.left, section.rect.right
+
+
+def _spike_extent(spike: Spike) -> Tuple[float, float]:
+    return spike.x, spike.x + spike.size
@@ -0,0 +1,326 @@
+"""Niveaux sur disque : source JSON éditable et conteneur binaire découpé en tranches.
+
+Le conteneur ``.gdl`` range les objets par tranches de largeur fixe le long de x.
+Il est ouvert en ``mmap`` : l'ouverture ne lit que l'en-tête, chaque tranche est
+décodée quand la caméra s'en approche et oubliée quand elle est loin derrière.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import struct
+import sys
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+import pygame
+
+from level import Level
+from objects import GroundSection, Spike
+from settings import WIDTH
+
+MAGIC = b"GDLV"
+FORMAT_VERSION = 1
+CHUNK_WIDTH = 2048
+STREAM_AHEAD = 2 * WIDTH
+STREAM_BEHIND = WIDTH
+MAX_RESIDENT_CHUNKS = 64
+
+# magic, version, réservé, largeur de tranche, nb de tranches, largeurs max
+# (sections, pics), origine x, apparition x/y, arrivée x
+_HEADER = struct.Struct("<4sHHIIIIdddd")
+_CHUNK_ENTRY = struct.Struct("<QII")
+_SECTION = struct.Struct("<iiii")
+_SPIKE = struct.Struct("<ddi")
+
+# Description d'un niveau transmissible à un autre processus : chemin du
+# fichier, ou (sections, pics, apparition, arrivée)
+LevelSource = Union[str, Tuple[list, list, Tuple[float, float], float]]
+
+
+def read_level_source(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def section_from_entry(entry: list) -> GroundSection:
+    return GroundSection(pygame.Rect(*entry))
+
+
+def spike_from_entry(entry: list) -> Spike:
+    return Spike(*entry)
+
+
+def level_from_source(data: dict) -> Level:
+    """Niveau décrit par une source JSON déjà lue (``sections`` : [x, y, w, h], ``spikes`` : [x, base_y, taille])."""
+    sections = [section_from_entry(entry) for entry in data["sections"]]
+    spikes = [spike_from_entry(entry) for entry in data.get("spikes", [])]
+    spawn = data.get("spawn")
+    return Level(
+        sections,
+        spikes,
+        player_spawn=(float(spawn[0]), float(spawn[1])) if spawn is not None else None,
+        finish_x=data.get("finish_x"),
+    )
+
+
+def load_level_source(path: str) -> Level:
+    """Charge un niveau décrit en JSON (voir ``level_from_source``)."""
+    return level_from_source(read_level_source(path))
+
+
+def save_level_source(level: Level, path: str) -> None:
+    data = {
+        "spawn": list(level.player_spawn),
+        "finish_x": level.finish_x,
+        "sections": [list(section.rect) for section in level.sections],
+        "spikes": [[spike.x, spike.base_y, spike.size] for spike in level.spikes],
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=1)
+
+
+def save_level(level: Level, path: str, chunk_width: int = CHUNK_WIDTH) -> None:
+    """Écrit ``level`` au format binaire découpé en tranches."""
+    sections = list(level.sections)
+    spikes = list(level.spikes)
+    lefts = [section.rect.left for section in sections] + [spike.x for spike in spikes]
+    origin = float(math.floor(min(lefts)))
+    chunk_count = int((max(lefts) - origin) // chunk_width) + 1
+
+    chunk_sections: List[List[GroundSection]] = [[] for _ in range(chunk_count)]
+    chunk_spikes: List[List[Spike]] = [[] for _ in range(chunk_count)]
+    for section in sections:
+        chunk_sections[int((section.rect.left - origin) // chunk_width)].append(section)
+    for spike in spikes:
+        chunk_spikes[int((spike.x - origin) // chunk_width)].append(spike)
+
+    max_section = max((section.rect.width for section in sections), default=0)
+    max_spike = max((int(spike.size) for spike in spikes), default=0)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        chunk_width,
+        chunk_count,
+        max_section,
+        max_spike,
+        origin,
+        float(level.player_spawn[0]),
+        float(level.player_spawn[1]),
+        float(level.finish_x),
+    )
+    offset = _HEADER.size + chunk_count * _CHUNK_ENTRY.size
+    table = bytearray()
+    payload = bytearray()
+    for index in range(chunk_count):
+        table += _CHUNK_ENTRY.pack(offset + len(payload), len(chunk_sections[index]), len(chunk_spikes[index]))
+        for section in chunk_sections[index]:
+            payload += _SECTION.pack(*section.rect)
+        for spike in chunk_spikes[index]:
+            payload += _SPIKE.pack(float(spike.x), float(spike.base_y), int(spike.size))
+    with open(path, "wb") as handle:
+        handle.write(header)
+        handle.write(table)
+        handle.write(payload)
+
+
+def level_source(level: Level) -> LevelSource:
+    sections = [tuple(section.rect) for section in level.ground_iter()]
+    spikes = [(spike.x, spike.base_y, spike.size) for spike in level.spikes]
+    return sections, spikes, level.player_spawn, level.finish_x
+
+
+def load_source(source: LevelSource) -> Level:
+    """Reconstruit le niveau décrit par ``level_source`` (ou rouvre le fichier)."""
+    if isinstance(source, str):
+        return open_level(source)
+    sections, spikes, spawn, finish_x = source
+    return Level(
+        [GroundSection(pygame.Rect(*rect)) for rect in sections],
+        [Spike(*spike) for spike in spikes],
+        player_spawn=spawn,
+        finish_x=finish_x,
+    )
+
+
+def compile_level(source_path: str, path: str, chunk_width: int = CHUNK_WIDTH) -> None:
+    save_level(load_level_source(source_path), path, chunk_width)
+
+
+def open_level(path: str) -> Level:
+    """Ouvre une source ``.json`` en mémoire ou un conteneur binaire en streaming."""
+    if path.endswith(".json"):
+        return load_level_source(path)
+    return StreamingLevel(path)
+
+
+class _Chunk:
+    __slots__ = ("sections", "spikes")
+
+    def __init__(self, sections: List[GroundSection], spikes: List[Spike]) -> None:
+        self.sections = sections
+        self.spikes = spikes
+
+
+class ChunkStore:
+    """Accès paresseux aux tranches d'un fichier ``.gdl`` projeté en mémoire."""
+
+    def __init__(self, path: str, max_resident: int = MAX_RESIDENT_CHUNKS) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _reserved,
+            self.chunk_width,
+            self.chunk_count,
+            self.max_section_width,
+            self.max_spike_width,
+            self.origin_x,
+            spawn_x,
+            spawn_y,
+            self.finish_x,
+        ) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} n'est pas un niveau .gdl compatible.")
+        self.player_spawn = (spawn_x, spawn_y)
+        self.max_resident = max_resident
+        self._resident: OrderedDict[int, _Chunk] = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        self._resident.clear()
+        self._map.close()
+        self._file.close()
+
+    @property
+    def resident(self) -> List[int]:
+        return list(self._resident)
+
+    def chunk_range(self, x0: float, x1: float) -> range:
+        first = math.floor((x0 - self.origin_x) / self.chunk_width)
+        last = math.floor((x1 - self.origin_x) / self.chunk_width)
+        return range(max(0, first), min(self.chunk_count, last + 1))
+
+    def chunk(self, index: int) -> _Chunk:
+        chunk = self._resident.get(index)
+        if chunk is not None:
+            self._resident.move_to_end(index)
+            return chunk
+        chunk = self._decode(index)
+        self._resident[index] = chunk
+        self.loads += 1
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+            self.evictions += 1
+        return chunk
+
+    def walk(self) -> Iterator[_Chunk]:
+        """Toutes les tranches dans l'ordre, sans les garder en mémoire (accès au niveau entier).
+
+        Une tranche déjà résidente est rendue telle quelle ; les autres sont
+        décodées à part et ne changent ni les tranches résidentes ni ``loads``.
+        """
+        for index in range(self.chunk_count):
+            chunk = self._resident.get(index)
+            yield chunk if chunk is not None else self._decode(index)
+
+    def _decode(self, index: int) -> _Chunk:
+        offset, section_count, spike_count = _CHUNK_ENTRY.unpack_from(self._map, _HEADER.size + index * _CHUNK_ENTRY.size)
+        sections = []
+        for x, y, w, h in _SECTION.iter_unpack(self._map[offset:offset + section_count * _SECTION.size]):
+            sections.append(GroundSection(pygame.Rect(x, y, w, h)))
+        offset += section_count * _SECTION.size
+        spikes = []
+        for x, base_y, size in _SPIKE.iter_unpack(self._map[offset:offset + spike_count * _SPIKE.size]):
+            spikes.append(Spike(x, base_y, size=size))
+        return _Chunk(sections, spikes)
+
+    def keep_window(self, x0: float, x1: float) -> None:
+        """Charge les tranches de ``[x0, x1]`` et oublie celles entièrement avant ``x0``."""
+        # Les objets longs débordent sur les tranches suivantes : on garde celles
+        # qu'une requête sur [x0, x1] peut encore toucher.
+        keep_from = self.chunk_range(x0 - max(self.max_section_width, self.max_spike_width), x1).start
+        for index in [index for index in self._resident if index < keep_from]:
+            del self._resident[index]
+            self.evictions += 1
+        for index in self.chunk_range(x0, x1):
+            self.chunk(index)
+
+    def sections_in(self, x0: float, x1: float) -> List[GroundSection]:
+        found = []
+        for index in self.chunk_range(x0 - self.max_section_width, x1):
+            for section in self.chunk(index).sections:
+                if section.rect.left <= x1 and section.rect.right >= x0:
+                    found.append(section)
+        return found
+
+    def spikes_in(self, x0: float, x1: float) -> List[Spike]:
+        found = []
+        for index in self.chunk_range(x0 - self.max_spike_width, x1):
+            for spike in self.chunk(index).spikes:
+                if spike.x <= x1 and spike.x + spike.size >= x0:
+                    found.append(spike)
+        return found
+
+
+class _ChunkQuery:
+    """Adaptateur qui donne à ``ChunkStore`` l'interface ``query`` de ``SpatialIndex``."""
+
+    def __init__(self, query: Callable[[float, float], list]) -> None:
+        self.query = query
+
+
+class StreamingLevel(Level):
+    """Niveau lu tranche par tranche depuis un fichier ``.gdl``.
+
+    ``ground_iter(x0, x1)``, ``spikes_in`` et ``hits_spike`` chargent les
+    tranches à la demande. ``sections``, ``spikes`` et ``ground_iter()`` donnent
+    le niveau entier : chaque appel relit tout le fichier (``ChunkStore.walk``).
+    """
+
+    def __init__(self, path: str, max_resident: int = MAX_RESIDENT_CHUNKS) -> None:
+        self.store = ChunkStore(path, max_resident)
+        self.player_spawn: Tuple[float, float] = self.store.player_spawn
+        self.finish_x = self.store.finish_x
+        self.length = max(1.0, self.finish_x - self.player_spawn[0])
+        self._build_background_columns()
+        self.section_index = _ChunkQuery(self.store.sections_in)
+        self.spike_index = _ChunkQuery(self.store.spikes_in)
+
+    @property
+    def sections(self) -> List[GroundSection]:
+        return [section for chunk in self.store.walk() for section in chunk.sections]
+
+    @property
+    def spikes(self) -> List[Spike]:
+        return [spike for chunk in self.store.walk() for spike in chunk.spikes]
+
+    def stream(self, cam_x: float) -> None:
+        self.store.keep_window(cam_x - STREAM_BEHIND, cam_x + WIDTH + STREAM_AHEAD)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def main(argv: List[str]) -> None:
+    commands: Dict[str, str] = {
+        "compile": "compile SOURCE.json NIVEAU.gdl",
+        "export": "export SOURCE.json (niveau d'origine)",
+    }
+    if argv[:1] == ["compile"] and len(argv) == 3:
+        compile_level(argv[1], argv[2])
+    elif argv[:1] == ["export"] and len(argv) == 2:
+        save_level_source(Level(), argv[1])
+    else:
+        usage = "\n".join(f"  python level_file.py {text}" for text in commands.values())
+        raise SystemExit(f"Usage :\n{usage}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,180 @@
+"""Mode surveillance : la source JSON d'un niveau est rechargée à chaud pendant la partie.
+
+À chaque modification du fichier, les nouvelles entrées sont comparées aux
+précédentes : préfixe et suffixe communs, puis entrées restantes appariées par
+valeur. Les objets inchangés sont gardés tels quels ; seuls ceux retirés ou
+ajoutés passent par ``Level.patch`` (leurs cases d'index) et par
+``StaticLayers.invalidate`` (les tuiles qui les recouvrent). La simulation n'est
+pas touchée : caméra et cube restent où ils sont.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from layers import StaticLayers
+from level import Level
+from level_file import level_from_source, read_level_source, section_from_entry, spike_from_entry
+from objects import GroundSection, Spike
+from settings import LEVEL_WATCH_INTERVAL
+
+T = TypeVar("T")
+
+# Entrées comparées d'un coup (comparaison de listes en C) avant de chercher
+# l'entrée exacte où commence ou finit la modification
+COMPARE_BLOCK = 1024
+
+
+class LevelWatcher:
+    """Niveau chargé depuis une source ``.json`` et tenu à jour à chaque modification du fichier.
+
+    ``layers`` (facultatif) reçoit l'invalidation des tuiles concernées.
+    """
+
+    def __init__(self, path: str, interval: float = LEVEL_WATCH_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.layers: Optional[StaticLayers] = None
+        self._stamp = _stamp(path)
+        data = read_level_source(path)
+        self.level = level_from_source(data)
+        # Entrées de la source, dans le même ordre que level.sections et level.spikes
+        self._section_entries: List[list] = data["sections"]
+        self._spike_entries: List[list] = data.get("spikes", [])
+        self._next_check = 0.0
+        self.reloads = 0
+        self.last_duration = 0.0
+
+    def poll(self) -> Optional[List[Union[GroundSection, Spike]]]:
+        """Recharge le niveau si le fichier a changé et renvoie les objets retirés ou ajoutés.
+
+        Renvoie ``None`` sans rechargement. Une source invalide (enregistrement
+        en cours, faute de frappe) lève ``ValueError`` et laisse le niveau intact.
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+        try:
+            stamp = _stamp(self.path)
+        except OSError:
+            # Fichier remplacé par l'éditeur : il sera relu au prochain passage.
+            return None
+        if stamp == self._stamp:
+            return None
+        started = time.perf_counter()
+        try:
+            changed = self.apply(read_level_source(self.path))
+        except OSError:
+            # Disparu ou verrouillé entre os.stat et la lecture : relu au prochain passage.
+            return None
+        except (KeyError, TypeError, RuntimeError, IndexError, ValueError) as error:
+            # JSON tronqué, entrée trop courte ou valeur non numérique : signalé une seule fois.
+            self._stamp = stamp
+            raise ValueError(f"{self.path} : source invalide ({error})") from error
+        self._stamp = stamp
+        self.last_duration = time.perf_counter() - started
+        self.reloads += 1
+        return changed
+
+    def apply(self, data: dict) -> List[Union[GroundSection, Spike]]:
+        """Applique une source déjà lue au niveau ; renvoie les objets retirés ou ajoutés."""
+        level = self.level
+        section_entries = data["sections"]
+        spike_entries = data.get("spikes", [])
+        removed: List[Union[GroundSection, Spike]] = []
+        added: List[Union[GroundSection, Spike]] = []
+        sections = _match(self._section_entries, level.sections, section_entries, section_from_entry, removed, added)
+        spikes = _match(self._spike_entries, level.spikes, spike_entries, spike_from_entry, removed, added)
+        spawn = data.get("spawn")
+        finish_x = level.finish_x
+        level.patch(
+            sections,
+            spikes,
+            removed,
+            added,
+            player_spawn=(float(spawn[0]), float(spawn[1])) if spawn is not None else None,
+            finish_x=data.get("finish_x"),
+        )
+        self._section_entries = section_entries
+        self._spike_entries = spike_entries
+        changed = removed + added
+        layers = self.layers
+        if layers is not None:
+            if level.finish_x != finish_x:
+                # Le drapeau et le nombre de colonnes du décor dépendent de l'arrivée.
+                layers.geometry.clear()
+                layers.columns.clear()
+            else:
+                for item in changed:
+                    layers.invalidate(*_extent(item))
+        return changed
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _extent(item: Union[GroundSection, Spike]) -> Tuple[float, float]:
+    if isinstance(item, GroundSection):
+        return item.rect.left, item.rect.right
+    return item.x, item.x + item.size
+
+
+def _match(
+    old_entries: List[list],
+    old_items: List[T],
+    entries: List[list],
+    build: Callable[[list], T],
+    removed: List[T],
+    added: List[T],
+) -> List[T]:
+    """Objets pour ``entries`` : ceux de ``old_items`` dont l'entrée existe toujours, les autres construits par ``build``.
+
+    Les objets abandonnés sont ajoutés à ``removed``, les nouveaux à ``added``.
+    """
+    start = _common_prefix(old_entries, entries)
+    end = _common_suffix(old_entries, entries, min(len(old_entries), len(entries)) - start)
+    old_stop = len(old_entries) - end
+    # Entre les deux : une entrée déplacée garde son objet, les autres sont reconstruites.
+    spare: Dict[tuple, List[T]] = {}
+    for entry, item in zip(old_entries[start:old_stop], old_items[start:old_stop]):
+        spare.setdefault(tuple(entry), []).append(item)
+    middle = []
+    for entry in entries[start:len(entries) - end]:
+        reused = spare.get(tuple(entry))
+        if reused:
+            middle.append(reused.pop())
+        else:
+            item = build(entry)
+            middle.append(item)
+            added.append(item)
+    for items in spare.values():
+        removed.extend(items)
+    return old_items[:start] + middle + old_items[old_stop:]
+
+
+def _common_prefix(old: List[list], new: List[list]) -> int:
+    limit = min(len(old), len(new))
+    start = 0
+    while start + COMPARE_BLOCK <= limit and old[start:start + COMPARE_BLOCK] == new[start:start + COMPARE_BLOCK]:
+        start += COMPARE_BLOCK
+    while start < limit and old[start] == new[start]:
+        start += 1
+    return start
+
+
+def _common_suffix(old: List[list], new: List[list], limit: int) -> int:
+    old_len = len(old)
+    new_len = len(new)
+    end = 0
+    while end + COMPARE_BLOCK <= limit and (
+        old[old_len - end - COMPARE_BLOCK:old_len - end] == new[new_len - end - COMPARE_BLOCK:new_len - end]
+    ):
+        end += COMPARE_BLOCK
+    while end < limit and old[old_len - 1 - end] == new[new_len - 1 - end]:
+        end += 1
+    return end
@@ -2,13 +2,32 @@
 
 from __future__ import annotations
 
+import argparse
+import os
 import sys
-from typing import Dict
+import time
+from typing import Dict, Optional, Sequence
 
 import pygame
 
+try:
+    import numpy
+except ImportError:  # dégradé construit ligne par ligne, pas de particules
+    numpy = None
+else:
+    from ghosts import GhostRecorder, GhostRenderer, load_ghosts
+    from particles import ParticleSystem, emit_effects
+
+from dirty import DirtyRegions
+from endless import EndlessLevel
+from inputs import JumpTimeline, TimedEvents
+from layers import StaticLayers
 from level import Level
-from objects import Player
+from level_file import open_level
+from level_watch import LevelWatcher
+from practice import PracticeMode
+from profiler import FrameProfiler, LatencyStats
+from replay import ReplayRecorder
 from settings import (
     BACKGROUND_COLUMN_COLOR,
     BACKGROUND_COLUMN_WIDTH,
@@ -17,35 +36,55 @@ from settings import (
     BACKGROUND_STRIPE_COLOR,
     BACKGROUND_STRIPE_SPACING,
     BACKGROUND_STRIPE_WIDTH,
-    CAMERA_OFFSET_X,
     FONT_NAME,
-    FPS,
     GROUND_HEIGHT,
     HEIGHT,
     HUD_BACKGROUND,
     HUD_COLOR,
     HUD_SHADOW_COLOR,
-    JUMP_BUFFER_FRAMES,
-    RUN_SPEED,
-    TARGET_FRAME_DURATION,
+    MAX_FRAME_BACKLOG,
+    MAX_RENDER_FPS,
+    RENDER_SCALE,
+    TICK_DURATION,
     TITLE,
     WIDTH,
 )
+from simulation import STATE_DEAD, STATE_MENU, STATE_PLAYING, STATE_WIN, Simulation
+from sprites import TextCache
+from telemetry import Telemetry, draw_heatmap
 
-STATE_MENU = "menu"
-STATE_PLAYING = "playing"
-STATE_DEAD = "dead"
-STATE_WIN = "win"
+TEXT_CACHE = TextCache()
 
 
 def create_vertical_gradient(size: tuple[int, int], top: tuple[int, int, int], bottom: tuple[int, int, int]) -> pygame.Surface:
     width, height = size
-    gradient = pygame.Surface((width, height)).convert()
+    if numpy is not None:
+        # Même calcul que la boucle ci-dessous sur une colonne, étirée ensuite en largeur.
+        ratio = numpy.arange(height) / max(height - 1, 1)
+        start = numpy.array(top[:3])
+        rows = (start + (numpy.array(bottom[:3]) - start) * ratio[:, None]).astype(numpy.uint8)
+        column = pygame.surfarray.make_surface(rows[None, :, :])
+        return _display_format(pygame.transform.scale(column, (width, height)))
+    gradient = pygame.Surface((width, height))
     for y in range(height):
         ratio = y / max(height - 1, 1)
         color = tuple(int(top[c] + (bottom[c] - top[c]) * ratio) for c in range(3))
         pygame.draw.line(gradient, color, (0, y), (width, y))
-    return gradient
+    return _display_format(gradient)
+
+
+def _display_format(surface: pygame.Surface) -> pygame.Surface:
+    # Sans fenêtre (rendu hors écran), la surface garde son format.
+    return surface.convert() if pygame.display.get_surface() is not None else surface
+
+
+def create_fonts() -> Dict[str, pygame.font.Font]:
+    return {
+        "title": pygame.font.Font(FONT_NAME, 54),
+        "medium": pygame.font.Font(FONT_NAME, 28),
+        "small": pygame.font.Font(FONT_NAME, 22),
+        "tiny": pygame.font.Font(FONT_NAME, 16),
+    }
 
 
 def draw_background(surface: pygame.Surface, gradient: pygame.Surface, cam_x: float, level: Level) -> None:
@@ -56,20 +95,21 @@ def draw_background(surface: pygame.Surface, gradient: pygame.Surface, cam_x: fl
     for x in range(start, end, BACKGROUND_STRIPE_SPACING):
         stripe_rect = pygame.Rect(int(x - offset), 0, BACKGROUND_STRIPE_WIDTH, HEIGHT)
         pygame.draw.rect(surface, BACKGROUND_STRIPE_COLOR, stripe_rect)
-    for column_x, column_height in level.background_columns:
+    parallax_x = cam_x * 0.5
+    for column_x, column_height in level.background_columns_in(parallax_x, parallax_x + WIDTH):
         screen_x = int(column_x - cam_x * 0.5)
         rect = pygame.Rect(screen_x, HEIGHT - GROUND_HEIGHT - column_height, BACKGROUND_COLUMN_WIDTH, column_height)
         pygame.draw.rect(surface, BACKGROUND_COLUMN_COLOR, rect, border_radius=6)
 
 
 def draw_centered_text(surface: pygame.Surface, font: pygame.font.Font, text: str, position: tuple[int, int]) -> None:
-    img = font.render(text, True, HUD_COLOR)
+    img = TEXT_CACHE.render(font, text, HUD_COLOR)
     rect = img.get_rect(center=position)
     surface.blit(img, rect)
 
 
 def draw_banner(surface: pygame.Surface, font: pygame.font.Font, text: str) -> None:
-    img = font.render(text, True, HUD_COLOR)
+    img = TEXT_CACHE.render(font, text, HUD_COLOR)
     rect = img.get_rect(center=(WIDTH // 2, HEIGHT // 2))
     background = rect.inflate(32, 24)
     shadow = background.inflate(12, 12)
@@ -78,7 +118,18 @@ def draw_banner(surface: pygame.Surface, font: pygame.font.Font, text: str) -> N
     surface.blit(img, rect)
 
 
-def draw_hud(surface: pygame.Surface, fonts: Dict[str, pygame.font.Font], progress: float, attempt: int, state: str) -> None:
+HUD_PROGRESS_AREA = pygame.Rect(WIDTH // 2 - 170, 14, 340, 56)
+HUD_ATTEMPT_AREA = pygame.Rect(12, 12, 280, 64)
+
+
+def draw_hud(
+    surface: pygame.Surface,
+    fonts: Dict[str, pygame.font.Font],
+    progress: float,
+    attempt: int,
+    state: str,
+    checkpoints: Optional[int] = None,
+) -> None:
     bar_rect = pygame.Rect(WIDTH // 2 - 160, 24, 320, 16)
     shadow_rect = bar_rect.inflate(8, 8)
     pygame.draw.rect(surface, HUD_SHADOW_COLOR, shadow_rect, border_radius=10)
@@ -87,21 +138,35 @@ def draw_hud(surface: pygame.Surface, fonts: Dict[str, pygame.font.Font], progre
     inner_rect.width = int(inner_rect.width * progress)
     if inner_rect.width > 0:
         pygame.draw.rect(surface, HUD_COLOR, inner_rect, border_radius=6)
-    percent = fonts["tiny"].render(f"{int(progress * 100):02d}%", True, HUD_COLOR)
+    percent = TEXT_CACHE.render(fonts["tiny"], f"{int(progress * 100):02d}%", HUD_COLOR)
     percent_rect = percent.get_rect(midtop=(bar_rect.centerx, bar_rect.bottom + 6))
     surface.blit(percent, percent_rect)
 
     if attempt > 0 and state != STATE_MENU:
-        attempt_img = fonts["small"].render(f"Essai {attempt}", True, HUD_COLOR)
+        attempt_img = TEXT_CACHE.render(fonts["small"], f"Essai {attempt}", HUD_COLOR)
         surface.blit(attempt_img, (20, 20))
+    if checkpoints is not None:
+        practice_img = TEXT_CACHE.render(fonts["tiny"], f"Entraînement : {checkpoints} point(s)  (C / X)", HUD_COLOR)
+        surface.blit(practice_img, (20, 50))
 
-    controls_text = "Espace : saut  |  R : recommencer  |  Échap : quitter"
-    controls_img = fonts["tiny"].render(controls_text, True, HUD_COLOR)
+    controls_text = "Espace : saut  |  R : recommencer  |  P : entraînement  |  Échap : quitter"
+    controls_img = TEXT_CACHE.render(fonts["tiny"], controls_text, HUD_COLOR)
     controls_rect = controls_img.get_rect(midbottom=(WIDTH // 2, HEIGHT - 16))
     surface.blit(controls_img, controls_rect)
 
 
-def run() -> None:
+def run(
+    level_path: Optional[str] = None,
+    dirty_rects: bool = False,
+    max_fps: int = MAX_RENDER_FPS,
+    profile: bool = False,
+    record_dir: Optional[str] = None,
+    endless_seed: Optional[int] = None,
+    render_scale: float = RENDER_SCALE,
+    ghost_paths: Sequence[str] = (),
+    telemetry_dir: Optional[str] = None,
+    watch: bool = False,
+) -> None:
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption(TITLE)
@@ -109,103 +174,254 @@ def run() -> None:
 
     gradient = create_vertical_gradient((WIDTH, HEIGHT), BACKGROUND_GRADIENT_TOP, BACKGROUND_GRADIENT_BOTTOM)
 
-    fonts = {
-        "title": pygame.font.Font(FONT_NAME, 54),
-        "medium": pygame.font.Font(FONT_NAME, 28),
-        "small": pygame.font.Font(FONT_NAME, 22),
-        "tiny": pygame.font.Font(FONT_NAME, 16),
-    }
-
-    level = Level()
-    player = Player(level.player_spawn)
-
-    cam_x = 0.0
-    state = STATE_MENU
-    attempt = 0
-    jump_buffer = 0
-    jump_held = False
-
-    def start_run(start_with_jump: bool) -> None:
-        nonlocal state, attempt, cam_x, jump_buffer, jump_held
-        level.reset()
-        player.reset(level.player_spawn)
-        cam_x = 0.0
-        jump_buffer = JUMP_BUFFER_FRAMES if start_with_jump else 0
-        jump_held = start_with_jump
-        state = STATE_PLAYING
-        attempt += 1
+    fonts = create_fonts()
+
+    watcher = None
+    if endless_seed is not None:
+        level = EndlessLevel(endless_seed)
+    elif watch:
+        watcher = LevelWatcher(level_path)
+        level = watcher.level
+    else:
+        level = open_level(level_path) if level_path else Level()
+    sim = Simulation(level)
+    player = sim.player
+    layers = StaticLayers(level, gradient, scale=render_scale)
+    if watcher is not None:
+        watcher.layers = layers
+    # Décor dessiné en résolution réduite puis agrandi d'un seul coup à l'écran.
+    world = None
+    if render_scale != 1:
+        world = pygame.Surface((round(WIDTH * render_scale), round(HEIGHT * render_scale))).convert()
+    dirty = DirtyRegions(screen.get_rect()) if dirty_rects and world is None else None
+    particles = ParticleSystem() if numpy is not None else None
+    ghosts = GhostRenderer(load_ghosts(ghost_paths, level)) if numpy is not None else None
+    ghost_recorder = GhostRecorder() if ghosts is not None else None
+    practice = PracticeMode()
+    telemetry_path = None
+    if telemetry_dir is not None:
+        os.makedirs(telemetry_dir, exist_ok=True)
+        if endless_seed is not None:
+            name = f"endless-{endless_seed}"
+        else:
+            name = os.path.splitext(os.path.basename(level_path))[0] if level_path else "origine"
+        telemetry_path = os.path.join(telemetry_dir, f"{name}.gdh")
+    telemetry = Telemetry(telemetry_path)
+    if telemetry_path is not None and os.path.exists(telemetry_path) and numpy is not None:
+        telemetry.load_history([telemetry_path])
+    show_heatmap = False
+    hud_values = None
+    backlog = 0.0
+    profiler = FrameProfiler(enabled=profile)
+    sim.profiler = profiler
+    if record_dir is not None:
+        os.makedirs(record_dir, exist_ok=True)
+        sim.recorder = ReplayRecorder(seed=endless_seed or 0)
+    debug_font = None
+    latency = LatencyStats()
+    events = TimedEvents(latency)
+    jumps = JumpTimeline(latency)
 
     while True:
-        dt = clock.tick(FPS)
-        for event in pygame.event.get():
+        backlog = min(backlog + clock.tick(max_fps), MAX_FRAME_BACKLOG)
+        frame_time = time.perf_counter_ns()
+        started = profiler.begin()
+        for stamp, event in events.drain():
             if event.type == pygame.QUIT:
+                telemetry.close()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
+                    telemetry.close()
                     pygame.quit()
                     sys.exit()
-                if event.key == pygame.K_SPACE:
-                    if state == STATE_PLAYING:
-                        jump_buffer = JUMP_BUFFER_FRAMES
-                    jump_held = True
-                if state == STATE_MENU and event.key in (pygame.K_SPACE, pygame.K_RETURN):
-                    start_run(event.key == pygame.K_SPACE)
-                elif state in (STATE_DEAD, STATE_WIN) and event.key in (pygame.K_SPACE, pygame.K_RETURN, pygame.K_r):
-                    start_run(event.key == pygame.K_SPACE)
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                elif event.key == pygame.K_F4 and len(profiler):
+                    profiler.dump_csv(time.strftime("profile-%Y%m%d-%H%M%S.csv"))
+                    latency.dump_csv(time.strftime("latency-%Y%m%d-%H%M%S.csv"))
+                elif event.key == pygame.K_F5:
+                    show_heatmap = not show_heatmap
+                elif event.key == pygame.K_SPACE:
+                    jumps.record(stamp, True)
+                elif event.key == pygame.K_p:
+                    practice.toggle()
+                elif event.key == pygame.K_c:
+                    practice.place(sim)
+                elif event.key == pygame.K_x:
+                    practice.remove_last()
+                elif sim.state == STATE_MENU and event.key == pygame.K_RETURN:
+                    sim.start_run(False)
+                elif sim.state in (STATE_DEAD, STATE_WIN) and event.key in (pygame.K_RETURN, pygame.K_r):
+                    sim.start_run(False)
             if event.type == pygame.KEYUP and event.key == pygame.K_SPACE:
-                jump_held = False
-
-        if state == STATE_PLAYING:
-            scale = max(0.5, min(2.0, dt / TARGET_FRAME_DURATION))
-            player.advance(RUN_SPEED * scale)
-            player.apply_gravity(scale)
-            player.handle_ground(level.ground_iter())
-            if player.can_jump() and (jump_buffer > 0 or jump_held):
-                player.jump()
-                jump_buffer = 0
-            elif jump_buffer > 0:
-                jump_buffer -= 1
-            player.update_rotation()
-
-            if player.hits_spikes(level.spikes) or player.rect.top > HEIGHT + 200:
-                state = STATE_DEAD
-                jump_buffer = 0
-                jump_held = False
-            elif player.rect.left >= level.finish_x:
-                state = STATE_WIN
-                jump_buffer = 0
-                jump_held = False
-
-            target_cam = max(0.0, player.rect.centerx - CAMERA_OFFSET_X)
-            cam_x += (target_cam - cam_x) * 0.12
-        elif state in (STATE_DEAD, STATE_WIN):
-            player.update_rotation()
-
-        if state == STATE_MENU:
-            player.reset(level.player_spawn)
-            cam_x = 0.0
-
-        progress_value = level.progress(player.rect.centerx if state != STATE_MENU else level.player_spawn[0])
-        if state == STATE_WIN:
-            progress_value = 1.0
-
-        draw_background(screen, gradient, cam_x, level)
-        level.draw(screen, cam_x)
-        player.draw(screen, cam_x)
-
-        if state == STATE_MENU:
-            draw_centered_text(screen, fonts["title"], "Geometry Dash - Premier saut", (WIDTH // 2, HEIGHT // 2 - 90))
-            draw_centered_text(screen, fonts["medium"], "Appuie sur ESPACE pour lancer la course", (WIDTH // 2, HEIGHT // 2))
-            draw_centered_text(screen, fonts["small"], "Maintiens ESPACE pour enchaîner les sauts", (WIDTH // 2, HEIGHT // 2 + 40))
-        elif state == STATE_DEAD:
-            draw_banner(screen, fonts["medium"], "Aïe ! Un pic t'a arrêté…")
-        elif state == STATE_WIN:
-            draw_banner(screen, fonts["medium"], "Bravo ! Niveau terminé 🎉")
-
-        draw_hud(screen, fonts, progress_value, attempt, state)
-        pygame.display.flip()
+                jumps.record(stamp, False)
+
+        profiler.end("events", started)
+
+        if watcher is not None:
+            try:
+                changed = watcher.poll()
+            except ValueError as error:
+                print(f"Rechargement ignoré : {error}", file=sys.stderr)
+            else:
+                if changed is not None:
+                    print(
+                        f"Niveau rechargé : {len(changed)} objet(s) modifié(s) en {watcher.last_duration * 1000:.1f} ms",
+                        file=sys.stderr,
+                    )
+                    if dirty is not None:
+                        dirty.invalidate()
+
+        # Physique à pas fixe : si la machine prend du retard, on enchaîne les
+        # pas et c'est l'affichage qui saute des images. Chaque pas couvre un
+        # intervalle de temps réel ; les appuis y sont appliqués à leur instant.
+        started = profiler.begin()
+        while backlog >= TICK_DURATION:
+            backlog -= TICK_DURATION
+            jumps.apply(sim, frame_time - int(backlog * 1e6))
+            sim.update()
+            if particles is not None:
+                particles.update()
+                emit_effects(particles, sim)
+            if ghost_recorder is not None:
+                ghost_recorder.update(sim)
+            telemetry.observe(sim)
+            practice.update(sim)
+            if sim.state == STATE_DEAD:
+                practice.respawn(sim)
+        profiler.end("physics", started)
+        telemetry.flush()
+        if ghost_recorder is not None:
+            for track in ghost_recorder.take():
+                ghosts.add(track)
+        if sim.recorder is not None:
+            for replay in sim.recorder.take():
+                replay.save(os.path.join(record_dir, time.strftime(f"run-%Y%m%d-%H%M%S-{sim.attempt}.gdr")))
+        state = sim.state
+        cam_x, player_offset = sim.interpolate(backlog / TICK_DURATION)
+        progress_value = sim.progress
+
+        regions = None
+        if dirty is not None and not profiler.enabled and not show_heatmap:
+            damaged = [player.screen_bounds(cam_x, player_offset)]
+            if particles is not None:
+                bounds = particles.screen_bounds(cam_x, screen.get_rect())
+                if bounds is not None:
+                    damaged.append(bounds)
+            values = (progress_value, sim.attempt, practice.active and len(practice))
+            if values != hud_values:
+                damaged += [HUD_PROGRESS_AREA, HUD_ATTEMPT_AREA]
+                hud_values = values
+            regions = dirty.plan(cam_x, state, damaged)
+
+        if world is not None:
+            started = profiler.begin()
+            layers.draw_background(world, cam_x)
+            profiler.end("background", started)
+            started = profiler.begin()
+            layers.draw_level(world, cam_x)
+            pygame.transform.scale(world, screen.get_size(), screen)
+            profiler.end("level", started)
+
+        for clip in [None] if regions is None else regions:
+            screen.set_clip(clip)
+            if world is None:
+                started = profiler.begin()
+                layers.draw_background(screen, cam_x)
+                profiler.end("background", started)
+                started = profiler.begin()
+                layers.draw_level(screen, cam_x)
+                profiler.end("level", started)
+            if practice.active:
+                practice.draw(screen, cam_x)
+            if particles is not None:
+                started = profiler.begin()
+                particles.draw(screen, cam_x)
+                profiler.end("particles", started)
+            if ghosts is not None and state != STATE_MENU:
+                started = profiler.begin()
+                # Après la fin de la partie, les fantômes restent figés au dernier pas joué.
+                ghosts.draw(screen, sim.frame, cam_x, backlog / TICK_DURATION if state == STATE_PLAYING else 1.0)
+                profiler.end("ghosts", started)
+            started = profiler.begin()
+            player.draw(screen, cam_x, player_offset)
+            profiler.end("player", started)
+
+            started = profiler.begin()
+            if state == STATE_MENU:
+                draw_centered_text(screen, fonts["title"], "Geometry Dash - Premier saut", (WIDTH // 2, HEIGHT // 2 - 90))
+                draw_centered_text(screen, fonts["medium"], "Appuie sur ESPACE pour lancer la course", (WIDTH // 2, HEIGHT // 2))
+                draw_centered_text(screen, fonts["small"], "Maintiens ESPACE pour enchaîner les sauts", (WIDTH // 2, HEIGHT // 2 + 40))
+            elif state == STATE_DEAD:
+                draw_banner(screen, fonts["medium"], "Aïe ! Un pic t'a arrêté…")
+            elif state == STATE_WIN:
+                draw_banner(screen, fonts["medium"], "Bravo ! Niveau terminé 🎉")
+
+            draw_hud(screen, fonts, progress_value, sim.attempt, state, len(practice) if practice.active else None)
+            profiler.end("hud", started)
+        screen.set_clip(None)
+        if (profiler.enabled or show_heatmap) and debug_font is None:
+            debug_font = pygame.font.SysFont("monospace", 14)
+        if show_heatmap:
+            draw_heatmap(screen, debug_font, telemetry.deaths, cam_x)
+        if profiler.enabled:
+            profiler.draw_overlay(screen, debug_font, latency.lines())
+
+        events.poll()
+        started = profiler.begin()
+        DirtyRegions.present(regions)
+        profiler.end("present", started)
+        jumps.presented()
+        profiler.end_frame()
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("level", nargs="?", help="niveau à charger (.json ou .gdl)")
+    parser.add_argument("--dirty", action="store_true", help="n'envoie à l'écran que les zones modifiées (en pleine résolution)")
+    parser.add_argument(
+        "--render-scale",
+        type=float,
+        default=RENDER_SCALE,
+        help="résolution interne du décor, entre 0 et 1 (ex. 0.5 ou 0.75)",
+    )
+    parser.add_argument("--max-fps", type=int, default=MAX_RENDER_FPS, help="limite d'images par seconde (0 = aucune)")
+    parser.add_argument("--profile", action="store_true", help="affiche le profil par phase (F3 / F4 pour l'export CSV)")
+    parser.add_argument("--record", metavar="DOSSIER", help="enregistre chaque essai terminé en relecture .gdr")
+    parser.add_argument("--endless", type=int, metavar="GRAINE", help="mode sans fin généré à partir de GRAINE")
+    parser.add_argument(
+        "--ghosts",
+        nargs="+",
+        default=[],
+        metavar="FICHIER",
+        help="relectures .gdr (ou trajectoires .ghost.npy) à afficher en fantômes",
+    )
+    parser.add_argument("--telemetry", metavar="DOSSIER", help="ajoute morts et progression à DOSSIER/<niveau>.gdh (F5 : carte)")
+    parser.add_argument("--watch", action="store_true", help="recharge le niveau (.json) à chaque modification du fichier")
+    args = parser.parse_args(argv)
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale doit être compris entre 0 et 1")
+    if args.endless is not None and not 0 <= args.endless < 2 ** 64:
+        # La graine est enregistrée dans les relectures sur 64 bits non signés.
+        parser.error("--endless demande une graine entre 0 et 2^64 - 1")
+    if args.watch and (args.endless is not None or not (args.level or "").endswith(".json")):
+        parser.error("--watch demande une source de niveau .json")
+    return args
 
 
 if __name__ == "__main__":
-    run()
+    args = parse_args(sys.argv[1:])
+    run(
+        args.level,
+        dirty_rects=args.dirty,
+        max_fps=args.max_fps,
+        profile=args.profile,
+        record_dir=args.record,
+        endless_seed=args.endless,
+        render_scale=args.render_scale,
+        ghost_paths=args.ghosts,
+        telemetry_dir=args.telemetry,
+        watch=args.watch,
+    )
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, Tuple
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
 
 import pygame
 from pygame import Rect
@@ -23,6 +24,7 @@ from settings import (
     SPIKE_COLOR,
     SPIKE_SIZE,
 )
+from sprites import RotationAtlas
 
 
 @dataclass
@@ -40,6 +42,10 @@ class GroundSection:
         pygame.draw.rect(surface, self.highlight, highlight_rect)
 
 
+# Pics coupés par le bord gauche, par (taille, couleur, sommets) : quelques variantes par taille
+_SPIKE_SPRITES: Dict[Tuple[int, Tuple[int, ...], Tuple[Tuple[int, int], ...]], pygame.Surface] = {}
+
+
 @dataclass
 class Spike:
     """Obstacle triangulaire classique de Geometry Dash."""
@@ -48,6 +54,10 @@ class Spike:
     base_y: float
     size: int = SPIKE_SIZE
     color: Tuple[int, int, int] = SPIKE_COLOR
+    shape: SpikeShape = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.shape = SpikeShape(self)
 
     @property
     def rect(self) -> Rect:
@@ -55,40 +65,100 @@ class Spike:
 
     def draw(self, surface: pygame.Surface, cam_x: float) -> None:
         sx = self.x - cam_x
-        points = [
-            (int(sx), int(self.base_y)),
-            (int(sx + self.size / 2), int(self.base_y - self.size)),
-            (int(sx + self.size), int(self.base_y)),
+        if int(sx) < surface.get_clip().left <= int(sx + self.size):
+            # Coupé par le bord gauche, le polygone gagne un pixel (arête recadrée
+            # avec arrondi par pygame) et int() arrondit vers zéro : le pic est
+            # dessiné entier à part, en coordonnées positives, puis posé.
+            left = math.floor(sx)
+            top = math.floor(self.base_y - self.size)
+            points = self._points(sx - left, self.base_y - top)
+            key = (int(self.size), tuple(self.color), tuple(points))
+            sprite = _SPIKE_SPRITES.get(key)
+            if sprite is None:
+                sprite = pygame.Surface((int(self.size) + 2, int(self.size) + 2), pygame.SRCALPHA)
+                pygame.draw.polygon(sprite, self.color, points)
+                _SPIKE_SPRITES[key] = sprite
+            surface.blit(sprite, (left, top))
+            return
+        pygame.draw.polygon(surface, self.color, self._points(sx, self.base_y))
+
+    def _points(self, sx: float, base_y: float) -> List[Tuple[int, int]]:
+        return [
+            (int(sx), int(base_y)),
+            (int(sx + self.size / 2), int(base_y - self.size)),
+            (int(sx + self.size), int(base_y)),
         ]
-        pygame.draw.polygon(surface, self.color, points)
 
     def collides(self, player_rect: Rect) -> bool:
-        spike_box = self.rect
-        if not spike_box.colliderect(player_rect):
+        return self.shape.collides(player_rect)
+
+
+class SpikeShape:
+    """Géométrie de collision d'un pic, précalculée à la construction.
+
+    Boîte englobante entière et coefficients barycentriques du triangle
+    (a = bas gauche, b = pointe, c = bas droit). Le test reprend exactement les
+    trois points de contrôle du joueur et le même calcul flottant qu'auparavant,
+    sans créer de ``Rect`` ni de tuple.
+    """
+
+    __slots__ = ("left", "top", "right", "bottom", "cx", "cy", "k1", "k2", "k3", "k4", "denom")
+
+    def __init__(self, spike: Spike) -> None:
+        size = int(spike.size)
+        self.left = int(spike.x)
+        self.top = int(spike.base_y - spike.size)
+        self.right = self.left + size
+        self.bottom = self.top + size
+        ax, ay = self.left, self.bottom
+        bx, by = self.left + size // 2, self.top
+        cx, cy = self.right, self.bottom
+        self.cx = cx
+        self.cy = cy
+        self.k1 = by - cy
+        self.k2 = cx - bx
+        self.k3 = cy - ay
+        self.k4 = ax - cx
+        self.denom = self.k1 * (ax - cx) + self.k2 * (ay - cy)
+
+    def collides(self, player_rect: Rect) -> bool:
+        left = player_rect.x
+        top = player_rect.y
+        width = player_rect.w
+        height = player_rect.h
+        right = left + width
+        bottom = top + height
+        if width <= 0 or height <= 0 or self.denom == 0:
             return False
-        a = (spike_box.left, spike_box.bottom)
-        b = (spike_box.centerx, spike_box.top)
-        c = (spike_box.right, spike_box.bottom)
-        test_points = [
-            (player_rect.left, player_rect.bottom),
-            (player_rect.right, player_rect.bottom),
-            (player_rect.centerx, player_rect.centery),
-        ]
-        return any(_point_in_triangle(p, a, b, c) for p in test_points)
+        if left >= self.right or right <= self.left or top >= self.bottom or bottom <= self.top:
+            return False
+        return (
+            self._contains(left, bottom)
+            or self._contains(right, bottom)
+            or self._contains(left + width // 2, top + height // 2)
+        )
+
+    def _contains(self, px: int, py: int) -> bool:
+        dx = px - self.cx
+        dy = py - self.cy
+        denom = self.denom
+        u = (self.k1 * dx + self.k2 * dy) / denom
+        if u < 0 or u > 1:
+            return False
+        v = (self.k3 * dx + self.k4 * dy) / denom
+        if v < 0 or v > 1:
+            return False
+        w = 1 - u - v
+        return 0 <= w <= 1
 
 
-def _point_in_triangle(p: Tuple[int, int], a, b, c) -> bool:
-    (px, py) = p
-    (ax, ay) = a
-    (bx, by) = b
-    (cx, cy) = c
-    denom = (by - cy) * (ax - cx) + (cx - bx) * (ay - cy)
-    if denom == 0:
-        return False
-    u = ((by - cy) * (px - cx) + (cx - bx) * (py - cy)) / denom
-    v = ((cy - ay) * (px - cx) + (ax - cx) * (py - cy)) / denom
-    w = 1 - u - v
-    return 0 <= u <= 1 and 0 <= v <= 1 and 0 <= w <= 1
+def create_cube_surface() -> pygame.Surface:
+    """Sprite du cube sans rotation (aussi utilisé par les fantômes)."""
+    surf = pygame.Surface((PLAYER_SIZE, PLAYER_SIZE), pygame.SRCALPHA)
+    pygame.draw.rect(surf, PLAYER_BORDER_COLOR, (0, 0, PLAYER_SIZE, PLAYER_SIZE), border_radius=10)
+    pygame.draw.rect(surf, PLAYER_COLOR, (4, 4, PLAYER_SIZE - 8, PLAYER_SIZE - 8), border_radius=8)
+    pygame.draw.circle(surf, (255, 255, 255, 90), (PLAYER_SIZE - 10, 10), 6)
+    return surf
 
 
 class Player:
@@ -105,16 +175,14 @@ class Player:
         self.on_ground = True
         self.coyote_frames = COYOTE_FRAMES
         self.rotation = 0.0
+        self.landed = False
         self._base_surface = self._create_base_surface()
         self._shadow_surface = self._create_shadow_surface()
+        self._rotations: RotationAtlas | None = None
         self.reset(spawn)
 
     def _create_base_surface(self) -> pygame.Surface:
-        surf = pygame.Surface((PLAYER_SIZE, PLAYER_SIZE), pygame.SRCALPHA)
-        pygame.draw.rect(surf, PLAYER_BORDER_COLOR, (0, 0, PLAYER_SIZE, PLAYER_SIZE), border_radius=10)
-        pygame.draw.rect(surf, PLAYER_COLOR, (4, 4, PLAYER_SIZE - 8, PLAYER_SIZE - 8), border_radius=8)
-        pygame.draw.circle(surf, (255, 255, 255, 90), (PLAYER_SIZE - 10, 10), 6)
-        return surf
+        return create_cube_surface()
 
     def _create_shadow_surface(self) -> pygame.Surface:
         width = PLAYER_SIZE + 14
@@ -123,6 +191,13 @@ class Player:
         pygame.draw.ellipse(surf, SHADOW_COLOR, surf.get_rect())
         return surf
 
+    @property
+    def rotations(self) -> RotationAtlas:
+        """Rotations précalculées du cube, construites au premier rendu."""
+        if self._rotations is None:
+            self._rotations = RotationAtlas(self._base_surface, AIR_ROTATION_SPEED)
+        return self._rotations
+
     def reset(self, spawn: Tuple[float, float] | None = None) -> None:
         if spawn is not None:
             self.spawn_point = (float(spawn[0]), float(spawn[1]))
@@ -136,20 +211,23 @@ class Player:
         self.on_ground = True
         self.coyote_frames = COYOTE_FRAMES
         self.rotation = 0.0
+        self.landed = False
 
     def advance(self, dx: float) -> None:
         self._pos_x += dx
         self.rect.x = int(round(self._pos_x))
 
-    def apply_gravity(self, scale: float = 1.0) -> None:
+    def apply_gravity(self) -> None:
         self.prev_top = self.rect.top
         self.prev_bottom = self.rect.bottom
-        self.vel_y = min(self.vel_y + GRAVITY * scale, MAX_FALL_SPEED)
-        self._pos_y += self.vel_y * scale
+        self.vel_y = min(self.vel_y + GRAVITY, MAX_FALL_SPEED)
+        self._pos_y += self.vel_y
         self.rect.y = int(round(self._pos_y))
 
     def handle_ground(self, sections: Iterable[GroundSection]) -> None:
+        """Pose le cube sur le sol ; ``landed`` indique s'il vient de toucher le sol après un saut ou une chute."""
         landed = False
+        self.landed = False
         for section in sections:
             tile = section.rect
             if not self.rect.colliderect(tile):
@@ -158,6 +236,7 @@ class Player:
                 self.rect.bottom = tile.top
                 self._pos_y = float(self.rect.y)
                 self.vel_y = 0.0
+                self.landed = not self.on_ground
                 self.on_ground = True
                 self.coyote_frames = COYOTE_FRAMES
                 landed = True
@@ -188,15 +267,26 @@ class Player:
         else:
             self.rotation = (self.rotation + AIR_ROTATION_SPEED) % 360
 
-    def draw(self, surface: pygame.Surface, cam_x: float) -> None:
+    def draw(self, surface: pygame.Surface, cam_x: float, offset: Tuple[float, float] = (0.0, 0.0)) -> None:
+        """Dessine le cube, éventuellement décalé de ``offset`` (interpolation entre deux pas)."""
+        center_x = self.rect.centerx + offset[0] - cam_x
         shadow_pos = (
-            int(self.rect.centerx - cam_x - self._shadow_surface.get_width() / 2),
-            int(self.rect.bottom + 6 - self._shadow_surface.get_height() / 2),
+            int(center_x - self._shadow_surface.get_width() / 2),
+            int(self.rect.bottom + offset[1] + 6 - self._shadow_surface.get_height() / 2),
         )
         surface.blit(self._shadow_surface, shadow_pos)
-        rotated = pygame.transform.rotate(self._base_surface, self.rotation)
-        dest = rotated.get_rect(center=(int(self.rect.centerx - cam_x), int(self.rect.centery)))
-        surface.blit(rotated, dest)
+        sprite, (dx, dy) = self.rotations.get(self.rotation)
+        surface.blit(sprite, (int(center_x) + dx, int(self.rect.centery + offset[1]) + dy))
+
+    def screen_bounds(self, cam_x: float, offset: Tuple[float, float] = (0.0, 0.0)) -> Rect:
+        """Zone de l'écran couverte par l'ombre et le cube, quelle que soit sa rotation."""
+        center = (int(self.rect.centerx + offset[0] - cam_x), int(self.rect.centery + offset[1]))
+        side = int(PLAYER_SIZE * 1.415) + 2
+        bounds = Rect(0, 0, side, side)
+        bounds.center = center
+        shadow = self._shadow_surface.get_rect()
+        shadow.center = (center[0], int(self.rect.bottom + offset[1] + 6))
+        return bounds.union(shadow.inflate(2, 2))
 
     def hits_spikes(self, spikes: Iterable[Spike]) -> bool:
         return any(spike.collides(self.rect) for spike in spikes)
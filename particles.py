@@ -0,0 +1,261 @@
+"""Particules (traînée du cube, poussière d'atterrissage, explosion) stockées en tableaux NumPy.
+
+Le réservoir a une capacité fixe : quand il est plein, les particules les plus
+anciennes sont remplacées. L'intégration et l'élimination se font sur les
+tableaux entiers, sans objet Python par particule. Le rendu n'appelle pas
+``blit`` par particule : chaque apparence (type, niveau d'estompage) est
+précalculée en « tampon » (décalages des pixels d'un disque et couleur), et
+tous les tampons d'une même taille sont écrits en une fois dans les pixels de
+la surface. Cette écriture directe suppose des pixels de 32 bits ; sur toute
+autre surface, les tampons deviennent de petits sprites posés par un seul
+appel à ``Surface.blits``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from settings import (
+    BACKGROUND_GRADIENT_BOTTOM,
+    GROUND_HIGHLIGHT,
+    HEIGHT,
+    PARTICLE_CAPACITY,
+    PARTICLE_DRAG,
+    PLAYER_COLOR,
+    SPIKE_COLOR,
+)
+from simulation import EVENT_DEATH, EVENT_JUMP, EVENT_LAND, STATE_PLAYING, Simulation
+
+KIND_TRAIL = 0
+KIND_DUST = 1
+KIND_SPARK = 2
+KIND_EMBER = 3
+
+# Par type : couleur, rayon maximal (px) et gravité (px par pas²)
+PARTICLE_KINDS: Tuple[Tuple[Tuple[int, int, int], int, float], ...] = (
+    (PLAYER_COLOR, 2, 0.0),
+    (GROUND_HIGHLIGHT, 2, 0.18),
+    (PLAYER_COLOR, 3, 0.32),
+    (SPIKE_COLOR, 2, 0.25),
+)
+# Niveaux d'estompage : une particule rétrécit et tend vers la couleur du fond en vieillissant.
+FADE_STEPS = 6
+FADE_COLOR = BACKGROUND_GRADIENT_BOTTOM
+MAX_RADIUS = max(radius for _, radius, _ in PARTICLE_KINDS)
+
+
+def _disc(radius: int) -> Tuple[List[int], List[int]]:
+    """Décalages (dx, dy) des pixels d'un disque de ``radius`` px (1 px, croix, disque...)."""
+    span = range(-radius + 1, radius)
+    offsets = [(dx, dy) for dy in span for dx in span if dx * dx + dy * dy <= (radius - 1) ** 2]
+    return [dx for dx, _ in offsets], [dy for _, dy in offsets]
+
+
+class ParticleSystem:
+    """Réservoir de ``capacity`` particules en structure de tableaux (coordonnées du monde).
+
+    ``update`` avance d'un pas fixe, comme ``Simulation.update`` ; ``draw``
+    dessine les particules visibles et renvoie leur nombre.
+    """
+
+    def __init__(self, capacity: int = PARTICLE_CAPACITY, seed: Optional[int] = None) -> None:
+        self.capacity = int(capacity)
+        n = self.capacity
+        self.x = np.zeros(n, dtype=np.float32)
+        self.y = np.zeros(n, dtype=np.float32)
+        self.vx = np.zeros(n, dtype=np.float32)
+        self.vy = np.zeros(n, dtype=np.float32)
+        self.gravity = np.zeros(n, dtype=np.float32)
+        self.life = np.zeros(n, dtype=np.int16)
+        self.lifetime = np.ones(n, dtype=np.int16)
+        self.kind = np.zeros(n, dtype=np.uint8)
+        self.live = 0
+        self._cursor = 0
+        self._rng = np.random.default_rng(seed)
+        # Tampons : rayon et couleur de chaque apparence (type * FADE_STEPS + estompage)
+        radii: List[int] = []
+        colors: List[Tuple[int, int, int]] = []
+        for color, radius, _ in PARTICLE_KINDS:
+            for fade in range(FADE_STEPS):
+                ratio = (fade + 1) / FADE_STEPS
+                radii.append(max(1, round(radius * ratio)))
+                colors.append(tuple(int(FADE_COLOR[c] + (color[c] - FADE_COLOR[c]) * ratio) for c in range(3)))
+        self._stamp_radius = np.array(radii, dtype=np.uint8)
+        self._stamp_colors = colors
+        self._discs: Dict[int, Tuple[List[int], List[int]]] = {radius: _disc(radius) for radius in set(radii)}
+        self._mapped: Dict[Tuple[int, ...], np.ndarray] = {}
+        self._sprites: Optional[List[pygame.Surface]] = None
+
+    def __len__(self) -> int:
+        return self.live
+
+    def clear(self) -> None:
+        self.life[:] = 0
+        self.live = 0
+
+    def emit(
+        self,
+        kind: int,
+        x: float,
+        y: float,
+        count: int,
+        speed: Tuple[float, float],
+        angle: Tuple[float, float],
+        lifetime: Tuple[int, int],
+        spread: float = 0.0,
+    ) -> None:
+        """Émet ``count`` particules autour de (x, y) ; ``angle`` en degrés (90 = vers le haut)."""
+        count = min(int(count), self.capacity)
+        if count <= 0:
+            return
+        rng = self._rng
+        slots = (self._cursor + np.arange(count)) % self.capacity
+        self._cursor = (self._cursor + count) % self.capacity
+        theta = np.radians(rng.uniform(angle[0], angle[1], count))
+        velocity = rng.uniform(speed[0], speed[1], count)
+        self.x[slots] = x + rng.uniform(-spread, spread, count)
+        self.y[slots] = y + rng.uniform(-spread, spread, count)
+        self.vx[slots] = np.cos(theta) * velocity
+        self.vy[slots] = -np.sin(theta) * velocity
+        self.gravity[slots] = PARTICLE_KINDS[kind][2]
+        life = rng.integers(lifetime[0], lifetime[1] + 1, count)
+        self.life[slots] = life
+        self.lifetime[slots] = life
+        self.kind[slots] = kind
+        self.live = int(np.count_nonzero(self.life))
+
+    def update(self) -> None:
+        if not self.live:
+            return
+        life = self.life
+        alive = life > 0
+        self.vx *= PARTICLE_DRAG
+        self.vy += self.gravity
+        self.x += self.vx
+        self.y += self.vy
+        np.subtract(life, alive, out=life, casting="unsafe")
+        # Tombée sous l'écran, une particule ne reviendra plus.
+        life[self.y > HEIGHT + MAX_RADIUS] = 0
+        self.live = int(np.count_nonzero(life))
+
+    def _visible(self, cam_x: float, area: pygame.Rect) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        sx = (self.x - cam_x).astype(np.intp)
+        sy = self.y.astype(np.intp)
+        visible = (
+            (self.life > 0)
+            & (sx > area.left - MAX_RADIUS)
+            & (sx < area.right + MAX_RADIUS)
+            & (sy > area.top - MAX_RADIUS)
+            & (sy < area.bottom + MAX_RADIUS)
+        )
+        index = np.flatnonzero(visible)
+        return index, sx[index], sy[index]
+
+    def screen_bounds(self, cam_x: float, area: pygame.Rect) -> Optional[pygame.Rect]:
+        """Rectangle de l'écran couvert par les particules visibles (pour le mode ``--dirty``)."""
+        if not self.live:
+            return None
+        index, sx, sy = self._visible(cam_x, area)
+        if not index.size:
+            return None
+        left = int(sx.min()) - MAX_RADIUS
+        top = int(sy.min()) - MAX_RADIUS
+        return pygame.Rect(left, top, int(sx.max()) + MAX_RADIUS - left + 1, int(sy.max()) + MAX_RADIUS - top + 1)
+
+    def _mapped_colors(self, surface: pygame.Surface) -> np.ndarray:
+        key = (surface.get_bitsize(), *surface.get_masks())
+        mapped = self._mapped.get(key)
+        if mapped is None:
+            mapped = np.array([surface.map_rgb(color) for color in self._stamp_colors], dtype=np.int64)
+            self._mapped[key] = mapped
+        return mapped
+
+    def draw(self, surface: pygame.Surface, cam_x: float) -> int:
+        """Dessine les particules visibles dans la zone de découpe de ``surface``."""
+        if not self.live:
+            return 0
+        clip = surface.get_clip()
+        index, sx, sy = self._visible(cam_x, clip)
+        if not index.size:
+            return 0
+        life = self.life[index].astype(np.int32)
+        fade = (life * FADE_STEPS - 1) // self.lifetime[index]
+        stamp = self.kind[index].astype(np.intp) * FADE_STEPS + fade
+        radius = self._stamp_radius[stamp]
+        if surface.get_bytesize() != 4:
+            self._blit_stamps(surface, sx, sy, stamp, radius)
+            return int(index.size)
+        colors = self._mapped_colors(surface)[stamp]
+        # Seules les particules à cheval sur le bord de la zone sont découpées pixel par pixel.
+        inner = (
+            (sx >= clip.left + MAX_RADIUS)
+            & (sx < clip.right - MAX_RADIUS)
+            & (sy >= clip.top + MAX_RADIUS)
+            & (sy < clip.bottom - MAX_RADIUS)
+        )
+        pixels = pygame.surfarray.pixels2d(surface)
+        # Vue à une dimension des pixels : un tampon n'est plus qu'une liste de décalages d'indice.
+        row = surface.get_pitch() // pixels.itemsize
+        flat = np.lib.stride_tricks.as_strided(pixels, shape=(row * surface.get_height(),), strides=(pixels.itemsize,))
+        try:
+            for size, (dx, dy) in self._discs.items():
+                group = radius == size
+                if not group.any():
+                    continue
+                for edge in (False, True):
+                    selected = group & (inner != edge)
+                    if not selected.any():
+                        continue
+                    gx, gy, gc = sx[selected], sy[selected], colors[selected]
+                    base = gy * row + gx
+                    for ox, oy in zip(dx, dy):
+                        if edge:
+                            px = gx + ox
+                            py = gy + oy
+                            kept = (px >= clip.left) & (px < clip.right) & (py >= clip.top) & (py < clip.bottom)
+                            flat[base[kept] + (oy * row + ox)] = gc[kept]
+                        else:
+                            flat[base + (oy * row + ox)] = gc
+        finally:
+            del flat, pixels
+        return int(index.size)
+
+    def _stamp_sprites(self) -> List[pygame.Surface]:
+        if self._sprites is None:
+            self._sprites = []
+            for radius, color in zip(self._stamp_radius.tolist(), self._stamp_colors):
+                sprite = pygame.Surface((2 * radius - 1, 2 * radius - 1), pygame.SRCALPHA)
+                for dx, dy in zip(*self._discs[radius]):
+                    sprite.set_at((dx + radius - 1, dy + radius - 1), color)
+                self._sprites.append(sprite)
+        return self._sprites
+
+    def _blit_stamps(
+        self, surface: pygame.Surface, sx: np.ndarray, sy: np.ndarray, stamp: np.ndarray, radius: np.ndarray
+    ) -> None:
+        """Repli pour les surfaces qui ne sont pas en 32 bits : un sprite par apparence, un seul ``blits``."""
+        sprites = self._stamp_sprites()
+        offset = radius.astype(np.intp) - 1
+        left = (sx - offset).tolist()
+        top = (sy - offset).tolist()
+        surface.blits([(sprites[s], (x, y)) for s, x, y in zip(stamp.tolist(), left, top)], doreturn=False)
+
+
+def emit_effects(particles: ParticleSystem, sim: Simulation) -> None:
+    """Émet les particules correspondant au dernier pas de ``sim`` (voir ``Simulation.events``)."""
+    rect = sim.player.rect
+    if sim.state == STATE_PLAYING:
+        particles.emit(KIND_TRAIL, rect.left, rect.centery, 2, (0.2, 1.0), (160, 200), (12, 22), spread=rect.height / 4)
+    for event in sim.events:
+        if event == EVENT_JUMP:
+            particles.emit(KIND_DUST, rect.centerx, rect.bottom, 10, (0.8, 2.6), (100, 170), (14, 24), spread=rect.width / 3)
+        elif event == EVENT_LAND:
+            particles.emit(KIND_DUST, rect.centerx, rect.bottom - 2, 18, (1.0, 3.4), (15, 165), (16, 28), spread=rect.width / 3)
+        elif event == EVENT_DEATH:
+            # Une chute dans le vide explose au bord bas de l'écran, là où le cube a disparu.
+            y = min(rect.centery, HEIGHT)
+            particles.emit(KIND_SPARK, rect.centerx, y, 220, (2.0, 11.0), (0, 360), (30, 60), spread=rect.width / 3)
+            particles.emit(KIND_EMBER, rect.centerx, y, 80, (1.0, 6.0), (20, 160), (40, 70), spread=rect.width / 4)
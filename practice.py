@@ -0,0 +1,80 @@
+"""Mode entraînement : points de contrôle pendant la course et reprise immédiate après une mort."""
+
+from __future__ import annotations
+
+from typing import List
+
+import pygame
+
+from settings import CHECKPOINT_COLOR, COYOTE_FRAMES, PLAYER_SIZE, PRACTICE_CHECKPOINT_INTERVAL
+from simulation import STATE_PLAYING, SimSnapshot, Simulation
+
+
+class PracticeMode:
+    """Points de contrôle (``SimSnapshot``) d'une partie en mode entraînement.
+
+    Actif, il en pose un toutes les ``interval`` pas quand le cube est posé au
+    sol, en plus de ceux posés à la main ; ``respawn`` reprend au dernier en
+    temps constant, quelle que soit la longueur du niveau.
+    """
+
+    def __init__(self, interval: int = PRACTICE_CHECKPOINT_INTERVAL) -> None:
+        self.active = False
+        self.interval = interval
+        self.checkpoints: List[SimSnapshot] = []
+        self.respawns = 0
+
+    def __len__(self) -> int:
+        return len(self.checkpoints)
+
+    def toggle(self) -> None:
+        self.active = not self.active
+        self.checkpoints.clear()
+
+    def place(self, sim: Simulation) -> bool:
+        if not self.active or sim.state != STATE_PLAYING:
+            return False
+        self.checkpoints.append(sim.snapshot())
+        return True
+
+    def remove_last(self) -> None:
+        if self.checkpoints:
+            self.checkpoints.pop()
+
+    def update(self, sim: Simulation) -> None:
+        """À appeler après chaque pas : pose les points de contrôle automatiques."""
+        if not self.active or sim.state != STATE_PLAYING:
+            return
+        player = sim.player
+        last = self.checkpoints[-1].frame if self.checkpoints else 0
+        if player.on_ground and player.coyote_frames == COYOTE_FRAMES and sim.frame - last >= self.interval:
+            self.place(sim)
+
+    def respawn(self, sim: Simulation) -> bool:
+        """Reprend au dernier point de contrôle ; faux s'il n'y en a aucun.
+
+        La touche de saut reste dans son état actuel et le tampon est vidé :
+        un saut enfoncé au moment du point de contrôle ne se rejoue pas.
+        """
+        if not self.active or not self.checkpoints:
+            return False
+        jump_held = sim.jump_held
+        sim.restore(self.checkpoints[-1])
+        sim.jump_buffer = 0
+        sim.jump_held = jump_held
+        sim.attempt += 1
+        self.respawns += 1
+        return True
+
+    def draw(self, surface: pygame.Surface, cam_x: float) -> None:
+        half = PLAYER_SIZE // 2
+        right = cam_x + surface.get_width() + half
+        for checkpoint in self.checkpoints:
+            x = checkpoint.rect_x + half
+            if x < cam_x - half or x > right:
+                continue
+            cx = int(x - cam_x)
+            cy = checkpoint.rect_y + half
+            points = [(cx, cy - 12), (cx + 9, cy), (cx, cy + 12), (cx - 9, cy)]
+            pygame.draw.polygon(surface, CHECKPOINT_COLOR, points)
+            pygame.draw.polygon(surface, (255, 255, 255), points, 2)
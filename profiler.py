@@ -0,0 +1,187 @@
+"""Profilage par phase de la boucle de jeu, avec surimpression et export CSV."""
+
+from __future__ import annotations
+
+import csv
+from array import array
+from time import perf_counter_ns
+from typing import Dict, List, Sequence, Tuple
+
+import pygame
+
+PHASES = ("events", "physics", "ground", "spikes", "background", "level", "particles", "ghosts", "player", "hud", "present", "frame")
+PROFILE_FRAMES = 2048
+LATENCY_SERIES = ("input_to_sim", "input_to_present", "stamp_error")
+LATENCY_SAMPLES = 512
+SUMMARY_INTERVAL = 30
+OVERLAY_COLOR = (236, 236, 240)
+OVERLAY_BACKGROUND = (12, 14, 28, 190)
+
+
+class NullProfiler:
+    """Profileur inactif : les appels ne coûtent qu'un appel de méthode vide."""
+
+    enabled = False
+
+    def begin(self) -> int:
+        return 0
+
+    def end(self, phase: str, start: int) -> None:
+        pass
+
+    def end_frame(self) -> None:
+        pass
+
+
+class FrameProfiler(NullProfiler):
+    """Mesure la durée de chaque phase (``perf_counter_ns``) dans un tampon circulaire d'images.
+
+    ``ground`` et ``spikes`` sont inclus dans ``physics`` ; ``frame`` couvre
+    l'image entière. Désactivé, il se comporte comme ``NullProfiler``.
+    """
+
+    def __init__(self, phases: Sequence[str] = PHASES, capacity: int = PROFILE_FRAMES, enabled: bool = False) -> None:
+        self.phases = tuple(phases)
+        self.capacity = capacity
+        self.enabled = enabled
+        self._samples: Dict[str, array] = {phase: array("q", bytes(8 * capacity)) for phase in self.phases}
+        self._current: Dict[str, int] = dict.fromkeys(self.phases, 0)
+        self._cursor = 0
+        self._count = 0
+        self._frame_start = perf_counter_ns()
+        self._summary: Dict[str, Tuple[float, float, float]] = {}
+        self._frames_since_summary = 0
+        self._toggle_pending = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def begin(self) -> int:
+        return perf_counter_ns() if self.enabled else 0
+
+    def end(self, phase: str, start: int) -> None:
+        if self.enabled:
+            self._current[phase] += perf_counter_ns() - start
+
+    def end_frame(self) -> None:
+        now = perf_counter_ns()
+        if self._toggle_pending:
+            # Changement d'état entre deux images seulement : une phase commencée
+            # profileur éteint ne se termine jamais profileur allumé.
+            self._toggle_pending = False
+            self.enabled = not self.enabled
+            self._current = dict.fromkeys(self.phases, 0)
+            self._frame_start = now
+            return
+        if not self.enabled:
+            self._frame_start = now
+            return
+        current = self._current
+        current["frame"] = now - self._frame_start
+        self._frame_start = now
+        cursor = self._cursor
+        for phase, samples in self._samples.items():
+            samples[cursor] = current[phase]
+            current[phase] = 0
+        self._cursor = (cursor + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._frames_since_summary += 1
+
+    def toggle(self) -> None:
+        """Active ou coupe le profilage à la fin de l'image en cours (``end_frame``)."""
+        self._toggle_pending = not self._toggle_pending
+
+    def samples(self, phase: str) -> List[int]:
+        """Échantillons d'une phase, du plus ancien au plus récent (en ns)."""
+        data = self._samples[phase]
+        if self._count < self.capacity:
+            return list(data[:self._count])
+        return list(data[self._cursor:]) + list(data[:self._cursor])
+
+    def percentiles(self) -> Dict[str, Tuple[float, float, float]]:
+        """p50/p95/p99 de chaque phase, en millisecondes."""
+        return {phase: _percentiles(self.samples(phase)) for phase in self.phases}
+
+    def summary(self) -> Dict[str, Tuple[float, float, float]]:
+        """Comme ``percentiles``, recalculé au plus toutes les ``SUMMARY_INTERVAL`` images."""
+        if not self._summary or self._frames_since_summary >= SUMMARY_INTERVAL:
+            self._summary = self.percentiles()
+            self._frames_since_summary = 0
+        return self._summary
+
+    def dump_csv(self, path: str) -> None:
+        columns = [self.samples(phase) for phase in self.phases]
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow([f"{phase}_ns" for phase in self.phases])
+            writer.writerows(zip(*columns))
+
+    def draw_overlay(self, surface: pygame.Surface, font: pygame.font.Font, extra: Sequence[str] = ()) -> None:
+        lines = [f"{'phase':<10} {'p50':>6} {'p95':>6} {'p99':>6}  ms"]
+        for phase, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{phase:<10} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        lines.extend(extra)
+        images = [font.render(line, True, OVERLAY_COLOR) for line in lines]
+        width = max(image.get_width() for image in images) + 16
+        height = sum(image.get_height() for image in images) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(OVERLAY_BACKGROUND)
+        y = 6
+        for image in images:
+            panel.blit(image, (8, y))
+            y += image.get_height()
+        surface.blit(panel, (surface.get_width() - width - 12, 60))
+
+
+class LatencyStats:
+    """Distribution des latences d'entrée (ns), une série par mesure, dans des tampons circulaires.
+
+    ``input_to_sim`` : de l'appui au pas de physique qui l'applique ;
+    ``input_to_present`` : de l'appui à l'affichage de l'image qui en tient compte ;
+    ``stamp_error`` : incertitude sur l'horodatage lui-même (voir ``inputs.TimedEvents``).
+    """
+
+    def __init__(self, series: Sequence[str] = LATENCY_SERIES, capacity: int = LATENCY_SAMPLES) -> None:
+        self.series = tuple(series)
+        self.capacity = capacity
+        self._samples: Dict[str, array] = {name: array("q") for name in self.series}
+        self._cursors: Dict[str, int] = dict.fromkeys(self.series, 0)
+
+    def add(self, name: str, value: int) -> None:
+        samples = self._samples[name]
+        if len(samples) < self.capacity:
+            samples.append(value)
+        else:
+            samples[self._cursors[name]] = value
+            self._cursors[name] = (self._cursors[name] + 1) % self.capacity
+
+    def samples(self, name: str) -> List[int]:
+        samples = self._samples[name]
+        cursor = self._cursors[name]
+        return list(samples[cursor:]) + list(samples[:cursor])
+
+    def percentiles(self) -> Dict[str, Tuple[float, float, float]]:
+        """p50/p95/p99 de chaque série, en millisecondes."""
+        return {name: _percentiles(self.samples(name)) for name in self.series}
+
+    def lines(self) -> List[str]:
+        lines = [f"{'latence':<10} {'p50':>6} {'p95':>6} {'p99':>6}  ms"]
+        short = {"input_to_sim": "simul.", "input_to_present": "affich.", "stamp_error": "horodat."}
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{short.get(name, name):<10} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        return lines
+
+    def dump_csv(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["series", "ns"])
+            for name in self.series:
+                writer.writerows((name, value) for value in self.samples(name))
+
+
+def _percentiles(samples: List[int]) -> Tuple[float, float, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return (0.0, 0.0, 0.0)
+    last = len(ordered) - 1
+    return tuple(ordered[round(last * q)] / 1e6 for q in (0.5, 0.95, 0.99))
@@ -0,0 +1,195 @@
+"""Rendu hors écran d'une relecture ``.gdr`` en suite d'images PNG numérotées ou en flux RGB brut.
+
+La simulation et le dessin restent dans le processus principal, une image par
+pas de physique, avec les mêmes fonctions que le jeu (``draw_background``,
+``Level.draw``, ``Player.draw``, ``draw_hud``) et le pilote SDL ``dummy``.
+La compression PNG (``zlib``, niveau réglable) est confiée à un groupe de
+processus ; quelques images au plus attendent par processus, la mémoire reste
+donc bornée.
+
+Le flux brut (RGB24, ``WIDTH`` x ``HEIGHT``, ``TICK_RATE`` images/s) peut être
+envoyé tel quel à un encodeur vidéo, par exemple :
+``python render_video.py - run.gdr - --raw | ffmpeg -f rawvideo -pix_fmt rgb24 -s 960x540 -r 60 -i - clip.mp4``
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import multiprocessing
+import multiprocessing.pool
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from typing import BinaryIO, Deque, Iterator, List, Optional, Tuple
+
+import pygame
+
+from endless import EndlessLevel
+from level import Level
+from level_file import open_level
+from main import create_fonts, create_vertical_gradient, draw_background, draw_banner, draw_hud
+from replay import JUMP_HELD, JUMP_PRESSED, Replay
+from settings import BACKGROUND_GRADIENT_BOTTOM, BACKGROUND_GRADIENT_TOP, HEIGHT, TICK_RATE, WIDTH
+from simulation import STATE_DEAD, STATE_PLAYING, STATE_WIN, Simulation
+
+FRAME_PATTERN = "frame-{:06d}.png"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Niveau zlib des images : 1 compresse plusieurs fois plus vite que le niveau
+# par défaut pour des fichiers à peine plus gros (aplats du décor)
+PNG_COMPRESSION = 1
+# Images rendues en attente de compression, par processus
+PENDING_PER_WORKER = 4
+
+
+def iter_frames(replay: Replay, level: Optional[Level] = None, hold: int = TICK_RATE) -> Iterator[pygame.Surface]:
+    """Rejoue ``replay`` comme ``replay.play`` et dessine chaque pas, puis ``hold`` pas après la fin.
+
+    Renvoie à chaque image la même surface : elle doit être lue avant l'image suivante.
+    """
+    screen = pygame.display.get_surface()
+    gradient = create_vertical_gradient((WIDTH, HEIGHT), BACKGROUND_GRADIENT_TOP, BACKGROUND_GRADIENT_BOTTOM)
+    fonts = create_fonts()
+    sim = Simulation(level)
+    sim.start_run(replay.start_with_jump)
+
+    def draw() -> pygame.Surface:
+        cam_x = sim.cam_x
+        draw_background(screen, gradient, cam_x, sim.level)
+        sim.level.draw(screen, cam_x)
+        sim.player.draw(screen, cam_x)
+        if sim.state == STATE_DEAD:
+            draw_banner(screen, fonts["medium"], "Aïe ! Un pic t'a arrêté…")
+        elif sim.state == STATE_WIN:
+            draw_banner(screen, fonts["medium"], "Bravo ! Niveau terminé 🎉")
+        draw_hud(screen, fonts, sim.progress, sim.attempt, sim.state)
+        return screen
+
+    yield draw()
+    for code, count in replay.runs:
+        for _ in range(count):
+            if sim.state != STATE_PLAYING:
+                break
+            if code & JUMP_PRESSED:
+                sim.press_jump()
+            if not code & JUMP_HELD:
+                sim.release_jump()
+            sim.update()
+            yield draw()
+    # Comme dans le jeu, le cube finit sa rotation et la caméra se pose après la fin.
+    for _ in range(hold):
+        sim.update()
+        yield draw()
+
+
+def encode_png(data: bytes, size: Tuple[int, int], compression: int = PNG_COMPRESSION) -> bytes:
+    """Image PNG (RGB, 8 bits, sans filtre) à partir des pixels RGBX de ``pygame.image.tobytes``.
+
+    Le processus principal n'envoie que la copie brute des pixels (RGBX est
+    bien plus rapide à extraire que RGB) : l'octet de remplissage est retiré ici.
+    """
+    width, height = size
+    rgb = bytearray(width * height * 3)
+    for channel in range(3):
+        rgb[channel::3] = data[channel::4]
+    stride = width * 3
+    # Chaque ligne est précédée de son type de filtre (0 : aucun).
+    rows = b"".join(b"\x00" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return PNG_SIGNATURE + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, compression)) + chunk(b"IEND", b"")
+
+
+def _save_png(path: str, data: bytes, size: Tuple[int, int], compression: int) -> None:
+    with open(path, "wb") as handle:
+        handle.write(encode_png(data, size, compression))
+
+
+def write_png(
+    frames: Iterator[pygame.Surface],
+    directory: str,
+    pool: Optional[multiprocessing.pool.Pool] = None,
+    max_pending: int = PENDING_PER_WORKER,
+    compression: int = PNG_COMPRESSION,
+) -> int:
+    """Écrit ``directory/frame-000000.png``... ; la compression se fait dans ``pool`` si fourni.
+
+    Le groupe doit être créé avant ``pygame.init`` : des processus copiés après
+    hériteraient des gestionnaires de signaux de SDL et ne s'arrêteraient plus.
+    """
+    os.makedirs(directory, exist_ok=True)
+    pending: Deque[multiprocessing.pool.AsyncResult] = deque()
+    count = 0
+    for surface in frames:
+        path = os.path.join(directory, FRAME_PATTERN.format(count))
+        data = pygame.image.tobytes(surface, "RGBX")
+        if pool is None:
+            _save_png(path, data, surface.get_size(), compression)
+        else:
+            if len(pending) >= max_pending:
+                pending.popleft().get()
+            pending.append(pool.apply_async(_save_png, (path, data, surface.get_size(), compression)))
+        count += 1
+    while pending:
+        pending.popleft().get()
+    return count
+
+
+def write_raw(frames: Iterator[pygame.Surface], stream: BinaryIO) -> int:
+    """Écrit les images à la suite en RGB24, sans en-tête."""
+    count = 0
+    for surface in frames:
+        stream.write(pygame.image.tobytes(surface, "RGB"))
+        count += 1
+    stream.flush()
+    return count
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Rend une relecture .gdr en images, hors écran.")
+    parser.add_argument("level", help="niveau (.json ou .gdl), - pour le niveau d'origine, endless pour le mode sans fin")
+    parser.add_argument("replay", help="relecture .gdr")
+    parser.add_argument("output", help="dossier des images PNG, ou fichier du flux brut (- : sortie standard)")
+    parser.add_argument("--raw", action="store_true", help="écrit un flux RGB24 brut au lieu d'images PNG")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processus de compression PNG")
+    parser.add_argument("--compression", type=int, default=PNG_COMPRESSION, choices=range(10), help="niveau zlib des PNG (0-9)")
+    parser.add_argument("--hold", type=float, default=1.0, help="secondes rendues après la fin de la partie")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    use_pool = args.workers > 1 and not args.raw
+    with multiprocessing.Pool(args.workers) if use_pool else contextlib.nullcontext() as pool:
+        if args.level == "endless":
+            level: Level = EndlessLevel(replay.seed)
+        else:
+            level = Level() if args.level == "-" else open_level(args.level)
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.init()
+        pygame.display.set_mode((WIDTH, HEIGHT))
+        started = time.perf_counter()
+        try:
+            frames = iter_frames(replay, level, round(args.hold * TICK_RATE))
+            if not args.raw:
+                count = write_png(frames, args.output, pool, PENDING_PER_WORKER * args.workers, args.compression)
+            elif args.output == "-":
+                count = write_raw(frames, sys.stdout.buffer)
+            else:
+                with open(args.output, "wb") as stream:
+                    count = write_raw(frames, stream)
+        finally:
+            if isinstance(level, EndlessLevel):
+                level.close()
+            pygame.quit()
+    elapsed = time.perf_counter() - started
+    speed = count / TICK_RATE / elapsed if elapsed else 0.0
+    print(f"{count} images en {elapsed:.2f} s ({speed:.1f}x le temps réel)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,298 @@
+"""Enregistrement compact des entrées d'une partie et relecture déterministe sans affichage.
+
+Chaque pas de simulation est résumé par un code sur deux bits (appui reçu
+depuis le pas précédent, touche maintenue) ; les codes identiques consécutifs
+sont regroupés en plages. Le fichier ``.gdr`` conserve aussi la graine, une
+empreinte des réglages physiques et l'issue attendue (rectangle final, mort ou
+victoire) pour détecter toute désynchronisation à la relecture.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+import settings
+from endless import EndlessLevel
+from level import Level
+from level_file import open_level
+from simulation import STATE_DEAD, STATE_PLAYING, STATE_WIN, Simulation
+
+MAGIC = b"GDRP"
+FORMAT_VERSION = 1
+
+JUMP_PRESSED = 1
+JUMP_HELD = 2
+
+# Mêmes valeurs que BATCH_DEAD / BATCH_WIN
+OUTCOME_CODES = {STATE_DEAD: 1, STATE_WIN: 2}
+OUTCOME_STATES = {code: state for state, code in OUTCOME_CODES.items()}
+
+# Réglages qui influencent la trajectoire : en changer un invalide les anciennes relectures.
+PHYSICS_SETTINGS = (
+    "TICK_RATE",
+    "RUN_SPEED",
+    "GRAVITY",
+    "JUMP_FORCE",
+    "MAX_FALL_SPEED",
+    "COYOTE_FRAMES",
+    "JUMP_BUFFER_FRAMES",
+    "PLAYER_SIZE",
+    "HEIGHT",
+)
+
+# magic, version, drapeaux (bit 0 : départ avec saut), issue, empreinte des
+# réglages, graine, rectangle final x/y/w/h, nombre de pas
+_HEADER = struct.Struct("<4sHBB8sQiiiiI")
+
+
+def settings_version() -> bytes:
+    """Empreinte (8 octets) des réglages listés dans ``PHYSICS_SETTINGS``."""
+    values = repr(tuple((name, getattr(settings, name)) for name in PHYSICS_SETTINGS))
+    return hashlib.blake2b(values.encode("utf-8"), digest_size=8).digest()
+
+
+@dataclass(frozen=True)
+class Replay:
+    """Une partie enregistrée, de ``start_run`` jusqu'à la mort ou l'arrivée."""
+
+    runs: Tuple[Tuple[int, int], ...]
+    outcome: str
+    final_rect: Tuple[int, int, int, int]
+    start_with_jump: bool = False
+    seed: int = 0
+    settings: bytes = b""
+
+    @property
+    def frame_count(self) -> int:
+        return sum(count for _, count in self.runs)
+
+    def frames(self) -> Iterator[int]:
+        for code, count in self.runs:
+            for _ in range(count):
+                yield code
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            int(self.start_with_jump),
+            OUTCOME_CODES[self.outcome],
+            self.settings,
+            self.seed,
+            *self.final_rect,
+            self.frame_count,
+        )
+        body = bytearray()
+        for code, count in self.runs:
+            _write_varint(body, count << 2 | code)
+        return header + bytes(body)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Replay:
+        if len(data) < _HEADER.size:
+            raise ValueError("Relecture tronquée.")
+        magic, version, flags, outcome, version_hash, seed, x, y, w, h, frame_count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or outcome not in OUTCOME_STATES:
+            raise ValueError("Ce fichier n'est pas une relecture .gdr compatible.")
+        runs = []
+        offset = _HEADER.size
+        while offset < len(data):
+            value, offset = _read_varint(data, offset)
+            runs.append((value & 3, value >> 2))
+        replay = cls(tuple(runs), OUTCOME_STATES[outcome], (x, y, w, h), bool(flags & 1), seed, version_hash)
+        if replay.frame_count != frame_count:
+            raise ValueError("Relecture corrompue : nombre de pas incohérent.")
+        return replay
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as handle:
+            handle.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> Replay:
+        with open(path, "rb") as handle:
+            return cls.from_bytes(handle.read())
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Relecture tronquée.")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class ReplayRecorder:
+    """Enregistre les parties d'une ``Simulation`` (voir ``Simulation.recorder``).
+
+    Les parties terminées s'accumulent dans ``completed`` ; ``take`` les retire.
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        self.seed = seed
+        self.settings = settings_version()
+        self.completed: List[Replay] = []
+        self._runs: Optional[List[List[int]]] = None
+        self._start_with_jump = False
+
+    def start(self, start_with_jump: bool) -> None:
+        self._runs = []
+        self._start_with_jump = start_with_jump
+
+    def cancel(self) -> None:
+        """Abandonne la partie en cours (reprise à un point de contrôle) jusqu'au prochain ``start``."""
+        self._runs = None
+
+    def frame(self, pressed: bool, held: bool) -> None:
+        runs = self._runs
+        if runs is None:
+            return
+        code = (JUMP_PRESSED if pressed else 0) | (JUMP_HELD if held else 0)
+        if runs and runs[-1][0] == code:
+            runs[-1][1] += 1
+        else:
+            runs.append([code, 1])
+
+    def finish(self, state: str, rect: pygame.Rect) -> None:
+        if self._runs is None:
+            return
+        self.completed.append(
+            Replay(
+                runs=tuple((code, count) for code, count in self._runs),
+                outcome=state,
+                final_rect=tuple(rect),
+                start_with_jump=self._start_with_jump,
+                seed=self.seed,
+                settings=self.settings,
+            )
+        )
+        self._runs = None
+
+    def take(self) -> List[Replay]:
+        completed, self.completed = self.completed, []
+        return completed
+
+
+@dataclass(frozen=True)
+class PlaybackResult:
+    """Issue d'une relecture comparée à celle enregistrée."""
+
+    state: str
+    rect: Tuple[int, int, int, int]
+    frames: int
+    settings_match: bool
+
+    def matches(self, replay: Replay) -> bool:
+        return self.settings_match and self.state == replay.outcome and self.rect == replay.final_rect
+
+
+def play(replay: Replay, level: Optional[Level] = None) -> PlaybackResult:
+    """Rejoue ``replay`` à pleine vitesse avec la même physique que le jeu."""
+    sim = Simulation(level)
+    sim.start_run(replay.start_with_jump)
+    frames = 0
+    for code, count in replay.runs:
+        pressed = bool(code & JUMP_PRESSED)
+        held = bool(code & JUMP_HELD)
+        for _ in range(count):
+            if sim.state != STATE_PLAYING:
+                break
+            if pressed:
+                sim.press_jump()
+            if not held:
+                sim.release_jump()
+            sim.update()
+            frames += 1
+    return PlaybackResult(sim.state, tuple(sim.player.rect), frames, replay.settings == settings_version())
+
+
+def verify(replay: Replay, level: Optional[Level] = None) -> bool:
+    return play(replay, level).matches(replay)
+
+
+def verify_many(replays: Sequence[Replay], level: Optional[Level] = None) -> List[bool]:
+    """Vérifie un lot de relectures du même niveau en une seule ``BatchSimulation``."""
+    # Import local : seule cette vérification par lot a besoin de NumPy.
+    import numpy as np
+
+    from batch import BatchSimulation
+
+    if not replays:
+        return []
+    level = level if level is not None else Level()
+    length = max(replay.frame_count for replay in replays)
+    codes = np.zeros((len(replays), length), dtype=np.uint8)
+    for row, replay in enumerate(replays):
+        column = 0
+        for code, count in replay.runs:
+            codes[row, column:column + count] = code
+            column += count
+
+    batch = BatchSimulation(level, len(replays))
+    batch.reset(np.array([replay.start_with_jump for replay in replays], dtype=bool))
+    for frame in range(length):
+        column = codes[:, frame]
+        batch.step((column & JUMP_PRESSED) != 0, (column & JUMP_HELD) != 0)
+
+    current = settings_version()
+    size = settings.PLAYER_SIZE
+    results = []
+    for row, replay in enumerate(replays):
+        state = OUTCOME_STATES.get(int(batch.state[row]), STATE_PLAYING)
+        rect = (int(batch.rect_x[row]), int(batch.rect_y[row]), size, size)
+        results.append(replay.settings == current and state == replay.outcome and rect == replay.final_rect)
+    return results
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) < 2 or argv[0] not in ("verify", "verify-batch"):
+        raise SystemExit(
+            "Usage :\n"
+            "  python replay.py verify NIVEAU|-|endless RELECTURE.gdr...\n"
+            "  python replay.py verify-batch NIVEAU|- RELECTURE.gdr..."
+        )
+    paths = argv[2:]
+    replays = [Replay.load(path) for path in paths]
+    if argv[1] == "endless":
+        # Chaque relecture rejoue le parcours généré à partir de sa propre graine.
+        if argv[0] != "verify":
+            raise SystemExit("verify-batch ne gère pas le mode sans fin.")
+        results = []
+        for replay in replays:
+            level = EndlessLevel(replay.seed)
+            try:
+                results.append(verify(replay, level))
+            finally:
+                level.close()
+    elif argv[0] == "verify":
+        level = Level() if argv[1] == "-" else open_level(argv[1])
+        results = [verify(replay, level) for replay in replays]
+    else:
+        results = verify_many(replays, Level() if argv[1] == "-" else open_level(argv[1]))
+    for path, ok in zip(paths, results):
+        print(f"{'ok ' if ok else 'KO '} {path}")
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,6 +5,18 @@ FPS = 60
 TARGET_FRAME_DURATION = 1000 / FPS
 TITLE = "Geometry Dash - Premier saut"
 
+# Boucle à pas fixe : la physique avance toujours de TICK_DURATION ms et
+# l'affichage va aussi vite que possible (0 = pas de limite). Au-delà de
+# MAX_FRAME_BACKLOG ms de retard (fenêtre déplacée...), le surplus est ignoré.
+TICK_RATE = FPS
+TICK_DURATION = 1000 / TICK_RATE
+MAX_RENDER_FPS = 0
+MAX_FRAME_BACKLOG = 250
+
+# Résolution interne du décor (1.0 = pleine résolution ; 0.5 ou 0.75 pour les
+# machines modestes). Le joueur et l'interface restent en pleine résolution.
+RENDER_SCALE = 1.0
+
 # Monde et physique
 RUN_SPEED = 7.2
 GRAVITY = 1.0
@@ -14,6 +26,36 @@ COYOTE_FRAMES = 6
 JUMP_BUFFER_FRAMES = 5
 AIR_ROTATION_SPEED = 9.0
 
+# Particules : taille du réservoir (les plus anciennes sont remplacées quand il
+# est plein) et freinage horizontal appliqué à chaque pas
+PARTICLE_CAPACITY = 12_000
+PARTICLE_DRAG = 0.96
+
+# Fantômes : opacité (0-255) et nombre d'essais précédents de la session affichés
+GHOST_ALPHA = 90
+GHOST_HISTORY = 10
+
+# Mode entraînement : point de contrôle automatique toutes les
+# PRACTICE_CHECKPOINT_INTERVAL pas passés au sol
+PRACTICE_CHECKPOINT_INTERVAL = 2 * TICK_RATE
+CHECKPOINT_COLOR = (120, 240, 140)
+
+# Télémétrie : largeur (px) des intervalles de la carte des morts et délai
+# (s) entre deux écritures en tâche de fond
+HEATMAP_BIN_WIDTH = 64
+TELEMETRY_FLUSH_INTERVAL = 5.0
+
+# Environnement d'entraînement (env.py) : obstacles décrits dans l'observation,
+# distance (px) couverte devant le cube et récompenses de fin de partie
+ENV_SPIKES_AHEAD = 3
+ENV_GAPS_AHEAD = 2
+ENV_VIEW_DISTANCE = WIDTH
+ENV_WIN_REWARD = 1.0
+ENV_DEATH_REWARD = -1.0
+
+# Mode surveillance (--watch) : délai (s) entre deux vérifications du fichier du niveau
+LEVEL_WATCH_INTERVAL = 0.25
+
 # Personnage
 PLAYER_SIZE = 42
 PLAYER_COLOR = (120, 220, 255)
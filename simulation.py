@@ -0,0 +1,310 @@
+"""Cœur de simulation sans affichage, partagé par le jeu et les outils."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import pygame
+
+from level import Level
+from objects import Player
+from profiler import NullProfiler
+from settings import (
+    CAMERA_OFFSET_X,
+    HEIGHT,
+    JUMP_BUFFER_FRAMES,
+    RUN_SPEED,
+)
+
+if TYPE_CHECKING:
+    from replay import ReplayRecorder
+
+STATE_MENU = "menu"
+STATE_PLAYING = "playing"
+STATE_DEAD = "dead"
+STATE_WIN = "win"
+
+# Événements du dernier pas (Simulation.events), pour les effets visuels
+EVENT_JUMP = "jump"
+EVENT_LAND = "land"
+EVENT_DEATH = "death"
+EVENT_WIN = "win"
+
+
+@dataclass(frozen=True)
+class FrameInput:
+    """Entrées d'une frame : appui sur ESPACE et état de la touche en fin de frame."""
+
+    jump_pressed: bool = False
+    jump_held: bool = False
+
+
+@dataclass(frozen=True)
+class StepResult:
+    """Résumé d'une frame simulée."""
+
+    state: str
+    player_rect: pygame.Rect
+    cam_x: float
+    progress: float
+    jumped: bool = False
+    landed: bool = False
+    died: bool = False
+
+
+class SimSnapshot:
+    """État complet d'une partie à un pas donné (points de contrôle, solveur).
+
+    Uniquement des nombres et des booléens : ``Simulation.snapshot`` remplit
+    un enregistrement existant si on lui en passe un, et ``restore`` le
+    recopie en temps constant, sans allocation ni reconstruction du niveau.
+    """
+
+    __slots__ = (
+        "pos_x",
+        "pos_y",
+        "rect_x",
+        "rect_y",
+        "prev_top",
+        "prev_bottom",
+        "vel_y",
+        "on_ground",
+        "coyote_frames",
+        "rotation",
+        "cam_x",
+        "state",
+        "jump_buffer",
+        "jump_held",
+        "frame",
+    )
+
+    def __init__(
+        self,
+        pos_x: float = 0.0,
+        pos_y: float = 0.0,
+        rect_x: int = 0,
+        rect_y: int = 0,
+        prev_top: int = 0,
+        prev_bottom: int = 0,
+        vel_y: float = 0.0,
+        on_ground: bool = True,
+        coyote_frames: int = 0,
+        rotation: float = 0.0,
+        cam_x: float = 0.0,
+        state: str = STATE_PLAYING,
+        jump_buffer: int = 0,
+        jump_held: bool = False,
+        frame: int = 0,
+    ) -> None:
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.rect_x = rect_x
+        self.rect_y = rect_y
+        self.prev_top = prev_top
+        self.prev_bottom = prev_bottom
+        self.vel_y = vel_y
+        self.on_ground = on_ground
+        self.coyote_frames = coyote_frames
+        self.rotation = rotation
+        self.cam_x = cam_x
+        self.state = state
+        self.jump_buffer = jump_buffer
+        self.jump_held = jump_held
+        self.frame = frame
+
+
+class Simulation:
+    """Applique les règles du jeu frame par frame, sans fenêtre ni horloge."""
+
+    def __init__(self, level: Optional[Level] = None) -> None:
+        self.level = level if level is not None else Level()
+        self.player = Player(self.level.player_spawn)
+        self.cam_x = 0.0
+        self.state = STATE_MENU
+        self.attempt = 0
+        self.frame = 0
+        self.jump_buffer = 0
+        self.jump_held = False
+        self.profiler = NullProfiler()
+        self.recorder: Optional[ReplayRecorder] = None
+        self._jump_pressed = False
+        self.events: List[str] = []
+        self._remember_positions()
+
+    def _remember_positions(self) -> None:
+        self.prev_cam_x = self.cam_x
+        self.prev_player_pos = (self.player.rect.x, self.player.rect.y)
+
+    def start_run(self, start_with_jump: bool) -> None:
+        self.level.reset()
+        self.player.reset(self.level.player_spawn)
+        self.cam_x = 0.0
+        self.jump_buffer = JUMP_BUFFER_FRAMES if start_with_jump else 0
+        self.jump_held = start_with_jump
+        self.state = STATE_PLAYING
+        self.attempt += 1
+        self.frame = 0
+        self._jump_pressed = False
+        if self.recorder is not None:
+            self.recorder.start(start_with_jump)
+        self._remember_positions()
+
+    def press_jump(self) -> None:
+        """Appui sur ESPACE : tampon de saut en course, sinon (re)lance une partie."""
+        if self.state == STATE_PLAYING:
+            self.jump_buffer = JUMP_BUFFER_FRAMES
+            self._jump_pressed = True
+        self.jump_held = True
+        if self.state != STATE_PLAYING:
+            self.start_run(True)
+
+    def release_jump(self) -> None:
+        self.jump_held = False
+
+    def snapshot(self, into: Optional[SimSnapshot] = None) -> SimSnapshot:
+        """Copie l'état courant dans ``into`` (réutilisé) ou dans un nouvel enregistrement."""
+        snap = into if into is not None else SimSnapshot()
+        player = self.player
+        snap.pos_x = player._pos_x
+        snap.pos_y = player._pos_y
+        snap.rect_x = player.rect.x
+        snap.rect_y = player.rect.y
+        snap.prev_top = player.prev_top
+        snap.prev_bottom = player.prev_bottom
+        snap.vel_y = player.vel_y
+        snap.on_ground = player.on_ground
+        snap.coyote_frames = player.coyote_frames
+        snap.rotation = player.rotation
+        snap.cam_x = self.cam_x
+        snap.state = self.state
+        snap.jump_buffer = self.jump_buffer
+        snap.jump_held = self.jump_held
+        snap.frame = self.frame
+        return snap
+
+    def restore(self, snap: SimSnapshot) -> None:
+        """Reprend la partie à ``snap`` : même joueur, même caméra, tranches du niveau rechargées autour.
+
+        Une partie reprise ne se rejoue plus depuis le départ : l'enregistrement
+        en cours de ``recorder`` est abandonné.
+        """
+        player = self.player
+        player._pos_x = snap.pos_x
+        player._pos_y = snap.pos_y
+        player.rect.x = snap.rect_x
+        player.rect.y = snap.rect_y
+        player.prev_top = snap.prev_top
+        player.prev_bottom = snap.prev_bottom
+        player.vel_y = snap.vel_y
+        player.on_ground = snap.on_ground
+        player.coyote_frames = snap.coyote_frames
+        player.rotation = snap.rotation
+        player.landed = False
+        self.cam_x = snap.cam_x
+        self.state = snap.state
+        self.jump_buffer = snap.jump_buffer
+        self.jump_held = snap.jump_held
+        self.frame = snap.frame
+        self._jump_pressed = False
+        self.events.clear()
+        if self.recorder is not None:
+            self.recorder.cancel()
+        self.level.stream(self.cam_x)
+        self._remember_positions()
+
+    def step(self, inputs: FrameInput = FrameInput()) -> StepResult:
+        if inputs.jump_pressed:
+            self.press_jump()
+        if not inputs.jump_held:
+            self.release_jump()
+        jumped = self.update()
+        return StepResult(
+            state=self.state,
+            player_rect=self.player.rect.copy(),
+            cam_x=self.cam_x,
+            progress=self.progress,
+            jumped=jumped,
+            landed=EVENT_LAND in self.events,
+            died=EVENT_DEATH in self.events,
+        )
+
+    def update(self) -> bool:
+        """Avance la simulation d'un pas fixe ; renvoie True si le joueur a sauté.
+
+        ``events`` liste ensuite ce qui s'est produit pendant ce pas (saut,
+        atterrissage, mort, arrivée) ; la liste est vidée au pas suivant. ``frame``
+        compte les pas joués depuis ``start_run``.
+        """
+        player = self.player
+        level = self.level
+        events = self.events
+        events.clear()
+        self._remember_positions()
+        jumped = False
+        if self.state == STATE_PLAYING:
+            self.frame += 1
+            if self.recorder is not None:
+                self.recorder.frame(self._jump_pressed, self.jump_held)
+            self._jump_pressed = False
+            player.advance(RUN_SPEED)
+            player.apply_gravity()
+            rect = player.rect
+            started = self.profiler.begin()
+            player.handle_ground(level.ground_iter(rect.left, rect.right))
+            self.profiler.end("ground", started)
+            if player.landed:
+                events.append(EVENT_LAND)
+            if player.can_jump() and (self.jump_buffer > 0 or self.jump_held):
+                player.jump()
+                self.jump_buffer = 0
+                jumped = True
+                events.append(EVENT_JUMP)
+            elif self.jump_buffer > 0:
+                self.jump_buffer -= 1
+            player.update_rotation()
+
+            started = self.profiler.begin()
+            hit = player.hits_spikes(level.spikes_in(rect.left, rect.right))
+            self.profiler.end("spikes", started)
+            if hit or rect.top > HEIGHT + 200:
+                self.state = STATE_DEAD
+                self.jump_buffer = 0
+                self.jump_held = False
+                events.append(EVENT_DEATH)
+            elif player.rect.left >= level.finish_x:
+                self.state = STATE_WIN
+                events.append(EVENT_WIN)
+                self.jump_buffer = 0
+                self.jump_held = False
+            if self.state != STATE_PLAYING and self.recorder is not None:
+                self.recorder.finish(self.state, player.rect)
+
+            target_cam = max(0.0, player.rect.centerx - CAMERA_OFFSET_X)
+            self.cam_x += (target_cam - self.cam_x) * 0.12
+            level.stream(self.cam_x)
+        elif self.state in (STATE_DEAD, STATE_WIN):
+            player.update_rotation()
+
+        if self.state == STATE_MENU:
+            player.reset(level.player_spawn)
+            self.cam_x = 0.0
+        return jumped
+
+    @property
+    def progress(self) -> float:
+        if self.state == STATE_WIN:
+            return 1.0
+        return self.level.progress(self.player.rect.centerx if self.state != STATE_MENU else self.level.player_spawn[0])
+
+    def interpolate(self, alpha: float) -> Tuple[float, Tuple[float, float]]:
+        """Caméra et décalage du joueur à afficher, ``alpha`` étant la fraction du pas suivant écoulée.
+
+        Le décalage s'ajoute à ``player.rect`` pour revenir vers la position
+        du pas précédent quand ``alpha`` < 1.
+        """
+        back = 1.0 - alpha
+        cam_x = self.cam_x + (self.prev_cam_x - self.cam_x) * back
+        prev_x, prev_y = self.prev_player_pos
+        offset = ((prev_x - self.player.rect.x) * back, (prev_y - self.player.rect.y) * back)
+        return cam_x, offset
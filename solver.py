@@ -0,0 +1,225 @@
+"""Solveur automatique : cherche une suite de sauts qui termine un niveau.
+
+La recherche en profondeur ne branche qu'aux pas où le cube peut sauter
+(au sol ou pendant le temps de grâce) : sauter maintenant ou continuer. Chaque
+branche est simulée avec la vraie ``Simulation`` ; un état déjà exploré sans
+succès (pas, hauteur, vitesse, sol, grâce) n'est jamais réexploré. Avec
+plusieurs processus, le niveau est découpé en segments indépendants (voir
+``_anchors``) résolus chacun dans un processus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple, Union
+
+from level import Level
+from level_file import LevelSource, level_source, load_source, open_level
+from replay import Replay, ReplayRecorder
+from settings import CAMERA_OFFSET_X, COYOTE_FRAMES, PLAYER_SIZE, RUN_SPEED
+from simulation import STATE_PLAYING, STATE_WIN, SimSnapshot, Simulation
+
+# Segments confiés à chaque processus, pour équilibrer la charge
+SEGMENTS_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class SolveResult:
+    """Résultat d'une recherche : les pas où sauter, ou le point le plus lointain atteint."""
+
+    solved: bool
+    jump_frames: Tuple[int, ...]
+    frames: int
+    furthest_x: int
+    nodes: int
+
+    def to_replay(self, level: Optional[Level] = None) -> Replay:
+        """Rejoue la solution avec un ``ReplayRecorder`` pour obtenir un fichier ``.gdr``."""
+        sim = Simulation(level)
+        sim.recorder = ReplayRecorder()
+        sim.start_run(False)
+        jumps = set(self.jump_frames)
+        frame = 0
+        while sim.state == STATE_PLAYING:
+            _apply_decision(sim, frame in jumps)
+            frame += 1
+        return sim.recorder.take()[-1]
+
+
+def _apply_decision(sim: Simulation, jump: bool) -> None:
+    # Un appui au pas où le cube peut sauter : le saut part aussitôt et vide le tampon.
+    if jump:
+        sim.press_jump()
+    else:
+        sim.release_jump()
+    sim.update()
+
+
+def _state_key(frame: int, sim: Simulation) -> Tuple[int, int, int, bool, int]:
+    player = sim.player
+    return (frame, int(round(player._pos_y * 4)), int(round(player.vel_y * 4)), player.on_ground, player.coyote_frames)
+
+
+def _advance_to_decision(sim: Simulation, frame: int, stop: Optional[int] = None) -> int:
+    """Avance sans sauter jusqu'au prochain pas où un saut est possible, la fin de la partie ou ``stop``."""
+    player = sim.player
+    while sim.state == STATE_PLAYING and not player.can_jump() and frame != stop:
+        _apply_decision(sim, False)
+        frame += 1
+    return frame
+
+
+def _at_rest(sim: Simulation, y: int) -> bool:
+    player = sim.player
+    return player.on_ground and player.coyote_frames == COYOTE_FRAMES and player.vel_y == 0 and player.rect.y == y
+
+
+def search(
+    sim: Simulation,
+    frame: int = 0,
+    jumps: Sequence[int] = (),
+    goal: Optional[Tuple[int, int]] = None,
+    max_nodes: Optional[int] = None,
+) -> SolveResult:
+    """Recherche en profondeur à partir de l'état courant de ``sim`` (partie en cours).
+
+    Avec ``goal`` = (pas, y), la recherche s'arrête dès que le cube est posé au
+    sol à la hauteur ``y`` à ce pas ; toute branche qui y arrive autrement échoue.
+    """
+    goal_frame = goal[0] if goal is not None else None
+    path = list(jumps)
+    visited: Set[Tuple[int, int, int, bool, int]] = set()
+    pending: List[Tuple[SimSnapshot, int, int]] = []
+    furthest = sim.player.rect.x
+    nodes = 0
+    while True:
+        frame = _advance_to_decision(sim, frame, goal_frame)
+        furthest = max(furthest, sim.player.rect.x)
+        if sim.state == STATE_WIN or (frame == goal_frame and sim.state == STATE_PLAYING and _at_rest(sim, goal[1])):
+            return SolveResult(True, tuple(path), frame, furthest, nodes)
+        if sim.state == STATE_PLAYING and frame != goal_frame and (max_nodes is None or nodes < max_nodes):
+            key = _state_key(frame, sim)
+            if key not in visited:
+                visited.add(key)
+                nodes += 1
+                # Continuer d'abord au sol ; le saut est essayé au retour en arrière.
+                pending.append((sim.snapshot(), frame, len(path)))
+                _apply_decision(sim, False)
+                frame += 1
+                continue
+        if not pending:
+            return SolveResult(False, (), frame, furthest, nodes)
+        snapshot, frame, depth = pending.pop()
+        sim.restore(snapshot)
+        del path[depth:]
+        path.append(frame)
+        _apply_decision(sim, True)
+        frame += 1
+
+
+def _anchors(sim: Simulation, count: int) -> List[Tuple[int, int, SimSnapshot]]:
+    """Jusqu'à ``count`` points de passage répartis le long du niveau : (pas, y, état posé au sol).
+
+    Un cube posé au sol, sans vitesse ni saut en cours, est dans le même état
+    quel que soit le chemin suivi pour arriver là (seule la caméra diffère) : les
+    segments entre deux points de passage se résolvent indépendamment.
+    """
+    level = sim.level
+    player = sim.player
+    pos_x = player._pos_x
+    start_x = pos_x
+    frame = 0
+    anchors = []
+    for index in range(1, count):
+        target = start_x + (level.finish_x - start_x) * index / count
+        while pos_x < target:
+            pos_x += RUN_SPEED
+            frame += 1
+        while pos_x < level.finish_x:
+            x = int(round(pos_x))
+            sections = [s.rect for s in level.ground_iter(x, x + PLAYER_SIZE) if s.rect.left <= x and x + PLAYER_SIZE <= s.rect.right]
+            clear = sections and not level.spikes_in(x - 2 * PLAYER_SIZE, x + 2 * PLAYER_SIZE)
+            if clear and (not anchors or anchors[-1][0] < frame):
+                y = sections[0].top - PLAYER_SIZE
+                cam_x = max(0.0, x + PLAYER_SIZE // 2 - CAMERA_OFFSET_X)
+                state = SimSnapshot(pos_x, float(y), x, y, y, y + PLAYER_SIZE, 0.0, True, COYOTE_FRAMES, 0.0, cam_x, frame=frame)
+                anchors.append((frame, y, state))
+                break
+            pos_x += RUN_SPEED
+            frame += 1
+    return anchors
+
+
+_worker_sim: Optional[Simulation] = None
+
+
+def _init_worker(source: LevelSource) -> None:
+    global _worker_sim
+    _worker_sim = Simulation(load_source(source))
+    _worker_sim.start_run(False)
+
+
+def _search_segment(task: Tuple[SimSnapshot, int, Optional[Tuple[int, int]]]) -> SolveResult:
+    snapshot, frame, goal = task
+    _worker_sim.restore(snapshot)
+    return search(_worker_sim, frame, goal=goal)
+
+
+def solve(level: Union[Level, str, None] = None, workers: int = 1) -> SolveResult:
+    """Cherche une solution ; ``level`` peut être un chemin (chaque processus rouvre alors le fichier).
+
+    Avec plusieurs processus, le niveau est découpé en segments entre des points
+    de passage au sol. Si un segment n'a pas de solution passant par ces points,
+    la recherche complète reprend depuis le début dans ce processus.
+    """
+    source = level if isinstance(level, str) else None
+    level = open_level(level) if isinstance(level, str) else level if level is not None else Level()
+    sim = Simulation(level)
+    sim.start_run(False)
+    start = sim.snapshot()
+    if workers > 1:
+        anchors = _anchors(sim, workers * SEGMENTS_PER_WORKER)
+        starts = [(start, 0)] + [(state, frame) for frame, _, state in anchors]
+        goals = [(frame, y) for frame, y, _ in anchors] + [None]
+        tasks = [(state, frame, goal) for (state, frame), goal in zip(starts, goals)]
+        with multiprocessing.Pool(workers, _init_worker, (source or level_source(level),)) as pool:
+            results = []
+            for result in pool.imap(_search_segment, tasks):
+                if not result.solved:
+                    pool.terminate()
+                    break
+                results.append(result)
+        if len(results) == len(tasks):
+            jumps = tuple(frame for result in results for frame in result.jump_frames)
+            last = results[-1]
+            return SolveResult(True, jumps, last.frames, last.furthest_x, sum(result.nodes for result in results))
+        sim.restore(start)
+    return search(sim)
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Vérifie qu'un niveau peut être terminé.")
+    parser.add_argument("level", nargs="?", help="niveau à résoudre (.json ou .gdl), niveau d'origine par défaut")
+    parser.add_argument("--workers", type=int, default=1, help="nombre de processus de recherche")
+    parser.add_argument("--replay", help="écrit la solution trouvée en relecture .gdr")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    result = solve(args.level, args.workers)
+    elapsed = time.perf_counter() - started
+    if not result.solved:
+        print(f"Aucune solution : x maximal atteint {result.furthest_x} ({result.nodes} états, {elapsed:.2f} s)")
+        raise SystemExit(1)
+    print(f"Solution : {len(result.jump_frames)} sauts en {result.frames} pas ({result.nodes} états, {elapsed:.2f} s)")
+    print("Sauts aux pas :", " ".join(str(frame) for frame in result.jump_frames))
+    if args.replay:
+        level = open_level(args.level) if args.level else Level()
+        result.to_replay(level).save(args.replay)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+"""Index spatial en x (grille uniforme) pour les objets du niveau."""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+BUCKET_WIDTH = 256
+
+
+class SpatialIndex(Generic[T]):
+    """Range des objets par cases de largeur fixe le long de l'axe x.
+
+    ``query`` renvoie les objets dont l'étendue chevauche ``[x0, x1]`` dans leur
+    ordre d'insertion, c'est-à-dire l'ordre d'un parcours linéaire de la liste.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T],
+        extent: Callable[[T], Tuple[float, float]],
+        bucket_width: int = BUCKET_WIDTH,
+    ) -> None:
+        self.bucket_width = bucket_width
+        self._extent = extent
+        self._items: List[Optional[T]] = []
+        self._extents: List[Tuple[float, float]] = []
+        self._slots: Dict[int, int] = {}
+        self._buckets: Dict[int, List[int]] = {}
+        for item in items:
+            self.insert(item)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator[T]:
+        return (item for item in self._items if item is not None)
+
+    def _bucket_range(self, x0: float, x1: float) -> range:
+        width = self.bucket_width
+        return range(math.floor(x0 / width), math.floor(x1 / width) + 1)
+
+    def insert(self, item: T) -> None:
+        left, right = self._extent(item)
+        slot = len(self._items)
+        self._items.append(item)
+        self._extents.append((left, right))
+        self._slots[id(item)] = slot
+        for key in self._bucket_range(left, right):
+            self._buckets.setdefault(key, []).append(slot)
+
+    def remove(self, item: T) -> None:
+        slot = self._slots.pop(id(item))
+        left, right = self._extents[slot]
+        self._items[slot] = None
+        for key in self._bucket_range(left, right):
+            bucket = self._buckets[key]
+            bucket.remove(slot)
+            if not bucket:
+                del self._buckets[key]
+
+    def buckets_for(self, x0: float, x1: float) -> range:
+        """Clés des cases couvertes par ``[x0, x1]``."""
+        return self._bucket_range(x0, x1)
+
+    def query(self, x0: float, x1: float) -> List[T]:
+        keys = self._bucket_range(x0, x1)
+        if len(keys) == 1:
+            slots: Iterable[int] = self._buckets.get(keys[0], ())
+        else:
+            merged = set()
+            if len(keys) > len(self._buckets):
+                for key, bucket in self._buckets.items():
+                    if keys.start <= key < keys.stop:
+                        merged.update(bucket)
+            else:
+                for key in keys:
+                    merged.update(self._buckets.get(key, ()))
+            slots = sorted(merged)
+        extents = self._extents
+        items = self._items
+        found = []
+        for slot in slots:
+            left, right = extents[slot]
+            if left <= x1 and right >= x0:
+                found.append(items[slot])
+        return found
@@ -0,0 +1,83 @@
+"""Caches de surfaces : textes rendus et rotations précalculées d'un sprite."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import pygame
+
+TEXT_CACHE_SIZE = 128
+
+
+class TextCache:
+    """Cache LRU des surfaces de texte, indexé par (police, texte, couleur)."""
+
+    def __init__(self, capacity: int = TEXT_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self._surfaces: OrderedDict[Tuple[pygame.font.Font, str, Tuple[int, ...]], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, ...]) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class RotationAtlas:
+    """Toutes les rotations d'un sprite par pas de ``step`` degrés, avec leur décalage de blit.
+
+    ``get`` renvoie la surface et le décalage à ajouter au centre voulu pour
+    obtenir le coin haut gauche, comme ``rotated.get_rect(center=...)``.
+    Un angle hors de la grille est tourné à la volée et compté comme un échec.
+    """
+
+    def __init__(self, surface: pygame.Surface, step: float) -> None:
+        self.source = surface
+        self.step = step
+        self.frames: List[pygame.Surface] = []
+        self.offsets: List[Tuple[int, int]] = []
+        angle = 0.0
+        while angle < 360:
+            rotated = pygame.transform.rotate(surface, angle)
+            self.frames.append(rotated)
+            self.offsets.append((-(rotated.get_width() // 2), -(rotated.get_height() // 2)))
+            angle += step
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def index(self, angle: float) -> int:
+        """Indice de l'image la plus proche de ``angle``."""
+        return int(round(angle / self.step)) % len(self.frames)
+
+    def get(self, angle: float) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        position = angle / self.step
+        index = int(position)
+        if index == position and index < len(self.frames):
+            self.hits += 1
+            return self.frames[index], self.offsets[index]
+        self.misses += 1
+        rotated = pygame.transform.rotate(self.source, angle)
+        return rotated, (-(rotated.get_width() // 2), -(rotated.get_height() // 2))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
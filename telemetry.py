@@ -0,0 +1,317 @@
+"""Télémétrie des parties : carte des morts le long du niveau et meilleure progression de chaque essai.
+
+Les compteurs sont agrégés en mémoire par intervalles de largeur fixe. Toutes
+les ``TELEMETRY_FLUSH_INTERVAL`` secondes, les compteurs accumulés depuis la
+dernière écriture sont encodés en un enregistrement compact et confiés à un fil
+d'écriture qui l'ajoute en fin de fichier ``.gdh`` : la boucle de jeu n'attend
+jamais le disque. Un fichier n'est jamais réécrit ; ``load`` fusionne autant
+de fichiers que nécessaire (un par joueur, par session...).
+"""
+
+from __future__ import annotations
+
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+from settings import GROUND_HEIGHT, HEATMAP_BIN_WIDTH, HEIGHT, TELEMETRY_FLUSH_INTERVAL
+from simulation import EVENT_DEATH, EVENT_WIN, Simulation
+
+MAGIC = b"GDHM"
+FORMAT_VERSION = 1
+
+KIND_DEATHS = 1
+KIND_PROGRESS = 2
+# Progression en pour cent : 101 intervalles de 1 (0 à 100 %)
+PROGRESS_BIN_WIDTH = 1
+
+# magic, version, type, largeur d'intervalle, premier intervalle, nombre
+# d'intervalles ; suivent autant de compteurs uint32 petit-boutistes.
+_RECORD = struct.Struct("<4sBBHII")
+_MAX_GAP = 16
+
+HEAT_COLD = (70, 110, 220)
+HEAT_HOT = (250, 70, 60)
+HEAT_BAND_HEIGHT = 60
+
+
+class Histogram:
+    """Compteurs par intervalles ``[i * bin_width, (i + 1) * bin_width)``, agrandis à la demande.
+
+    ``total`` et ``peak`` sont tenus à jour à chaque ajout (affichage à chaque image).
+    """
+
+    __slots__ = ("bin_width", "counts", "total", "peak")
+
+    def __init__(self, bin_width: int, counts: Optional[array] = None) -> None:
+        self.bin_width = bin_width
+        self.counts = counts if counts is not None else array("Q")
+        self.total = sum(self.counts)
+        self.peak = max(self.counts, default=0)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, value: float, count: int = 1) -> int:
+        """Ajoute ``count`` à l'intervalle de ``value`` et renvoie l'indice de cet intervalle."""
+        index = max(0, int(value // self.bin_width))
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += count
+        self.total += count
+        self.peak = max(self.peak, counts[index])
+        return index
+
+    def merge(self, other: Histogram) -> None:
+        if other.bin_width != self.bin_width:
+            raise ValueError("Largeurs d'intervalle différentes.")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.add(index * self.bin_width, count)
+
+    def bins(self) -> Dict[int, int]:
+        return {index: count for index, count in enumerate(self.counts) if count}
+
+
+def encode_bins(kind: int, bin_width: int, bins: Dict[int, int]) -> bytes:
+    """Enregistrements binaires des intervalles ``bins`` (indice -> compte), vide s'il n'y en a pas.
+
+    Un enregistrement couvre une suite d'intervalles proches : un trou de plus de
+    ``_MAX_GAP`` intervalles vides en commence un autre. Les compteurs sont sur
+    32 bits ; un compte plus grand est réparti sur plusieurs enregistrements.
+    """
+    out = bytearray()
+    while bins:
+        rest = {}
+        indexes = sorted(bins)
+        start = 0
+        for stop in range(1, len(indexes) + 1):
+            if stop < len(indexes) and indexes[stop] - indexes[stop - 1] <= _MAX_GAP:
+                continue
+            first = indexes[start]
+            body = array("I", bytes(4 * (indexes[stop - 1] - first + 1)))
+            for index in indexes[start:stop]:
+                count = bins[index]
+                body[index - first] = min(count, 0xFFFFFFFF)
+                if count > 0xFFFFFFFF:
+                    rest[index] = count - 0xFFFFFFFF
+            if sys.byteorder == "big":
+                body.byteswap()
+            out += _RECORD.pack(MAGIC, FORMAT_VERSION, kind, bin_width, first, len(body)) + body.tobytes()
+            start = stop
+        bins = rest
+    return bytes(out)
+
+
+class TelemetryWriter:
+    """Fil d'écriture : ajoute en fin de ``path`` les blocs reçus par ``submit``.
+
+    Une erreur d'écriture est comptée dans ``errors`` sans jamais interrompre le jeu.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.errors = 0
+        self.written = 0
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def submit(self, data: bytes) -> None:
+        self._queue.put(data)
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            try:
+                with open(self.path, "ab") as handle:
+                    handle.write(data)
+                self.written += len(data)
+            except OSError:
+                self.errors += 1
+
+    def close(self, timeout: float = 2.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class Telemetry:
+    """Morts (position x) et meilleure progression (%) de chaque essai, pour la session et l'historique.
+
+    ``deaths`` et ``progress`` cumulent l'historique chargé et la session ;
+    seuls les compteurs ajoutés depuis la dernière écriture partent sur disque.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        bin_width: int = HEATMAP_BIN_WIDTH,
+        flush_interval: float = TELEMETRY_FLUSH_INTERVAL,
+    ) -> None:
+        self.bin_width = bin_width
+        self.flush_interval = flush_interval
+        self.deaths = Histogram(bin_width)
+        self.progress = Histogram(PROGRESS_BIN_WIDTH)
+        # Compteurs pas encore écrits, creux (indice -> compte)
+        self._pending_deaths: Dict[int, int] = {}
+        self._pending_progress: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+        self.writer = TelemetryWriter(path) if path is not None else None
+
+    def record_death(self, x: float) -> None:
+        index = self.deaths.add(x)
+        if self.writer is not None:
+            self._pending_deaths[index] = self._pending_deaths.get(index, 0) + 1
+
+    def record_run(self, progress: float) -> None:
+        index = self.progress.add(round(min(max(progress, 0.0), 1.0) * 100))
+        if self.writer is not None:
+            self._pending_progress[index] = self._pending_progress.get(index, 0) + 1
+
+    def observe(self, sim: Simulation) -> None:
+        """À appeler après chaque pas : relève la mort ou l'arrivée de ce pas (voir ``Simulation.events``)."""
+        events = sim.events
+        if not events:
+            return
+        if EVENT_DEATH in events:
+            self.record_death(sim.player.rect.centerx)
+            self.record_run(sim.progress)
+        elif EVENT_WIN in events:
+            self.record_run(1.0)
+
+    def flush(self, force: bool = False) -> None:
+        """Confie au fil d'écriture les compteurs en attente, au plus toutes les ``flush_interval`` s."""
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        if self.writer is None or not (self._pending_deaths or self._pending_progress):
+            return
+        deaths, self._pending_deaths = self._pending_deaths, {}
+        progress, self._pending_progress = self._pending_progress, {}
+        self.writer.submit(
+            encode_bins(KIND_DEATHS, self.bin_width, deaths) + encode_bins(KIND_PROGRESS, PROGRESS_BIN_WIDTH, progress)
+        )
+
+    def close(self) -> None:
+        self.flush(force=True)
+        if self.writer is not None:
+            self.writer.close()
+
+    def load_history(self, paths: Sequence[str]) -> None:
+        deaths, progress = load(paths, self.bin_width)
+        self.deaths.merge(deaths)
+        self.progress.merge(progress)
+
+
+def iter_records(data: bytes) -> Iterator[Tuple[int, int, int, int, int]]:
+    """(type, largeur, premier intervalle, nombre, position des compteurs) de chaque enregistrement.
+
+    Un enregistrement tronqué en fin de fichier (écriture interrompue) est ignoré.
+    """
+    offset = 0
+    size = len(data)
+    while offset + _RECORD.size <= size:
+        magic, version, kind, bin_width, first, count = _RECORD.unpack_from(data, offset)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Ce fichier n'est pas une télémétrie .gdh compatible.")
+        start = offset + _RECORD.size
+        offset = start + 4 * count
+        if offset > size:
+            return
+        yield kind, bin_width, first, count, start
+
+
+def load(paths: Sequence[str], bin_width: int = HEATMAP_BIN_WIDTH) -> Tuple[Histogram, Histogram]:
+    """Fusionne des fichiers ``.gdh`` en (morts, progression) ; les autres largeurs sont ignorées."""
+    # Import local : seule la fusion (outil et chargement initial) a besoin de NumPy.
+    import numpy as np
+
+    widths = {KIND_DEATHS: bin_width, KIND_PROGRESS: PROGRESS_BIN_WIDTH}
+    totals: Dict[int, np.ndarray] = {kind: np.zeros(0, dtype=np.uint64) for kind in widths}
+    for path in paths:
+        with open(path, "rb") as handle:
+            data = handle.read()
+        for kind, width, first, count, start in iter_records(data):
+            if widths.get(kind) != width:
+                continue
+            end = first + count
+            total = totals[kind]
+            if end > len(total):
+                grown = np.zeros(max(end, 2 * len(total)), dtype=np.uint64)
+                grown[:len(total)] = total
+                totals[kind] = total = grown
+            total[first:end] += np.frombuffer(data, dtype="<u4", count=count, offset=start)
+    histograms = []
+    for kind, width in widths.items():
+        total = totals[kind]
+        used = np.flatnonzero(total)
+        total = total[:used[-1] + 1] if used.size else total[:0]
+        histograms.append(Histogram(width, array("Q", total.tobytes())))
+    return histograms[0], histograms[1]
+
+
+def draw_heatmap(surface: pygame.Surface, font: pygame.font.Font, deaths: Histogram, cam_x: float) -> None:
+    """Surimpression de débogage : une barre par intervalle visible, hauteur et couleur selon les morts."""
+    counts = deaths.counts
+    width = deaths.bin_width
+    peak = deaths.peak
+    bottom = HEIGHT - GROUND_HEIGHT
+    if peak:
+        first = max(0, int(cam_x // width))
+        last = min(len(counts) - 1, int((cam_x + surface.get_width()) // width))
+        for index in range(first, last + 1):
+            count = counts[index]
+            if not count:
+                continue
+            ratio = count / peak
+            color = tuple(int(HEAT_COLD[c] + (HEAT_HOT[c] - HEAT_COLD[c]) * ratio) for c in range(3))
+            height = max(2, int(HEAT_BAND_HEIGHT * ratio))
+            surface.fill(color, (int(index * width - cam_x), bottom - height, width - 1, height))
+    label = font.render(f"morts : {deaths.total}  (max {peak} / {width} px)", True, (236, 236, 240))
+    surface.blit(label, (12, bottom - HEAT_BAND_HEIGHT - label.get_height() - 4))
+
+
+def main(argv: List[str]) -> None:
+    if len(argv) >= 3 and argv[0] == "merge":
+        deaths, progress = load(argv[2:])
+        with open(argv[1], "wb") as handle:
+            handle.write(
+                encode_bins(KIND_DEATHS, deaths.bin_width, deaths.bins())
+                + encode_bins(KIND_PROGRESS, PROGRESS_BIN_WIDTH, progress.bins())
+            )
+    elif len(argv) >= 2 and argv[0] == "show":
+        started = time.perf_counter()
+        deaths, progress = load(argv[1:])
+        elapsed = time.perf_counter() - started
+        print(f"{len(argv) - 1} fichiers fusionnés en {elapsed:.3f} s : {deaths.total} morts, {progress.total} essais")
+        ranked = sorted(range(len(deaths)), key=deaths.counts.__getitem__, reverse=True)[:10]
+        for index in ranked:
+            if deaths.counts[index]:
+                print(f"  x {index * deaths.bin_width:>8} - {(index + 1) * deaths.bin_width:<8} {deaths.counts[index]:>8} morts")
+        if progress.total:
+            reached = 0
+            for percent, count in enumerate(progress.counts):
+                reached += count
+                if reached * 2 >= progress.total:
+                    print(f"  progression médiane : {percent} %")
+                    break
+    else:
+        raise SystemExit(
+            "Usage :\n"
+            "  python telemetry.py merge SORTIE.gdh FICHIER.gdh...\n"
+            "  python telemetry.py show FICHIER.gdh..."
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
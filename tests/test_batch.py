@@ -0,0 +1,46 @@
+"""``BatchSimulation`` face à ``Simulation``, pas à pas et cube par cube."""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pytest
+
+from batch import BATCH_DEAD, BATCH_PLAYING, BATCH_WIN, BatchSimulation
+from simulation import STATE_DEAD, STATE_PLAYING, STATE_WIN, FrameInput, Simulation
+from test_simulation import obstacle_course, scripted_inputs
+
+BATCH_STATES = {BATCH_PLAYING: STATE_PLAYING, BATCH_DEAD: STATE_DEAD, BATCH_WIN: STATE_WIN}
+
+
+def run_batch_and_single(level_seed: int, scripts: List[List[FrameInput]]):
+    """Un cube du lot par script ; une partie terminée est relancée par un appui, comme ``Simulation``."""
+    batch = BatchSimulation(obstacle_course(level_seed), len(scripts))
+    sims = [Simulation(obstacle_course(level_seed)) for _ in scripts]
+    for sim in sims:
+        sim.start_run(False)
+    expected = []
+    actual = []
+    for frame in range(len(scripts[0])):
+        inputs = [script[frame] for script in scripts]
+        pressed = np.array([frame_input.jump_pressed for frame_input in inputs])
+        held = np.array([frame_input.jump_held for frame_input in inputs])
+        restart = pressed & (batch.state != BATCH_PLAYING)
+        if restart.any():
+            batch.reset(True, mask=restart)
+        batch.step(pressed, held)
+        for i, (sim, frame_input) in enumerate(zip(sims, inputs)):
+            result = sim.step(frame_input)
+            expected.append((tuple(result.player_rect), result.state, result.cam_x))
+            rect = (int(batch.rect_x[i]), int(batch.rect_y[i]), result.player_rect.w, result.player_rect.h)
+            actual.append((rect, BATCH_STATES[int(batch.state[i])], float(batch.cam_x[i])))
+    return expected, actual
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_matches_simulation_on_obstacle_course(seed):
+    scripts = [scripted_inputs(200 + 10 * seed + cube, 3000) for cube in range(8)]
+    expected, actual = run_batch_and_single(seed, scripts)
+    assert actual == expected
+    assert {state for _, state, _ in actual} >= {STATE_PLAYING, STATE_DEAD}
@@ -0,0 +1,57 @@
+"""Mode sans fin : reproductibilité, franchissabilité et reprise sans attente."""
+
+from __future__ import annotations
+
+import math
+
+from endless import ChunkGenerator, EndlessLevel
+from settings import RUN_SPEED
+from simulation import FrameInput, Simulation
+from solver import search
+
+
+def chunk_layout(generator, index):
+    chunk = generator.generate(index)
+    return (
+        [tuple(section.rect) for section in chunk.sections],
+        [(spike.x, spike.base_y, spike.size) for spike in chunk.spikes],
+    )
+
+
+def test_same_seed_same_chunks():
+    for index in (0, 1, 5, 40):
+        assert chunk_layout(ChunkGenerator(3), index) == chunk_layout(ChunkGenerator(3), index)
+    assert chunk_layout(ChunkGenerator(3), 1) != chunk_layout(ChunkGenerator(4), 1)
+
+
+def test_chunks_are_jumpable():
+    # Le solveur doit retrouver le sol après plusieurs tranches, pour plusieurs graines.
+    for seed in (0, 7, 12345):
+        level = EndlessLevel(seed)
+        try:
+            sim = Simulation(level)
+            sim.start_run(False)
+            goal = (math.ceil(4 * level.chunk_width / RUN_SPEED), sim.player.rect.y)
+            result = search(sim, goal=goal, max_nodes=50000)
+            assert result.solved, seed
+        finally:
+            level.close()
+
+
+def test_restart_keeps_spawn_chunks_resident():
+    level = EndlessLevel(1)
+    try:
+        sim = Simulation(level)
+        sim.start_run(False)
+        spawn = level.resident
+        # Avance assez loin pour que les tranches du départ soient oubliées.
+        sim.cam_x = 6 * level.chunk_width
+        level.stream(sim.cam_x)
+        assert not set(spawn) & set(level.resident)
+        sim.start_run(False)
+        assert set(spawn) <= set(level.resident)
+        for _ in range(30):
+            sim.step(FrameInput())
+        assert level.stalls == 0
+    finally:
+        level.close()
@@ -0,0 +1,64 @@
+"""Calques en tuiles (``StaticLayers``) face au rendu direct de ``draw_background`` et ``Level.draw``."""
+
+from __future__ import annotations
+
+import random
+
+import pygame
+import pytest
+
+from layers import TILE_WIDTH, StaticLayers
+from level import Level
+from main import create_vertical_gradient, draw_background
+from objects import GroundSection, Spike
+from settings import BACKGROUND_GRADIENT_BOTTOM, BACKGROUND_GRADIENT_TOP, GROUND_HEIGHT, HEIGHT, WIDTH
+
+
+@pytest.fixture(scope="module")
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.quit()
+
+
+def seam_level() -> Level:
+    """Pics de tailles paires et impaires à cheval sur les bords de tuiles."""
+    base_y = HEIGHT - GROUND_HEIGHT
+    sections = [GroundSection(pygame.Rect(x, base_y - (x // 700) % 2 * 40, 700, GROUND_HEIGHT)) for x in range(0, 7000, 700)]
+    spikes = [Spike(index * TILE_WIDTH - 17 - index % 3, base_y, size=(40, 41, 33)[index % 3]) for index in range(1, 13)]
+    return Level(sections, spikes)
+
+
+@pytest.fixture(scope="module", params=[Level, seam_level], ids=["default", "seams"])
+def renderers(request, screen):
+    level = request.param()
+    gradient = create_vertical_gradient((WIDTH, HEIGHT), BACKGROUND_GRADIENT_TOP, BACKGROUND_GRADIENT_BOTTOM)
+    layers = StaticLayers(level, gradient)
+    direct = pygame.Surface((WIDTH, HEIGHT)).convert()
+    tiled = direct.copy()
+    return level, gradient, layers, direct, tiled
+
+
+def same_pixels(a: pygame.Surface, b: pygame.Surface) -> bool:
+    return pygame.image.tobytes(a, "RGB") == pygame.image.tobytes(b, "RGB")
+
+
+def test_tiles_match_direct_rendering_at_integer_cameras(renderers):
+    level, gradient, layers, direct, tiled = renderers
+    # Caméras paires et impaires, des premières frames jusqu'au-delà de l'arrivée
+    for cam_x in list(range(0, 64)) + list(range(64, int(level.finish_x) + WIDTH, 11)):
+        draw_background(direct, gradient, cam_x, level)
+        level.draw(direct, cam_x)
+        layers.draw_background(tiled, cam_x)
+        layers.draw_level(tiled, cam_x)
+        assert same_pixels(direct, tiled), cam_x
+
+
+def test_background_matches_direct_rendering_at_fractional_cameras(renderers):
+    level, gradient, layers, direct, tiled = renderers
+    rng = random.Random(0)
+    cameras = [0.25, 0.5, 0.75, 1.5, 2.25] + [rng.uniform(0, 20_000) for _ in range(200)]
+    for cam_x in cameras:
+        draw_background(direct, gradient, cam_x, level)
+        layers.draw_background(tiled, cam_x)
+        assert same_pixels(direct, tiled), cam_x
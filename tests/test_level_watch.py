@@ -0,0 +1,58 @@
+"""Rechargement à chaud : sources invalides et fichier momentanément illisible."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+import level_watch
+from level_watch import LevelWatcher
+
+SOURCE = {"sections": [[0, 460, 800, 80], [900, 460, 800, 80]], "spikes": [[400, 460, 40]], "spawn": [80, 420]}
+
+
+def write(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def watched(tmp_path):
+    path = tmp_path / "niveau.json"
+    write(path, SOURCE, 1_000_000_000)
+    return path, LevelWatcher(str(path), interval=0.0)
+
+
+@pytest.mark.parametrize(
+    "source",
+    (
+        "{\"sections\": [[0, 460",
+        json.dumps({**SOURCE, "spawn": [80]}),
+        json.dumps({**SOURCE, "spikes": [[400, "haut", 40]]}),
+    ),
+)
+def test_invalid_source_is_reported_once(watched, source):
+    path, watcher = watched
+    path.write_text(source, encoding="utf-8")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    with pytest.raises(ValueError):
+        watcher.poll()
+    assert watcher.poll() is None
+    assert len(watcher.level.sections) == 2 and len(watcher.level.spikes) == 1
+
+
+def test_unreadable_file_is_retried(watched, monkeypatch):
+    path, watcher = watched
+    write(path, {**SOURCE, "spikes": []}, 2_000_000_000)
+
+    def locked(_path):
+        raise PermissionError(_path)
+
+    monkeypatch.setattr(level_watch, "read_level_source", locked)
+    assert watcher.poll() is None
+    monkeypatch.undo()
+    changed = watcher.poll()
+    assert changed is not None and len(changed) == 1
+    assert watcher.level.spikes == []
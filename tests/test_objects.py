@@ -0,0 +1,47 @@
+"""Collision précalculée des pics (``SpikeShape``) face à l'ancien ``Spike.collides``."""
+
+from __future__ import annotations
+
+import random
+
+import pygame
+import pytest
+
+from bench import legacy_spike_collides
+from objects import Spike
+
+
+def random_spike(rng: random.Random) -> Spike:
+    # Coordonnées flottantes et tailles impaires : arrondis de la boîte et de la pointe.
+    return Spike(rng.uniform(-500, 500), rng.uniform(0, 600), size=rng.choice((0, 1, 2, 7, 30, 40, 41, 99)))
+
+
+def random_rect_near(rng: random.Random, spike: Spike) -> pygame.Rect:
+    size = int(spike.size)
+    width = rng.choice((0, 1, 2, 21, 42, rng.randint(0, 120)))
+    height = rng.choice((0, 1, 2, 21, 42, rng.randint(0, 120)))
+    x = int(spike.x) + rng.randint(-width - 2, size + 2)
+    y = int(spike.base_y - spike.size) + rng.randint(-height - 2, size + 2)
+    return pygame.Rect(x, y, width, height)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_collides_matches_legacy_test(seed):
+    rng = random.Random(seed)
+    hits = 0
+    for _ in range(40_000):
+        spike = random_spike(rng)
+        rect = random_rect_near(rng, spike)
+        expected = legacy_spike_collides(spike, rect)
+        assert spike.collides(rect) == expected, (spike, rect)
+        hits += expected
+    assert hits > 0
+
+
+def test_collides_matches_legacy_test_on_touching_edges():
+    # Rectangles qui touchent la boîte du pic ou la traversent d'un pixel, sur chaque bord.
+    spike = Spike(100, 400, size=40)
+    for x in range(100 - 45, 100 + 45):
+        for y in range(360 - 45, 400 + 5):
+            rect = pygame.Rect(x, y, 42, 42)
+            assert spike.collides(rect) == legacy_spike_collides(spike, rect), rect
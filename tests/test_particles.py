@@ -0,0 +1,40 @@
+"""Rendu des particules : écriture directe en 32 bits et repli par ``blits``."""
+
+from __future__ import annotations
+
+import pygame
+import pytest
+
+from particles import KIND_DUST, KIND_EMBER, KIND_SPARK, KIND_TRAIL, ParticleSystem
+
+
+def grid() -> ParticleSystem:
+    """Particules immobiles sur une grille sans recouvrement, à tous les âges et jusque sur les bords."""
+    particles = ParticleSystem(capacity=4000, seed=5)
+    kinds = (KIND_TRAIL, KIND_DUST, KIND_SPARK, KIND_EMBER)
+    for row, y in enumerate(range(24, 340, 7)):
+        for column, x in enumerate(range(30, 580, 7)):
+            kind = kinds[(row + column) % len(kinds)]
+            particles.emit(kind, x, y, 1, (0.0, 0.0), (0, 0), (10 + column % 50, 10 + column % 50))
+    particles.gravity[:] = 0
+    for _ in range(8):
+        particles.update()
+    return particles
+
+
+@pytest.mark.parametrize("depth", (16, 24))
+def test_blits_fallback_matches_direct_pixels(depth):
+    particles = grid()
+    clip = pygame.Rect(40, 30, 500, 300)
+    reference = pygame.Surface((640, 400), depth=32)
+    other = pygame.Surface((640, 400), depth=depth)
+    images = []
+    for surface in (reference, other):
+        surface.set_clip(clip)
+        drawn = particles.draw(surface, 20.0)
+        # Comparaison en RVB après passage par le format de la surface
+        expected = pygame.Surface((640, 400), depth=depth)
+        expected.blit(surface, (0, 0))
+        images.append((drawn, pygame.image.tobytes(expected, "RGB")))
+    assert images[0][0] > 1000
+    assert images[0] == images[1]
@@ -0,0 +1,52 @@
+"""Reprise aux points de contrôle du mode entraînement."""
+
+from __future__ import annotations
+
+from practice import PracticeMode
+from simulation import STATE_DEAD, STATE_PLAYING, FrameInput, Simulation
+
+
+def test_respawn_keeps_live_jump_input():
+    # Point de contrôle posé en l'air ESPACE enfoncée, puis mort touche relâchée
+    sim = Simulation()
+    practice = PracticeMode()
+    practice.toggle()
+    sim.start_run(False)
+    for _ in range(20):
+        sim.step(FrameInput())
+    sim.step(FrameInput(jump_pressed=True, jump_held=True))
+    for _ in range(5):
+        sim.step(FrameInput(jump_held=True))
+    assert sim.jump_held and not sim.player.on_ground
+    assert practice.place(sim)
+    assert practice.checkpoints[-1].jump_held
+
+    for _ in range(600):
+        if sim.step(FrameInput()).state != STATE_PLAYING:
+            break
+    assert sim.state == STATE_DEAD
+    assert not sim.jump_held
+
+    assert practice.respawn(sim)
+    assert sim.state == STATE_PLAYING
+    assert not sim.jump_held
+    assert sim.jump_buffer == 0
+    for _ in range(60):
+        if sim.step(FrameInput()).landed:
+            break
+    assert sim.player.on_ground
+    # Sans nouvel appui, le cube reste au sol au lieu de ressauter.
+    for _ in range(10):
+        assert not sim.step(FrameInput()).jumped
+
+
+def test_restore_is_exact_for_the_solver():
+    sim = Simulation()
+    sim.start_run(True)
+    sim.step(FrameInput(jump_held=True))
+    snapshot = sim.snapshot()
+    assert snapshot.jump_held
+    sim.step(FrameInput())
+    sim.restore(snapshot)
+    assert sim.jump_held == snapshot.jump_held
+    assert sim.jump_buffer == snapshot.jump_buffer
@@ -0,0 +1,41 @@
+"""Profileur par phase : activation entre deux images."""
+
+from __future__ import annotations
+
+from profiler import FrameProfiler
+
+# Plafond très large pour une phase vide (1 s)
+MAX_PLAUSIBLE_NS = 1_000_000_000
+
+
+def test_toggle_mid_frame_records_no_bogus_sample():
+    profiler = FrameProfiler(phases=("events", "frame"), capacity=8)
+    started = profiler.begin()
+    profiler.toggle()
+    profiler.end("events", started)
+    profiler.end_frame()
+    assert profiler.enabled
+    assert len(profiler) == 0
+
+    started = profiler.begin()
+    profiler.end("events", started)
+    profiler.end_frame()
+    assert len(profiler) == 1
+    assert 0 <= profiler.samples("events")[0] < MAX_PLAUSIBLE_NS
+
+
+def test_disable_mid_frame_drops_partial_phases():
+    profiler = FrameProfiler(phases=("events", "frame"), capacity=8, enabled=True)
+    # Phase déjà comptée (5 s simulées) dans l'image où le profilage est coupé
+    profiler.end("events", profiler.begin() - 5 * MAX_PLAUSIBLE_NS)
+    profiler.toggle()
+    profiler.end_frame()
+    assert not profiler.enabled
+
+    profiler.toggle()
+    profiler.end_frame()
+    started = profiler.begin()
+    profiler.end("events", started)
+    profiler.end_frame()
+    assert len(profiler) == 1
+    assert profiler.samples("events")[0] < MAX_PLAUSIBLE_NS
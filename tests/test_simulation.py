@@ -0,0 +1,148 @@
+"""``Simulation.step`` face à la boucle interactive d'avant l'extraction de la simulation."""
+
+from __future__ import annotations
+
+import random
+from typing import List, Tuple
+
+import pygame
+import pytest
+
+from level import Level
+from objects import GroundSection, Player, Spike
+from settings import CAMERA_OFFSET_X, GROUND_HEIGHT, HEIGHT, JUMP_BUFFER_FRAMES, RUN_SPEED
+from simulation import STATE_DEAD, STATE_MENU, STATE_PLAYING, STATE_WIN, FrameInput, Simulation
+
+
+class InteractiveLoop:
+    """Règles de ``main.run`` avant ``Simulation`` : gestion des touches puis mise à jour, au pas fixe."""
+
+    def __init__(self, level: Level) -> None:
+        self.level = level
+        self.player = Player(level.player_spawn)
+        self.cam_x = 0.0
+        self.state = STATE_MENU
+        self.jump_buffer = 0
+        self.jump_held = False
+
+    def start_run(self, start_with_jump: bool) -> None:
+        self.level.reset()
+        self.player.reset(self.level.player_spawn)
+        self.cam_x = 0.0
+        self.jump_buffer = JUMP_BUFFER_FRAMES if start_with_jump else 0
+        self.jump_held = start_with_jump
+        self.state = STATE_PLAYING
+
+    def key_down(self) -> None:
+        if self.state == STATE_PLAYING:
+            self.jump_buffer = JUMP_BUFFER_FRAMES
+        self.jump_held = True
+        if self.state in (STATE_MENU, STATE_DEAD, STATE_WIN):
+            self.start_run(True)
+
+    def key_up(self) -> None:
+        self.jump_held = False
+
+    def update(self) -> None:
+        player = self.player
+        level = self.level
+        if self.state == STATE_PLAYING:
+            player.advance(RUN_SPEED)
+            player.apply_gravity()
+            player.handle_ground(level.ground_iter())
+            if player.can_jump() and (self.jump_buffer > 0 or self.jump_held):
+                player.jump()
+                self.jump_buffer = 0
+            elif self.jump_buffer > 0:
+                self.jump_buffer -= 1
+            player.update_rotation()
+
+            if player.hits_spikes(level.spikes) or player.rect.top > HEIGHT + 200:
+                self.state = STATE_DEAD
+                self.jump_buffer = 0
+                self.jump_held = False
+            elif player.rect.left >= level.finish_x:
+                self.state = STATE_WIN
+                self.jump_buffer = 0
+                self.jump_held = False
+
+            target_cam = max(0.0, player.rect.centerx - CAMERA_OFFSET_X)
+            self.cam_x += (target_cam - self.cam_x) * 0.12
+        elif self.state in (STATE_DEAD, STATE_WIN):
+            player.update_rotation()
+
+        if self.state == STATE_MENU:
+            player.reset(level.player_spawn)
+            self.cam_x = 0.0
+
+
+def scripted_inputs(seed: int, frames: int) -> List[FrameInput]:
+    """Appuis et relâchements tirés au hasard, y compris appui et relâchement dans la même frame."""
+    rng = random.Random(seed)
+    held = False
+    inputs = []
+    for _ in range(frames):
+        pressed = rng.random() < 0.08
+        if pressed:
+            held = rng.random() < 0.7
+        elif held and rng.random() < 0.1:
+            held = False
+        inputs.append(FrameInput(jump_pressed=pressed, jump_held=held))
+    return inputs
+
+
+def obstacle_course(seed: int) -> Level:
+    """Plateformes de hauteurs variées séparées de trous, avec des pics au sol et sur les marches."""
+    rng = random.Random(seed)
+    base_y = HEIGHT - GROUND_HEIGHT
+    sections = []
+    spikes = []
+    x = 0
+    for index in range(40):
+        width = rng.randint(160, 520)
+        top = base_y - rng.choice((0, 0, 40, 80))
+        sections.append(GroundSection(pygame.Rect(x, top, width, HEIGHT - top)))
+        if index > 0 and rng.random() < 0.7:
+            spikes.append(Spike(x + rng.uniform(40, width - 60), top, size=rng.choice((30, 40, 41))))
+        x += width + rng.choice((0, 60, 120))
+    return Level(sections, spikes)
+
+
+def run_both(level_factory, inputs: List[FrameInput]) -> Tuple[list, list]:
+    loop = InteractiveLoop(level_factory())
+    sim = Simulation(level_factory())
+    expected = []
+    actual = []
+    for frame in inputs:
+        if frame.jump_pressed:
+            loop.key_down()
+        if not frame.jump_held:
+            loop.key_up()
+        loop.update()
+        result = sim.step(frame)
+        expected.append((tuple(loop.player.rect), loop.state, loop.cam_x))
+        actual.append((tuple(result.player_rect), result.state, result.cam_x))
+    return expected, actual
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_step_matches_interactive_loop_on_default_level(seed):
+    expected, actual = run_both(Level, scripted_inputs(seed, 3000))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_step_matches_interactive_loop_on_obstacle_course(seed):
+    expected, actual = run_both(lambda: obstacle_course(seed), scripted_inputs(100 + seed, 4000))
+    assert actual == expected
+    # Le scénario doit passer par des morts et des relances, pas seulement une course.
+    assert {state for _, state, _ in actual} >= {STATE_PLAYING, STATE_DEAD}
+
+
+def test_step_without_inputs_stays_in_menu():
+    sim = Simulation()
+    spawn = tuple(sim.player.rect)
+    for _ in range(10):
+        result = sim.step()
+        assert result.state == STATE_MENU
+        assert tuple(result.player_rect) == spawn
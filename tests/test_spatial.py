@@ -0,0 +1,141 @@
+"""Index spatial et requêtes du niveau face aux parcours linéaires."""
+
+from __future__ import annotations
+
+import random
+
+import pygame
+import pytest
+
+from level import Level
+from level_file import open_level, save_level
+from objects import GroundSection, Player, Spike
+from settings import PLAYER_SIZE
+from spatial import BUCKET_WIDTH, SpatialIndex
+
+
+def random_level(seed: int, count: int = 400) -> Level:
+    """Sections superposées et pics, souvent à cheval sur une ou plusieurs cases de l'index."""
+    rng = random.Random(seed)
+    sections = []
+    spikes = []
+    for _ in range(count):
+        # Bords sur les limites de case, juste avant ou juste après, ou n'importe où.
+        left = rng.choice((rng.randrange(-2, 40) * BUCKET_WIDTH + rng.choice((-1, 0, 1)), rng.randint(-600, 10_000)))
+        width = rng.choice((1, BUCKET_WIDTH, BUCKET_WIDTH + 1, rng.randint(2, 3 * BUCKET_WIDTH)))
+        top = rng.randint(200, 480)
+        sections.append(GroundSection(pygame.Rect(left, top, width, rng.randint(10, 200))))
+        spikes.append(Spike(left + rng.uniform(-BUCKET_WIDTH, width), top, size=rng.choice((20, 40, 41, 300))))
+    return Level(sections, spikes)
+
+
+def section_extent(section: GroundSection):
+    return section.rect.left, section.rect.right
+
+
+def linear(items, x0, x1):
+    return [item for item in items if section_extent(item)[0] <= x1 and section_extent(item)[1] >= x0]
+
+
+def random_ranges(rng: random.Random, count: int):
+    for _ in range(count):
+        x0 = rng.choice((rng.randrange(-3, 41) * BUCKET_WIDTH, rng.uniform(-800, 10_500)))
+        yield x0, x0 + rng.choice((0, PLAYER_SIZE, BUCKET_WIDTH, rng.uniform(0, 4000)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_query_matches_linear_scan(seed):
+    level = random_level(seed)
+    index = SpatialIndex(level.sections, section_extent)
+    rng = random.Random(seed)
+    for x0, x1 in random_ranges(rng, 500):
+        # Même contenu et même ordre : la première section touchée décide de l'atterrissage.
+        assert index.query(x0, x1) == linear(level.sections, x0, x1)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_query_after_insert_and_remove(seed):
+    level = random_level(seed)
+    rng = random.Random(seed)
+    items = list(level.sections)
+    index = SpatialIndex(items, section_extent)
+    for item in rng.sample(items, len(items) // 3):
+        index.remove(item)
+        items.remove(item)
+    for item in random_level(seed + 50, 100).sections:
+        index.insert(item)
+        items.append(item)
+    assert len(index) == len(items)
+    for x0, x1 in random_ranges(rng, 300):
+        assert index.query(x0, x1) == linear(items, x0, x1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hits_spike_matches_linear_scan(seed):
+    level = random_level(seed)
+    rng = random.Random(seed)
+    hits = 0
+    for _ in range(3000):
+        rect = pygame.Rect(rng.randint(-700, 10_300), rng.randint(150, 480), PLAYER_SIZE, PLAYER_SIZE)
+        expected = any(spike.collides(rect) for spike in level.spikes)
+        assert level.hits_spike(rect) == expected
+        hits += expected
+    assert hits > 0
+
+
+def ground_state(player: Player):
+    return tuple(player.rect), player._pos_y, player.vel_y, player.on_ground, player.coyote_frames, player.landed
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_handle_ground_matches_linear_scan(seed):
+    level = random_level(seed)
+    rng = random.Random(seed)
+    with_index = Player((0, 0))
+    linear_scan = Player((0, 0))
+    touched = 0
+    for _ in range(3000):
+        x, y = rng.randint(-700, 10_300), rng.randint(150, 480)
+        vel_y = rng.uniform(-20, 26)
+        previous = y + rng.randint(-30, 30)
+        on_ground = rng.random() < 0.5
+        coyote_frames = rng.randint(0, 3)
+        for player in (with_index, linear_scan):
+            player.rect.topleft = (x, y)
+            player._pos_y = float(y)
+            player.prev_top = previous
+            player.prev_bottom = previous + PLAYER_SIZE
+            player.vel_y = vel_y
+            player.on_ground = on_ground
+            player.coyote_frames = coyote_frames
+        rect = with_index.rect
+        with_index.handle_ground(level.ground_iter(rect.left, rect.right))
+        linear_scan.handle_ground(level.ground_iter())
+        assert ground_state(with_index) == ground_state(linear_scan)
+        touched += with_index.rect.topleft != (x, y)
+    assert touched > 0
+
+
+def test_streaming_level_matches_in_memory_level(tmp_path):
+    level = random_level(7)
+    path = str(tmp_path / "level.gdl")
+    save_level(level, path)
+    streamed = open_level(path)
+    try:
+        # Niveau entier accessible sans tranche résidente
+        assert streamed.store.resident == []
+        assert sorted(tuple(section.rect) for section in streamed.ground_iter()) == sorted(
+            tuple(section.rect) for section in level.sections
+        )
+        assert len(streamed.spikes) == len(level.spikes)
+        assert streamed.store.resident == []
+
+        rng = random.Random(7)
+        for x0, x1 in random_ranges(rng, 300):
+            assert [tuple(s.rect) for s in streamed.ground_iter(x0, x1)] == [
+                tuple(s.rect) for s in linear(streamed.sections, x0, x1)
+            ]
+            rect = pygame.Rect(int(x0), rng.randint(150, 480), PLAYER_SIZE, PLAYER_SIZE)
+            assert streamed.hits_spike(rect) == level.hits_spike(rect)
+    finally:
+        streamed.close()